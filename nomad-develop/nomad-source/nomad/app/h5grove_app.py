@@ -16,39 +16,214 @@
 # limitations under the License.
 #
 
-from fastapi import FastAPI, status, Request, Depends
+import math
+import os
+import threading
+from collections import OrderedDict
+from time import monotonic
+
+from fastapi import APIRouter, FastAPI, Query, Response, status, Request, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import traceback
 import re
 import urllib.parse
 import h5py
-from typing import Callable, Dict, Any
+import numpy as np
+from cachetools import TTLCache
+from typing import Callable, Dict, Any, Optional, Tuple
 
 from h5grove import fastapi_utils as h5grove_router, utils as h5grove_utils
+from h5grove.content import DatasetContent, get_content_from_file
+from h5grove.encoders import encode
 
 from nomad import utils
-from nomad.files import UploadFiles, PublicUploadFiles
+from nomad.config import config
+from nomad.files import UploadFiles, PublicUploadFiles, StagingUploadFiles
 from nomad.app.v1.models import User
 from nomad.app.v1.routers.auth import create_user_dependency
 from nomad.app.v1.routers.uploads import get_upload_with_read_access
 
 logger = utils.get_logger(__name__)
 
+# The number of values that are read at once when downsampling datasets.
+DOWNSAMPLE_SLAB_SIZE = 1024 * 1024
 
-def open_zipped_h5_file(
+
+class PooledH5File(h5py.File):
+    """
+    A HDF5 file that stays open, when h5grove closes it after a request. Closing it only
+    ends one use of the file. The file is really closed, when it was removed from the
+    `H5FilePool` and is not used anymore.
+    """
+
+    pool_entry: '_H5FilePoolEntry' = None
+
+    def close(self):
+        if self.pool_entry is None:
+            h5py.File.close(self)
+        else:
+            self.pool_entry.pool.release(self.pool_entry)
+
+
+class _H5FilePoolEntry:
+    def __init__(
+        self, pool: 'H5FilePool', version: Any, file: PooledH5File, file_object: Any
+    ):
+        self.pool = pool
+        self.version = version
+        self.file = file
+        self.file_object = file_object
+        self.opened = self.used = monotonic()
+        self.users = 0
+        self.removed = False
+
+
+class H5FilePool:
+    """
+    A per process pool of open HDF5 files. The files are keyed by upload, source, and
+    path. Each file has a version (e.g. modification time of the file or its
+    container), a file with a different version is opened again. Files are removed if
+    they were not used for `ttl` seconds, if they are open for more than `max_age`
+    seconds, or if there are more than `max_size` files.
+
+    Files are used on the event loop and in the thread pool. Each use has to end with
+    closing the file. Removed files are only closed, when they are not used anymore.
+    """
+
+    def __init__(self, max_size: int, ttl: float, max_age: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_age = max_age
+        self._files: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str, str], version: Any) -> Optional[PooledH5File]:
+        with self._lock:
+            self._expire()
+            entry = self._files.pop(key, None)
+            if entry is None:
+                return None
+            if entry.version != version:
+                self._remove(entry)
+                return None
+            entry.used = monotonic()
+            entry.users += 1
+            self._files[key] = entry
+            return entry.file
+
+    def put(
+        self,
+        key: Tuple[str, str, str],
+        version: Any,
+        file: PooledH5File,
+        file_object: Any,
+    ):
+        """Adds the file to the pool, the caller uses the file until it is closed."""
+        with self._lock:
+            entry = self._files.pop(key, None)
+            if entry is not None:
+                self._remove(entry)
+            entry = _H5FilePoolEntry(self, version, file, file_object)
+            entry.users = 1
+            file.pool_entry = entry
+            self._files[key] = entry
+            while len(self._files) > self.max_size:
+                self._remove(self._files.popitem(last=False)[1])
+
+    def release(self, entry: _H5FilePoolEntry):
+        with self._lock:
+            entry.users -= 1
+            if entry.removed and entry.users == 0:
+                self._close(entry)
+
+    def clear(self):
+        with self._lock:
+            while self._files:
+                self._remove(self._files.popitem()[1])
+
+    def _expire(self):
+        now = monotonic()
+        for key, entry in list(self._files.items()):
+            if now - entry.used > self.ttl or now - entry.opened > self.max_age:
+                del self._files[key]
+                self._remove(entry)
+
+    def _remove(self, entry: _H5FilePoolEntry):
+        entry.removed = True
+        if entry.users == 0:
+            self._close(entry)
+
+    @staticmethod
+    def _close(entry: _H5FilePoolEntry):
+        h5py.File.close(entry.file)
+        entry.file_object.close()
+
+
+file_pool = H5FilePool(
+    config.services.h5grove_file_pool_size,
+    config.services.h5grove_cache_ttl,
+    config.services.h5grove_file_max_age,
+)
+
+# Granted access to uploads by (upload_id, user_id) and if uploads are published.
+_access_cache: TTLCache = TTLCache(maxsize=1024, ttl=config.services.h5grove_cache_ttl)
+_published_cache: TTLCache = TTLCache(
+    maxsize=1024, ttl=config.services.h5grove_cache_ttl
+)
+
+
+def is_published(upload_id: str) -> bool:
+    published = _published_cache.get(upload_id)
+    if published is None:
+        published = isinstance(UploadFiles.get(upload_id), PublicUploadFiles)
+        _published_cache[upload_id] = published
+    return published
+
+
+def _file_version(upload_files: UploadFiles, directory: str, path_or_id: str):
+    """
+    Returns the version of the file for the file pool, or None if the file should not
+    be pooled. Files are versioned by the modification time, size, and inode of the
+    file or its container. Published files are read from the raw zip and archive HDF5
+    containers, which are replaced, e.g. when an upload is re-packed.
+    """
+    try:
+        if isinstance(upload_files, StagingUploadFiles):
+            if directory == 'raw':
+                file_object = upload_files.raw_file_object(path_or_id)
+            else:
+                file_object = upload_files.join_dir('archive').join_file(
+                    f'{path_or_id}.h5'
+                )
+        elif isinstance(upload_files, PublicUploadFiles):
+            if directory == 'raw':
+                file_object = upload_files.raw_zip_file_object()
+            else:
+                file_object = PublicUploadFiles._create_archive_hdf5_file_object(
+                    upload_files, upload_files.access
+                )
+        else:
+            return None
+        stat = os.stat(file_object.os_path)
+    except (AssertionError, KeyError, OSError):
+        return None
+
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def open_pooled_h5_file(
     filepath: str,
     create_error: Callable[[int, str], Exception],
     h5py_options: Dict[str, Any] = {},
 ) -> h5py.File:
-    import re
-    import io
-    from nomad import files
-
     """
-    Patched h5grove utils function open_file_with_error_fallback in order to open h5 file
-    in zipped folder.
+    Opens the h5 file in the upload given by `filepath`, or returns it from the file
+    pool.
     """
+    import io
+
     match = re.match(
         r'.*?/uploads/(?P<upload_id>.+?)/(?P<directory>.+?)/(?P<path_or_id>.+)',
         filepath,
@@ -56,10 +231,21 @@ def open_zipped_h5_file(
     if not match:
         raise create_error(404, 'File not found!')
 
-    upload_files = files.UploadFiles.get(match['upload_id'])
-    path_or_id = match['path_or_id']
+    upload_id, directory, path_or_id = match.group(
+        'upload_id', 'directory', 'path_or_id'
+    )
+    key = (upload_id, directory, path_or_id)
+    pooled = file_pool.max_size > 0 and not h5py_options
+
+    upload_files = UploadFiles.get(upload_id)
+    version = _file_version(upload_files, directory, path_or_id) if pooled else None
+    if version is not None:
+        f = file_pool.get(key, version)
+        if f is not None:
+            return f
+
     try:
-        if match['directory'] == 'raw':
+        if directory == 'raw':
             file_object = upload_files.raw_file(path_or_id, 'rb')
         else:
             file_object = upload_files.archive_hdf5_file(path_or_id)
@@ -67,7 +253,11 @@ def open_zipped_h5_file(
         raise create_error(404, 'File not found!')
 
     try:
-        f = h5py.File(file_object, **h5py_options)
+        if version is not None:
+            f = PooledH5File(file_object, 'r', **h5py_options)
+            file_pool.put(key, version, f, file_object)
+        else:
+            f = h5py.File(file_object, **h5py_options)
     except OSError as e:
         if isinstance(e, FileNotFoundError) or 'No such file or directory' in str(e):
             raise create_error(404, 'File not found!')
@@ -80,13 +270,138 @@ def open_zipped_h5_file(
     return f
 
 
+def open_zipped_h5_file(
+    filepath: str,
+    create_error: Callable[[int, str], Exception],
+    h5py_options: Dict[str, Any] = {},
+) -> h5py.File:
+    """
+    Patched h5grove utils function open_file_with_error_fallback in order to open h5 file
+    in zipped folder.
+    """
+    # this code runs with the globals of h5grove.utils
+    from nomad.app.h5grove_app import open_pooled_h5_file
+
+    return open_pooled_h5_file(filepath, create_error, h5py_options)
+
+
 h5grove_utils.open_file_with_error_fallback.__code__ = open_zipped_h5_file.__code__
 
 
+def downsample(dataset: h5py.Dataset, points: int) -> Dict[str, Any]:
+    """
+    Reduces a numeric 1D or 2D dataset to about `points` values per dimension. The
+    dataset is split into blocks of `step` consecutive values and only the minimum and
+    maximum of each block are kept, so that peaks remain visible. The dataset is read
+    in slabs of about `DOWNSAMPLE_SLAB_SIZE` values.
+
+    Returns:
+        For 1D datasets, the `indices` and `data` of the block extrema in order. For
+        2D datasets, the `min` and `max` of each block.
+    """
+    shape = dataset.shape
+    if all(size <= points for size in shape):
+        data = dataset[()]
+        if len(shape) == 1:
+            return dict(shape=shape, step=[1], indices=np.arange(len(data)), data=data)
+        return dict(shape=shape, step=[1, 1], min=data, max=data)
+
+    if len(shape) == 1:
+        step = math.ceil(shape[0] / max(1, points // 2))
+        slab = step * max(1, DOWNSAMPLE_SLAB_SIZE // step)
+        indices, data = [], []
+        for start in range(0, shape[0], slab):
+            values = dataset[start : start + slab]
+            blocks = np.pad(values, (0, -len(values) % step), mode='edge')
+            blocks = blocks.reshape(-1, step)
+            offsets = np.arange(len(blocks)) * step
+            extrema = np.stack(
+                [offsets + blocks.argmin(axis=1), offsets + blocks.argmax(axis=1)],
+                axis=1,
+            )
+            extrema = np.sort(extrema, axis=1).ravel()
+            indices.append(start + extrema)
+            data.append(values[extrema])
+        return dict(
+            shape=shape,
+            step=[step],
+            indices=np.concatenate(indices),
+            data=np.concatenate(data),
+        )
+
+    rows, cols = shape
+    steps = [math.ceil(size / points) for size in shape]
+    slab = steps[0] * max(1, DOWNSAMPLE_SLAB_SIZE // (steps[0] * cols))
+    minima, maxima = [], []
+    for start in range(0, rows, slab):
+        values = dataset[start : start + slab]
+        values = np.pad(
+            values,
+            ((0, -values.shape[0] % steps[0]), (0, -cols % steps[1])),
+            mode='edge',
+        )
+        blocks = values.reshape(
+            values.shape[0] // steps[0], steps[0], values.shape[1] // steps[1], steps[1]
+        )
+        minima.append(blocks.min(axis=(1, 3)))
+        maxima.append(blocks.max(axis=(1, 3)))
+    return dict(
+        shape=shape,
+        step=steps,
+        min=np.concatenate(minima),
+        max=np.concatenate(maxima),
+    )
+
+
 async def check_user_access(
     upload_id: str, user: User = Depends(create_user_dependency(required=True))
 ):
-    get_upload_with_read_access(upload_id, user)
+    # only granted access is cached, revoked access takes effect after the cache ttl
+    key = (upload_id, user.user_id)
+    if key not in _access_cache:
+        get_upload_with_read_access(upload_id, user)
+        _access_cache[key] = True
+
+
+router = APIRouter(route_class=h5grove_router.H5GroveRoute)
+
+
+def _downsample_file(file: str, path: str, points: int) -> Response:
+    create_error = h5grove_router.create_error
+    with get_content_from_file(file, path, create_error) as content:
+        if not isinstance(content, DatasetContent):
+            raise create_error(422, 'Only datasets can be downsampled.')
+        dataset = content._h5py_entity
+        numeric = np.issubdtype(dataset.dtype, np.number) or np.issubdtype(
+            dataset.dtype, np.bool_
+        )
+        if dataset.ndim not in (1, 2) or not numeric:
+            raise create_error(
+                422, 'Only numeric 1D or 2D datasets can be downsampled.'
+            )
+        h5grove_response = encode(downsample(dataset, points), 'json')
+        return Response(
+            content=h5grove_response.content, headers=h5grove_response.headers
+        )
+
+
+@router.get('/downsample/')
+async def get_downsampled_data(
+    file: str = Depends(h5grove_router.add_base_path),
+    path: str = '/',
+    points: int = Query(
+        1000,
+        ge=2,
+        le=100000,
+        description='The maximum number of values per dimension.',
+    ),
+):
+    """
+    Returns a min/max preserving downsampled version of a large numeric 1D or 2D
+    dataset, e.g. for interactive plots.
+    """
+    # reading large datasets must not block the event loop
+    return await run_in_threadpool(_downsample_file, file, path, points)
 
 
 app = FastAPI(dependencies=[Depends(check_user_access)])
@@ -108,9 +423,7 @@ async def add_upload_folder_path(request: Request, call_next):
     source = request.query_params['source']
 
     upload_path = f'/uploads/{upload_id}/{source}/'
-    if source == 'archive' and isinstance(
-        UploadFiles.get(upload_id), PublicUploadFiles
-    ):
+    if source == 'archive' and is_published(upload_id):
         path = f'{file}{path}'
 
     scope = request.scope
@@ -146,3 +459,4 @@ async def unicorn_exception_handler(request: Request, e: Exception):
 
 
 app.include_router(h5grove_router.router)
+app.include_router(router)
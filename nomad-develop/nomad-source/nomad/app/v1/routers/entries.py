@@ -15,7 +15,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import asyncio
 import math
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 
 from typing import Optional, Set, Union, Dict, Iterator, Any, List
@@ -94,6 +97,8 @@ archive_tag = 'entries/archive'
 
 logger = utils.get_logger(__name__)
 
+ndjson_media_type = 'application/x-ndjson'
+
 query_parameters = QueryParameters(doc_type=entry_type)
 
 archive_required_documentation = strip(
@@ -872,6 +877,87 @@ def _read_entry_from_archive(entry: dict, uploads, required_reader: RequiredRead
         return None
 
 
+_archive_read_executor = ThreadPoolExecutor(
+    max_workers=max(1, config.services.archive_read_threads),
+    thread_name_prefix='archive_read',
+)
+
+
+def _submit_entries_archive_read(
+    entries: List[dict], required_reader: RequiredReader, cancelled: threading.Event
+) -> List[Future]:
+    """
+    Reads the archives of the given entries with the archive read threads. Entries are
+    grouped by upload and the groups are split into chunks that are read in parallel.
+    Each chunk opens the archive of its upload only once. Chunks stop reading
+    once `cancelled` is set.
+
+    Returns a future for each entry in the order of the given entries.
+    """
+    results: List[Future] = [Future() for _ in entries]
+
+    upload_indices: Dict[str, List[int]] = {}
+    for index, entry in enumerate(entries):
+        upload_indices.setdefault(entry['upload_id'], []).append(index)
+
+    chunk_size = max(
+        1, math.ceil(len(entries) / max(1, config.services.archive_read_threads))
+    )
+    chunks = [
+        indices[start : start + chunk_size]
+        for indices in upload_indices.values()
+        for start in range(0, len(indices), chunk_size)
+    ]
+
+    def read_chunk(chunk: List[int]):
+        with _Uploads() as uploads:
+            for index in chunk:
+                if cancelled.is_set():
+                    results[index].cancel()
+                    continue
+                try:
+                    results[index].set_result(
+                        _read_entry_from_archive(
+                            entries[index], uploads, required_reader
+                        )
+                    )
+                except Exception as e:
+                    results[index].set_exception(e)
+
+    # submit the chunks that contain the first entries first
+    for chunk in sorted(chunks, key=lambda chunk: chunk[0]):
+        _archive_read_executor.submit(read_chunk, chunk)
+
+    return results
+
+
+async def _read_entries_from_archive(
+    request: Request, entries: List[dict], required_reader: RequiredReader
+):
+    """
+    Reads the archives of the given entries in parallel and yields them in the order
+    of the given entries. Stops if the client disconnects.
+    """
+    cancelled = threading.Event()
+    try:
+        results = _submit_entries_archive_read(entries, required_reader, cancelled)
+        for result in results:
+            disconnected = await request.is_disconnected()
+            if disconnected:
+                logger.info('client disconnected', endpoint='entries/archive')
+                break
+
+            yield await asyncio.wrap_future(result)
+
+        logger.info('read all archives', endpoint='entries/archive')
+    finally:
+        cancelled.set()
+
+
+def _accepts_ndjson(request: Request) -> bool:
+    return ndjson_media_type in request.headers.get('Accept', '')
+
+
 async def _answer_entries_archive_request(
     request: Request,
     owner: Owner,
@@ -879,6 +965,7 @@ async def _answer_entries_archive_request(
     pagination: MetadataPagination,
     required: ArchiveRequired,
     user: User,
+    populate_urls: bool = False,
 ):
     if owner == Owner.all_:
         raise HTTPException(
@@ -910,29 +997,70 @@ async def _answer_entries_archive_request(
     ]
 
     required_reader = _validate_required(required, user)
-    response_data = []
     if isinstance(entries, dict):
         entries = [entries]
 
-    with _Uploads() as uploads:
-        for entry in entries:
-            disconnected = await request.is_disconnected()
-            if disconnected:
-                logger.info('client disconnected', endpoint='entries/archive')
-                break
-
-            entry_archive = _read_entry_from_archive(entry, uploads, required_reader)
-            response_data.append(entry_archive)
-
-        logger.info('read all archives', endpoint='entries/archive')
-
-    return EntriesArchiveResponse(
+    response = EntriesArchiveResponse(
         owner=search_response.owner,
         query=search_response.query,
         pagination=search_response.pagination,
         required=required,
-        data=list(filter(None, response_data)),
     )
+    if populate_urls:
+        response.pagination.populate_urls(request)
+
+    if _accepts_ndjson(request):
+        return StreamingResponse(
+            _stream_entries_archive_response(
+                request, entries, required_reader, response
+            ),
+            media_type=ndjson_media_type,
+        )
+
+    response_data = [
+        entry_archive
+        async for entry_archive in _read_entries_from_archive(
+            request, entries, required_reader
+        )
+    ]
+    response.data = list(filter(None, response_data))
+
+    return response
+
+
+async def _stream_entries_archive_response(
+    request: Request,
+    entries: List[dict],
+    required_reader: RequiredReader,
+    response: EntriesArchiveResponse,
+):
+    """
+    Yields the archives of the given entries as newline delimited JSON, one entry per
+    line as soon as it is read. The last line contains the rest of the response
+    (owner, query, pagination, required) without the data.
+    """
+    try:
+        async for entry_archive in _read_entries_from_archive(
+            request, entries, required_reader
+        ):
+            if entry_archive is not None:
+                yield orjson.dumps(entry_archive, option=orjson.OPT_NON_STR_KEYS)
+                yield b'\n'
+    except HTTPException as e:
+        # the status code is already sent, the error is reported in-band
+        yield orjson.dumps({'detail': e.detail})
+        yield b'\n'
+        return
+    except Exception as e:
+        logger.error('unexpected exception while streaming archives', exc_info=e)
+        yield orjson.dumps(
+            {'detail': f'Unexpected exception while streaming archives: {e}'}
+        )
+        yield b'\n'
+        return
+
+    yield response.json(exclude_unset=True, exclude_none=True).encode()
+    yield b'\n'
 
 
 _entries_archive_docstring = strip(
@@ -941,6 +1069,11 @@ _entries_archive_docstring = strip(
     the a *page* of `required` archive data. Look at the body schema or parameter documentation
     for more details. The **GET** version of this operation will only allow to provide
     the full archives.
+
+    If the request header specifies `Accept: application/x-ndjson`, the response is
+    streamed as newline delimited JSON. Each line contains one entry as soon as its
+    archive was read. The last line contains the rest of the response (`owner`, `query`,
+    `pagination`, `required`) without the `data`.
     """
 )
 
@@ -986,16 +1119,15 @@ async def get_entries_archive_query(
     pagination: MetadataPagination = Depends(metadata_pagination_parameters),
     user: User = Depends(create_user_dependency()),
 ):
-    res = await _answer_entries_archive_request(
+    return await _answer_entries_archive_request(
         request=request,
         owner=with_query.owner,
         query=with_query.query,
         pagination=pagination,
         required=None,
         user=user,
+        populate_urls=True,
     )
-    res.pagination.populate_urls(request)
-    return res
 
 
 def _answer_entries_archive_download_request(
@@ -17,6 +17,8 @@
 #
 import os
 import io
+import json
+import hashlib
 import shutil
 from enum import Enum
 from datetime import datetime
@@ -36,6 +38,7 @@ from fastapi import (
     Query as FastApiQuery,
     HTTPException,
 )
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse, FileResponse
 from fastapi.exceptions import RequestValidationError
 
@@ -102,6 +105,8 @@ bundle_tag = 'uploads/bundle'
 
 logger = utils.get_logger(__name__)
 
+_write_buffer_size = 1024 * 1024
+
 
 class UploadRole(str, Enum):
     main_author = 'main_author'
@@ -189,6 +194,10 @@ class UploadProcData(ProcData):
     license: str = Field(
         description='The license under which this upload is distributed.'
     )
+    last_update: Optional[datetime] = Field(
+        None,
+        description='Date and time of the last modifying process run (publish, processing, upload).',
+    )
     entries: int = Field(
         0, description='The number of identified entries in this upload.'
     )
@@ -495,6 +504,21 @@ class PutRawFileResponse(BaseModel):
     )
 
 
+class ChunkedUploadData(BaseModel):
+    session_id: str = Field(description='The unique id of the chunked upload.')
+    upload_id: str = Field(description='The id of the upload the file is added to.')
+    path: str = Field(description='The raw directory the file is added to.')
+    file_name: str = Field(description='The name of the uploaded file.')
+    offset: int = Field(
+        0,
+        description=strip(
+            """
+        The number of bytes received so far, i.e. the offset at which the next chunk
+        has to start."""
+        ),
+    )
+
+
 class DeleteEntryFilesRequest(WithQuery):
     """Defines a request to delete entry files."""
 
@@ -609,6 +633,28 @@ _upload_or_path_not_found = (
     },
 )
 
+_chunked_upload_not_found = (
+    status.HTTP_404_NOT_FOUND,
+    {
+        'model': HTTPExceptionModel,
+        'description': strip(
+            """
+        The specified upload or chunked upload could not be found."""
+        ),
+    },
+)
+
+_chunk_offset_conflict = (
+    status.HTTP_409_CONFLICT,
+    {
+        'model': HTTPExceptionModel,
+        'description': strip(
+            """
+        The chunk offset is larger than the number of bytes received so far."""
+        ),
+    },
+)
+
 _post_upload_response = (
     200,
     {
@@ -1463,9 +1509,7 @@ async def put_upload_raw_path(
             ]
         else:
             file_operations = [
-                dict(
-                    op='ADD', path=upload_path, target_dir=path, temporary=(method != 0)
-                )
+                dict(op='ADD', path=upload_path, target_dir=path, temporary=True)
                 for upload_path in upload_paths
             ]
 
@@ -1674,6 +1718,253 @@ async def post_upload_raw_create_dir_path(
     return UploadProcDataResponse(upload_id=upload_id, data=upload_to_pydantic(upload))
 
 
+@router.post(
+    '/{upload_id}/chunked',
+    tags=[raw_tag],
+    summary='Start a resumable, chunked upload of a raw file to the specified upload.',
+    response_model=ChunkedUploadData,
+    responses=create_responses(
+        _upload_not_found, _not_authorized_to_upload, _bad_request
+    ),
+)
+async def post_upload_chunked(
+    upload_id: str = Path(..., description='The unique id of the upload.'),
+    path: str = FastApiQuery(
+        '',
+        description=strip(
+            """
+            The raw directory the file should be added to."""
+        ),
+    ),
+    file_name: str = FastApiQuery(..., description='The name of the file.'),
+    user: User = Depends(
+        create_user_dependency(required=True, upload_token_auth_allowed=True)
+    ),
+):
+    """
+    Starts a resumable, chunked upload of a single file. Use this for large files and
+    unreliable connections. The file is sent in consecutive chunks with PUT
+    `uploads/{upload_id}/chunked/{session_id}`, each chunk streamed in the http body and
+    its position given with the `offset` query parameter. If a transfer is interrupted,
+    GET `uploads/{upload_id}/chunked/{session_id}` returns the number of bytes received
+    so far, and the upload can be resumed from this offset. Once all data is sent, POST
+    `uploads/{upload_id}/chunked/{session_id}/finalize` verifies the SHA-256 `checksum`
+    of the file, adds it to the `path` in the upload (zip and tar files are extracted),
+    and processes it. Chunked uploads that receive no data for longer than
+    `services.chunked_upload_expiry` seconds (one day by default) expire. They are
+    deleted when new chunked uploads are started or with `nomad admin clean`.
+
+    Example curl commands:
+
+        curl -X 'POST' "url/chunked?file_name=data.zip"
+        curl -X 'PUT' "url/chunked/{session_id}?offset=0" -T chunk_0
+        curl -X 'PUT' "url/chunked/{session_id}?offset=<size of chunk_0>" -T chunk_1
+        curl -X 'POST' "url/chunked/{session_id}/finalize?checksum=<sha256 of data.zip>"
+    """
+    _get_upload_with_write_access(upload_id, user, include_published=False)
+
+    if not is_safe_relative_path(path):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail='Bad path provided.'
+        )
+    if not is_safe_basename(file_name):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail='Bad file name provided.'
+        )
+
+    await run_in_threadpool(files.delete_expired_chunked_uploads)
+
+    session_id = utils.create_uuid()
+    metadata_path = files.chunked_upload_metadata_path(session_id)
+    data_dir = os.path.join(os.path.dirname(metadata_path), session_id)
+    os.makedirs(data_dir)
+    open(os.path.join(data_dir, file_name), 'wb').close()
+    with open(metadata_path, 'w') as f:
+        json.dump(
+            dict(
+                upload_id=upload_id,
+                user_id=user.user_id,
+                path=path,
+                file_name=file_name,
+            ),
+            f,
+        )
+
+    return ChunkedUploadData(
+        session_id=session_id, upload_id=upload_id, path=path, file_name=file_name
+    )
+
+
+@router.get(
+    '/{upload_id}/chunked/{session_id}',
+    tags=[raw_tag],
+    summary='Get the state of a chunked upload.',
+    response_model=ChunkedUploadData,
+    responses=create_responses(_chunked_upload_not_found, _not_authorized_to_upload),
+)
+async def get_upload_chunked(
+    upload_id: str = Path(..., description='The unique id of the upload.'),
+    session_id: str = Path(..., description='The unique id of the chunked upload.'),
+    user: User = Depends(
+        create_user_dependency(required=True, upload_token_auth_allowed=True)
+    ),
+):
+    """
+    Returns the state of the chunked upload, including the number of bytes received so
+    far. Use the returned `offset` to resume an interrupted upload.
+    """
+    chunked_upload, _ = _get_chunked_upload(upload_id, session_id, user)
+    return chunked_upload
+
+
+@router.put(
+    '/{upload_id}/chunked/{session_id}',
+    tags=[raw_tag],
+    summary='Upload a chunk of a chunked upload.',
+    response_model=ChunkedUploadData,
+    responses=create_responses(
+        _chunked_upload_not_found,
+        _not_authorized_to_upload,
+        _chunk_offset_conflict,
+        _bad_request,
+    ),
+)
+async def put_upload_chunked(
+    request: Request,
+    upload_id: str = Path(..., description='The unique id of the upload.'),
+    session_id: str = Path(..., description='The unique id of the chunked upload.'),
+    offset: int = FastApiQuery(
+        ...,
+        ge=0,
+        description=strip(
+            """
+            The position of the chunk in the file. Must not be larger than the number of
+            bytes received so far. Previously received data after this offset is
+            replaced."""
+        ),
+    ),
+    user: User = Depends(
+        create_user_dependency(required=True, upload_token_auth_allowed=True)
+    ),
+):
+    """
+    Writes the chunk streamed in the http body at the given `offset`. Chunks have to be
+    sent one after another. If the transfer of a chunk is interrupted, the data received
+    until then is kept, and the upload can be continued from the returned (or the
+    current) offset.
+    """
+    chunked_upload, data_path = _get_chunked_upload(upload_id, session_id, user)
+    if offset > chunked_upload.offset:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f'The offset {offset} is larger than the number of bytes received '
+            f'so far ({chunked_upload.offset}).',
+        )
+
+    try:
+        with open(data_path, 'r+b') as f:
+            f.truncate(offset)
+            f.seek(offset)
+            await _write_stream(request.stream(), f)
+    except Exception as e:
+        logger.warn('IO error receiving upload chunk', exc_info=e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Some IO went wrong, chunk probably aborted/disrupted. Continue '
+            'from the current offset.',
+        )
+
+    chunked_upload.offset = os.path.getsize(data_path)
+    return chunked_upload
+
+
+@router.post(
+    '/{upload_id}/chunked/{session_id}/finalize',
+    tags=[raw_tag],
+    summary='Complete a chunked upload and add the file to the upload.',
+    response_model=UploadProcDataResponse,
+    responses=create_responses(
+        _chunked_upload_not_found, _not_authorized_to_upload, _bad_request
+    ),
+    response_model_exclude_unset=True,
+    response_model_exclude_none=True,
+)
+async def post_upload_chunked_finalize(
+    upload_id: str = Path(..., description='The unique id of the upload.'),
+    session_id: str = Path(..., description='The unique id of the chunked upload.'),
+    checksum: str = FastApiQuery(
+        ..., description='The hex encoded SHA-256 checksum of the complete file.'
+    ),
+    user: User = Depends(
+        create_user_dependency(required=True, upload_token_auth_allowed=True)
+    ),
+):
+    """
+    Verifies the checksum of the received file, adds the file to the upload, and
+    initiates processing. If the file is a zip or tar archive, it will be extracted, and
+    the content will be *merged* with the existing content, like with PUT
+    `uploads/{upload_id}/raw/{path}`. If the checksum does not match, the chunked upload
+    is kept and the mismatching data can be sent again.
+    """
+    upload = _get_upload_with_write_access(upload_id, user, include_published=False)
+    chunked_upload, data_path = _get_chunked_upload(upload_id, session_id, user)
+
+    if await run_in_threadpool(_file_checksum, data_path) != checksum.lower():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='The checksum does not match the received data.',
+        )
+    if files.auto_decompress(data_path) == 'error':
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Cannot extract file. Bad file format or file extension?',
+        )
+
+    try:
+        upload.process_upload(
+            file_operations=[
+                dict(
+                    op='ADD',
+                    path=data_path,
+                    target_dir=chunked_upload.path,
+                    temporary=True,
+                )
+            ],
+            only_updated_files=True,
+        )
+    except ProcessAlreadyRunning:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='The upload is currently blocked by another process.',
+        )
+    os.remove(files.chunked_upload_metadata_path(session_id))
+
+    return UploadProcDataResponse(upload_id=upload_id, data=upload_to_pydantic(upload))
+
+
+@router.delete(
+    '/{upload_id}/chunked/{session_id}',
+    tags=[raw_tag],
+    summary='Abort a chunked upload.',
+    response_model=ChunkedUploadData,
+    responses=create_responses(_chunked_upload_not_found, _not_authorized_to_upload),
+)
+async def delete_upload_chunked(
+    upload_id: str = Path(..., description='The unique id of the upload.'),
+    session_id: str = Path(..., description='The unique id of the chunked upload.'),
+    user: User = Depends(
+        create_user_dependency(required=True, upload_token_auth_allowed=True)
+    ),
+):
+    """
+    Aborts the chunked upload and deletes the data received so far.
+    """
+    chunked_upload, data_path = _get_chunked_upload(upload_id, session_id, user)
+    os.remove(files.chunked_upload_metadata_path(session_id))
+    shutil.rmtree(os.path.dirname(data_path))
+    return chunked_upload
+
+
 @router.get(
     '/{upload_id}/archive/mainfile/{mainfile:path}',
     tags=[archive_tag],
@@ -1863,7 +2154,7 @@ async def post_upload(
     if upload_paths:
         upload.process_upload(
             file_operations=[
-                dict(op='ADD', path=upload_path, target_dir='', temporary=(method != 0))
+                dict(op='ADD', path=upload_path, target_dir='', temporary=True)
                 for upload_path in upload_paths
             ]
         )
@@ -2547,9 +2838,13 @@ async def _get_files_if_provided(
     # Forward the file path (if method == 0) or save the file(s)
     if method == 0:
         tmp_dir = files.create_tmp_dir(tmp_dir_prefix)
-        # copy provided path to a temp directory
-        shutil.copy(local_path, tmp_dir)
-        upload_paths = [os.path.join(tmp_dir, os.path.basename(local_path))]
+        # link (or if not possible, copy) provided path to a temp directory
+        tmp_path = os.path.join(tmp_dir, os.path.basename(local_path))
+        try:
+            os.link(local_path, tmp_path)
+        except OSError:
+            shutil.copy(local_path, tmp_path)
+        upload_paths = [tmp_path]
         uploaded_bytes = os.path.getsize(local_path)
     else:
         tmp_dir = files.create_tmp_dir(tmp_dir_prefix)
@@ -2557,24 +2852,10 @@ async def _get_files_if_provided(
         uploaded_bytes = 0
         for source_stream, file_name in sources:
             upload_path = os.path.join(tmp_dir, file_name)
+            uploaded_bytes = 0
             try:
                 with open(upload_path, 'wb') as f:
-                    uploaded_bytes = 0
-                    log_interval = 1e9
-                    log_unit = 'GB'
-                    next_log_at = log_interval
-                    async for chunk in source_stream:
-                        if not chunk:
-                            # End of data stream
-                            break
-                        uploaded_bytes += len(chunk)
-                        f.write(chunk)
-                        if uploaded_bytes > next_log_at:
-                            logger.info(
-                                'large upload in progress',
-                                uploaded_bytes=uploaded_bytes,
-                            )
-                            next_log_at += log_interval
+                    uploaded_bytes = await _write_stream(source_stream, f)
                     logger.info(f'upload completed', uploaded_bytes={uploaded_bytes})
             except Exception as e:
                 if not (isinstance(e, RuntimeError) and 'Stream consumed' in str(e)):
@@ -2617,6 +2898,83 @@ async def _get_files_if_provided(
     return upload_paths, method
 
 
+async def _write_stream(source_stream, f) -> int:
+    """
+    Writes the chunks of the asynchronous `source_stream` to the file-like `f`. The data
+    is buffered and written in a thread pool, to not block the event loop with disk IO.
+    Buffered data is also written if the stream fails. Returns the number of bytes read.
+    """
+    uploaded_bytes = 0
+    log_interval = 1e9
+    next_log_at = log_interval
+    buffer: List[bytes] = []
+    buffer_size = 0
+    try:
+        async for chunk in source_stream:
+            if not chunk:
+                # End of data stream
+                break
+            uploaded_bytes += len(chunk)
+            buffer.append(chunk)
+            buffer_size += len(chunk)
+            if buffer_size >= _write_buffer_size:
+                data = b''.join(buffer)
+                buffer, buffer_size = [], 0
+                await run_in_threadpool(f.write, data)
+            if uploaded_bytes > next_log_at:
+                logger.info('large upload in progress', uploaded_bytes=uploaded_bytes)
+                next_log_at += log_interval
+    finally:
+        if buffer:
+            await run_in_threadpool(f.write, b''.join(buffer))
+    return uploaded_bytes
+
+
+def _get_chunked_upload(
+    upload_id: str, session_id: str, user: User
+) -> Tuple[ChunkedUploadData, str]:
+    """
+    Loads the chunked upload with the given id, if it was started by the given user for
+    the given upload. Returns the chunked upload data, including the current offset, and
+    the os path of the (partially) received file.
+    """
+    metadata_path = files.chunked_upload_metadata_path(session_id)
+    metadata = None
+    if is_safe_basename(session_id) and os.path.exists(metadata_path):
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+    if (
+        metadata is None
+        or metadata['upload_id'] != upload_id
+        or metadata['user_id'] != user.user_id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='The specified chunked upload could not be found.',
+        )
+
+    data_path = os.path.join(
+        os.path.dirname(metadata_path), session_id, metadata['file_name']
+    )
+    chunked_upload = ChunkedUploadData(
+        session_id=session_id,
+        upload_id=upload_id,
+        path=metadata['path'],
+        file_name=metadata['file_name'],
+        offset=os.path.getsize(data_path),
+    )
+    return chunked_upload, data_path
+
+
+def _file_checksum(os_path: str) -> str:
+    """Returns the hex encoded SHA-256 checksum of the given file."""
+    checksum = hashlib.sha256()
+    with open(os_path, 'rb') as f:
+        while data := f.read(_write_buffer_size):
+            checksum.update(data)
+    return checksum.hexdigest()
+
+
 async def _asyncronous_file_reader(f):
     """Asynchronous generator to read file-like objects."""
     while True:
@@ -2642,7 +3000,7 @@ def get_role_query(roles: List[UploadRole], user: User) -> Q:
     if not roles:
         roles = list(UploadRole)
 
-    group_ids = get_group_ids(user.user_id)
+    group_ids = get_group_ids(user.user_id, use_cache=True)
 
     role_query = Q()
     if UploadRole.main_author in roles:
@@ -2699,7 +3057,17 @@ def get_upload_with_read_access(
         embargo.
     """
     mongodb_query = _query_mongodb(upload_id=upload_id)
-    upload = mongodb_query.first()
+    return check_upload_read_access(mongodb_query.first(), user, include_others)
+
+
+def check_upload_read_access(
+    upload: Optional[Upload], user: Optional[User], include_others: bool = False
+) -> Upload:
+    """
+    Applies the read access rules of :func:`get_upload_with_read_access` to an upload
+    that has already been loaded, e.g. as part of a batch. A missing upload is passed
+    as `None`. Returns the upload or raises an HTTPException.
+    """
     if upload is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
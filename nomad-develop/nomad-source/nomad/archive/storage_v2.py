@@ -17,7 +17,11 @@
 #
 from __future__ import annotations
 
+import mmap
+import os
 import struct
+import threading
+from collections import OrderedDict
 from io import BytesIO
 from typing import Generator
 
@@ -29,7 +33,19 @@ from nomad import utils
 from nomad.config import config
 from nomad.archive import ArchiveError
 
-_packer = msgpack.Packer(autoreset=True, use_bin_type=True)
+
+def _pack_lazy(obj):
+    """
+    Lazy values are callables that are only called to produce the actual value when
+    they are packed. This allows to serialize data without holding all of it in memory.
+    """
+    if callable(obj):
+        return obj()
+
+    raise TypeError(f'can not serialize {obj.__class__.__name__!r} object')
+
+
+_packer = msgpack.Packer(autoreset=True, use_bin_type=True, default=_pack_lazy)
 
 
 class Utility:
@@ -88,7 +104,8 @@ class Utility:
 
 class TOCPacker:
     """
-    A special msgpack packer that records a TOC while packing.
+    A special msgpack packer that records a TOC while packing. Values can be lazy
+    (callables that produce the actual value), they are evaluated while packing.
     """
 
     def __init__(self, toc_depth: int, transform=None):
@@ -103,7 +120,7 @@ class TOCPacker:
 
     @property
     def _pos(self):
-        return self._buffer.getbuffer().nbytes
+        return self._buffer.tell()
 
     def _pack(self, obj) -> dict:
         """
@@ -122,6 +139,9 @@ class TOCPacker:
             """
             _pack_direct(Utility.packb(_obj))
 
+        if callable(obj):
+            obj = _pack_lazy(obj)
+
         if self._depth >= self._toc_depth or not isinstance(obj, (dict, list)):
             start_pos = self._pos
             _pack_raw(obj)
@@ -195,13 +215,17 @@ class TOCPacker:
         return {'toc': obj_toc, 'pos': [start_pos, self._pos]}
 
     def pack(self, obj):
+        """
+        Packs the given dict. Returns the packed data (as a view on the internal buffer,
+        valid until the next call) and the TOC.
+        """
         if not isinstance(obj, dict):
             raise ArchiveError(f'TOC packer can only pack dicts, {obj.__class__}')
 
         self._depth = 0
         self._buffer = BytesIO()
         toc: dict = self._pack(obj)
-        return self._buffer.getvalue(), toc
+        return self._buffer.getbuffer(), toc
 
 
 class ArchiveWriter:
@@ -342,7 +366,9 @@ class ArchiveWriter:
     def _write(self, obj) -> tuple[int, int]:
         return self._write_binary(Utility.packb(obj))
 
-    def _write_entry(self, uuid: str, toc: dict, packed: bytes | Generator):
+    def _write_entry(
+        self, uuid: str, toc: dict, packed: bytes | memoryview | Generator
+    ):
         uuid = utils.adjust_uuid_size(uuid)
 
         self._write(uuid)
@@ -351,7 +377,7 @@ class ArchiveWriter:
         toc_pos = self._write(toc)
         self._write('data')
 
-        if isinstance(packed, bytes):
+        if isinstance(packed, (bytes, memoryview)):
             data_pos = self._write_binary(packed)
         elif isinstance(packed, Generator):
             start = self._pos
@@ -397,11 +423,97 @@ class ArchiveReadCounter:
         self._call_counter = 0
 
 
+class MappedArchiveFile:
+    """
+    A read-only memory map of an archive file.
+
+    The same file is only mapped once per process. Every reader that opens the file
+    in mmap mode gets its own handle via :meth:`open`, all handles share the
+    underlying mapping. The mapping is closed once the last handle is closed.
+    Reads return zero-copy ``memoryview`` slices of the mapping that can be directly
+    unpacked by msgpack.
+    """
+
+    _lock = threading.Lock()
+    _mapped: dict[tuple, MappedArchiveFile] = {}
+
+    def __init__(self, key: tuple, path: str):
+        self._key: tuple = key
+        self._handles: int = 0
+
+        with open(path, 'rb') as f:
+            self._mmap: mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._view: memoryview = memoryview(self._mmap)
+
+    @classmethod
+    def open(cls, path: str) -> MappedArchiveFileHandle:
+        """
+        Returns a new handle to the shared mapping of the given file. The file is
+        identified by its real path, inode and modification time, a re-written file
+        will therefore result in a new mapping.
+        """
+        path = os.path.realpath(path)
+        stat = os.stat(path)
+        key = (path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        with cls._lock:
+            mapped = cls._mapped.get(key)
+            if mapped is None:
+                mapped = cls(key, path)
+                cls._mapped[key] = mapped
+            mapped._handles += 1
+
+        return MappedArchiveFileHandle(mapped)
+
+    def _release(self):
+        with MappedArchiveFile._lock:
+            self._handles -= 1
+            if self._handles > 0:
+                return
+
+            MappedArchiveFile._mapped.pop(self._key, None)
+
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # there are still exported slices alive, the mapping
+            # is released when they are garbage collected
+            pass
+
+    def __len__(self):
+        return len(self._mmap)
+
+
+class MappedArchiveFileHandle:
+    """
+    A handle to a :class:`MappedArchiveFile`. It mimics the parts of the file API
+    that are used by the archive items.
+    """
+
+    def __init__(self, mapped: MappedArchiveFile):
+        self._mapped: MappedArchiveFile = mapped
+        self.closed: bool = False
+
+    def view(self, size: int, offset: int) -> memoryview:
+        return self._mapped._view[offset : offset + size]
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._mapped._release()
+
+
 class ArchiveItem:
     def __init__(
-        self, f: BytesIO, offset: int = 0, *, counter: ArchiveReadCounter = None
+        self,
+        f: BytesIO | MappedArchiveFileHandle,
+        offset: int = 0,
+        *,
+        counter: ArchiveReadCounter = None,
     ):
-        self._f: BytesIO = f
+        self._f: BytesIO | MappedArchiveFileHandle = f
         self._offset: int = offset
         # to record how many bytes have been read
         self._counter: ArchiveReadCounter = counter
@@ -422,6 +534,8 @@ class ArchiveItem:
             raise ArchiveError('Archive is closed')
         if self._counter:
             self._counter += size
+        if isinstance(self._f, MappedArchiveFileHandle):
+            return self._f.view(size, offset)
         self._f.seek(offset)
         return self._f.read(size)
 
@@ -479,7 +593,7 @@ class ArchiveList(ArchiveItem):
     def __init__(
         self,
         toc: dict,
-        f: BytesIO,
+        f: BytesIO | MappedArchiveFileHandle,
         offset: int = 0,
         *,
         counter: ArchiveReadCounter = None,
@@ -567,7 +681,7 @@ class ArchiveDict(ArchiveItem):
     def __init__(
         self,
         toc: dict,
-        f: BytesIO,
+        f: BytesIO | MappedArchiveFileHandle,
         offset: int = 0,
         *,
         counter: ArchiveReadCounter = None,
@@ -625,13 +739,32 @@ class ArchiveReader(ArchiveItem):
         file_or_path: str | BytesIO,
         use_blocked_toc: bool = True,
         counter: ArchiveReadCounter = None,
+        use_mmap: bool = None,
+        toc_source: ArchiveReader = None,
     ):
+        """
+        Arguments:
+            file_or_path: The path or file-like of the archive file.
+            use_blocked_toc: Load the top-level TOC in blocks as needed instead of
+                loading it completely on opening.
+            counter: An optional counter to record the number of bytes read.
+            use_mmap: Memory-map the file instead of using buffered reads. Only
+                applies to paths. Defaults to `config.archive.use_mmap`.
+            toc_source: Another reader of the same file. The already decoded top-level
+                TOC (blocks) of this reader are shared instead of being read again.
+        """
         self._file_or_path: str | BytesIO = file_or_path
 
-        if isinstance(self._file_or_path, str):
-            f = open(
-                self._file_or_path, 'rb', buffering=config.archive.read_buffer_size
-            )
+        if use_mmap is None:
+            use_mmap = config.archive.use_mmap
+
+        f: BytesIO | MappedArchiveFileHandle
+        self._buffer_size: int = 0
+        if isinstance(self._file_or_path, str) and use_mmap:
+            f = MappedArchiveFile.open(self._file_or_path)
+        elif isinstance(self._file_or_path, str):
+            self._buffer_size = config.archive.read_buffer_size
+            f = open(self._file_or_path, 'rb', buffering=self._buffer_size)
         elif isinstance(self._file_or_path, BytesIO):
             f = self._file_or_path
         else:
@@ -642,6 +775,17 @@ class ArchiveReader(ArchiveItem):
         self._cache: dict = {}
         self._full_cache: dict = None  # type: ignore
 
+        if toc_source is not None:
+            self._toc_position = toc_source._toc_position
+            self._toc_entry = toc_source._toc_entry
+            self._use_blocked_toc = toc_source._use_blocked_toc
+            if self._use_blocked_toc:
+                self._toc_number = toc_source._toc_number
+                self._toc_offset = toc_source._toc_offset
+                self._toc = toc_source._toc
+                self._toc_block_info = toc_source._toc_block_info
+            return
+
         # this number is determined by the msgpack encoding of the file beginning:
         # { 'toc_pos': <...>
         #              ^11
@@ -830,6 +974,41 @@ class ArchiveReader(ArchiveItem):
         if close_unowned or isinstance(self._file_or_path, str):
             self._f.close()
 
+    def share(self) -> ArchiveReader:
+        """
+        Opens a new reader for the same file that shares the already decoded top-level TOC
+        with this reader. The new reader has its own file handle and entry cache and
+        can be closed independently. Only possible for readers opened from a path.
+        """
+        if not isinstance(self._file_or_path, str):
+            raise ArchiveError('Only readers opened from a path can be shared.')
+
+        return ArchiveReader(
+            self._file_or_path,
+            use_mmap=isinstance(self._f, MappedArchiveFileHandle),
+            toc_source=self,
+        )
+
+    @property
+    def decoded_toc_size(self) -> int:
+        """
+        The approximate number of bytes of the top-level TOC that have been decoded so far.
+        """
+        if not self._use_blocked_toc or self._toc_entry is not None:
+            return self._toc_position[1] - self._toc_position[0]
+
+        return Utility.bytes_per_block * sum(
+            1 for info in self._toc_block_info if info is not None
+        )
+
+    @property
+    def memory_size(self) -> int:
+        """
+        The approximate number of bytes held by this reader, i.e. the buffer of its file
+        and the decoded top-level TOC.
+        """
+        return self._buffer_size + self.decoded_toc_size
+
     def is_closed(self):
         # If the input is a BytesIO, it is assumed that the file is always closed
         # If the input is a path, need to check if the file is closed
@@ -842,6 +1021,125 @@ class ArchiveReader(ArchiveItem):
         return self._full_cache
 
 
+class ArchiveReaderPool:
+    """
+    A process-wide, bounded pool of open archive readers and their decoded top-level TOC.
+
+    Readers are pooled per group (e.g. an upload id) and file. A file is identified
+    by its path and modification time, re-written or renamed files will not hit stale
+    readers. The pool evicts the least recently used readers if there are more than
+    `max_readers` readers or the readers hold more than `max_bytes` (file buffers and
+    decoded TOCs, see :attr:`ArchiveReader.memory_size`). The size of a reader is
+    updated whenever it is opened, as its TOC is decoded over time.
+
+    Pooled readers are never handed out directly. Instead :meth:`open` returns a new
+    reader that shares the decoded TOC (see :meth:`ArchiveReader.share`). It can be
+    used and closed like any other reader.
+    """
+
+    def __init__(self, max_readers: int, max_bytes: int):
+        self.max_readers: int = max_readers
+        self.max_bytes: int = max_bytes
+
+        self._lock = threading.Lock()
+        self._readers: OrderedDict[tuple, ArchiveReader] = OrderedDict()
+        self._sizes: dict[tuple, int] = {}
+        self._bytes: int = 0
+        self._hits: int = 0
+        self._misses: int = 0
+        self._evictions: int = 0
+
+    def open(self, group: str, path: str, use_blocked_toc: bool = True):
+        """
+        Returns a reader for the archive file at the given path. Archive files that
+        are not in the v2 format are opened, but not pooled.
+        """
+        from nomad.archive.storage import read_archive
+
+        if self.max_readers <= 0:
+            return read_archive(path, use_blocked_toc=use_blocked_toc)
+
+        key = (group, path, os.stat(path).st_mtime_ns, use_blocked_toc)
+
+        with self._lock:
+            pooled = self._readers.get(key)
+            if pooled is not None:
+                self._readers.move_to_end(key)
+                self._hits += 1
+                self._update_size(key)
+                self._evict()
+            else:
+                self._misses += 1
+
+        if pooled is not None:
+            return pooled.share()
+
+        reader = read_archive(path, use_blocked_toc=use_blocked_toc)
+        if not isinstance(reader, ArchiveReader):
+            return reader
+
+        shared = reader.share()
+
+        with self._lock:
+            # remove readers for outdated versions of the same file
+            for outdated_key in [
+                k for k in self._readers if k[:2] == key[:2] and k[2] != key[2]
+            ]:
+                self._remove(outdated_key)
+
+            if key in self._readers:
+                # another thread was faster
+                reader.close()
+            else:
+                self._readers[key] = reader
+                self._update_size(key)
+            self._evict()
+
+        return shared
+
+    def _update_size(self, key: tuple):
+        size = self._readers[key].memory_size
+        self._bytes += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+
+    def _remove(self, key: tuple):
+        self._readers.pop(key).close()
+        self._bytes -= self._sizes.pop(key)
+
+    def _evict(self):
+        while len(self._readers) > self.max_readers or (
+            len(self._readers) > 1 and self._bytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._readers)))
+            self._evictions += 1
+
+    def invalidate(self, group: str):
+        """Closes and removes all pooled readers of the given group."""
+        with self._lock:
+            for key in [key for key in self._readers if key[0] == group]:
+                self._remove(key)
+
+    def clear(self):
+        """Closes and removes all pooled readers and resets the metrics."""
+        with self._lock:
+            for key in list(self._readers):
+                self._remove(key)
+            self._hits = self._misses = self._evictions = 0
+
+    def metrics(self) -> dict:
+        """Returns hit/miss counts and the current size of the pool."""
+        with self._lock:
+            total = self._hits + self._misses
+            return dict(
+                hits=self._hits,
+                misses=self._misses,
+                hit_rate=self._hits / total if total else 0.0,
+                evictions=self._evictions,
+                readers=len(self._readers),
+                bytes=self._bytes,
+            )
+
+
 def write_archive(
     path_or_file: str | BytesIO, data: list, toc_depth: int = config.archive.toc_depth
 ):
@@ -60,7 +60,6 @@ from scipy import sparse
 from scipy.spatial import Voronoi  # pylint: disable=no-name-in-module
 from scipy.stats import linregress
 
-from nomad.aflow_prototypes import aflow_prototypes
 from nomad.constants import atomic_masses
 from nomad.metainfo import MSection
 from nomad.units import ureg
@@ -805,6 +804,9 @@ def search_aflow_prototype(space_group: int, norm_wyckoff: dict) -> dict:
     Returns:
         Dictionary containing the AFLOW prototype information.
     """
+    # the prototype library is large, only load it once it is needed
+    from nomad.aflow_prototypes import aflow_prototypes
+
     structure_type_info = None
     type_descriptions: Any = aflow_prototypes['prototypes_by_spacegroup'].get(
         space_group, []
@@ -22,7 +22,8 @@ from .admin import admin
 
 
 @admin.command(
-    help='Checks consistency of files and es vs mongo and deletes orphan entries.'
+    help='Checks consistency of files and es vs mongo and deletes orphan entries and '
+    'expired chunked uploads.'
 )
 @click.option('--dry', is_flag=True, help='Do not delete anything, just check.')
 @click.option(
@@ -43,6 +44,7 @@ def clean(dry, skip_entries, skip_fs, skip_es, staging_too, force):
     import elasticsearch_dsl
 
     from nomad import infrastructure, processing
+    from nomad.files import delete_expired_chunked_uploads
     from nomad.config import config as nomad_config
     from nomad.search import delete_by_query
     from nomad.search import quantity_values
@@ -123,6 +125,12 @@ def clean(dry, skip_entries, skip_fs, skip_es, staging_too, force):
             for path in to_delete[:10]:
                 print(path)
 
+        expired_chunked_uploads = delete_expired_chunked_uploads(dry=dry)
+        print(
+            '%s %d expired chunked uploads.'
+            % ('Found' if dry else 'Deleted', len(expired_chunked_uploads))
+        )
+
     if staging_too and not skip_fs:
         to_delete = list(
             path for upload, path in staging_dirs.items() if upload in public_dirs
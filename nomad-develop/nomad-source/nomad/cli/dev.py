@@ -22,7 +22,6 @@ import os
 import click
 
 from nomad.config import config
-from nomad.metainfo.elasticsearch_extension import schema_separator
 from .cli import cli
 
 
@@ -117,7 +116,11 @@ def metainfo():
 
 def _generate_search_quantities():
     # Currently only quantities with "entry_type" are included.
-    from nomad.metainfo.elasticsearch_extension import entry_type, Elasticsearch
+    from nomad.metainfo.elasticsearch_extension import (
+        entry_type,
+        Elasticsearch,
+        schema_separator,
+    )
     from nomad.datamodel import EntryArchive
 
     def to_dict(search_quantity, section=False, repeats=False):
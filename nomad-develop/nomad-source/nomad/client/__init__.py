@@ -17,6 +17,7 @@
 #
 
 from .archive import ArchiveQuery
+from .cache import ArchiveCache
 from .api import Auth
 from .upload import upload_file
 from .processing import LocalEntryProcessing, parse, normalize, normalize_all
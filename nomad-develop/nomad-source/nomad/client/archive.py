@@ -18,9 +18,12 @@
 from __future__ import annotations
 
 import asyncio
+import json
+import queue
 from asyncio import Semaphore
+from collections import deque
 from itertools import islice
-from typing import Any, Union
+from typing import Any, AsyncIterator, Callable, Iterator, Union
 from math import floor
 from time import monotonic
 import threading
@@ -33,6 +36,7 @@ from nomad import metainfo as mi
 from nomad.config import config
 from nomad.datamodel import EntryArchive, ClientContext
 from nomad.utils import dict_to_dataframe
+from .cache import ArchiveCache, required_hash
 
 
 class RunThread(threading.Thread):
@@ -63,6 +67,63 @@ def run_async(func, *args, **kwargs):
         return asyncio.run(func(*args, **kwargs))
 
 
+_iteration_done = object()
+
+
+def iterate_async(func, *args, **kwargs) -> Iterator:
+    """
+    Iterates over the async generator created by `func` from synchronous code.
+
+    The generator runs in its own event loop on a separate thread. Only one item is
+    handed over at a time, and the generator is only resumed after the consumer took
+    the item. If the consumer stops early, the generator is closed at the yield of the
+    item that was not taken.
+    """
+    items: queue.Queue = queue.Queue(maxsize=1)
+    taken = threading.Semaphore(0)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        while not stop.is_set():
+            if taken.acquire(timeout=0.1):
+                return True
+        return False
+
+    async def produce():
+        generator = func(*args, **kwargs)
+        error = None
+        try:
+            async for item in generator:
+                if not await asyncio.to_thread(put, (item, None)):
+                    return
+        except Exception as e:
+            error = e
+        finally:
+            await generator.aclose()
+        await asyncio.to_thread(put, (_iteration_done, error))
+
+    thread = threading.Thread(target=asyncio.run, args=(produce(),), daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            taken.release()
+            if item is _iteration_done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
 def _collect(
     required, parent_section: mi.Section = None, parent_path: str = None
 ) -> set:
@@ -138,6 +199,8 @@ class ArchiveQuery:
         sleep_time (float): sleep time for retry, default: 4.
         semaphore (int): number of concurrent downloads, this depends on server settings, default: 4
         max_requests_per_second (int): maximum requests per second, default: 999999
+        cache (bool or ArchiveCache): keep downloaded archives in a local on-disk cache,
+            `True` uses an `ArchiveCache` with the configured defaults, default: False
     """
 
     def __init__(
@@ -157,6 +220,7 @@ class ArchiveQuery:
         from_api: bool = False,
         semaphore: int = 8,
         max_requests_per_second: int = 20,
+        cache: Union[bool, ArchiveCache] = False,
     ):
         self._owner: str = owner
         self._required = required if required is not None else '*'
@@ -181,6 +245,13 @@ class ArchiveQuery:
         self._start_time: float = 0.0
         self._accumulated_requests: int = 0
 
+        if cache is True:
+            cache = ArchiveCache()
+        self._cache: ArchiveCache = cache if cache else None
+        self._required_hash: str = required_hash(self._required)
+        # the last update of uploads is only checked once per download call
+        self._last_updates: dict[str, asyncio.Future] = {}
+
         from nomad.client import Auth
 
         self._auth = Auth(user=username, password=password, from_api=from_api)
@@ -191,8 +262,9 @@ class ArchiveQuery:
             client_id=config.keycloak.client_id,
         )
 
-        # local data storage
-        self._entries: list[tuple[str, str]] = []
+        # local data storage, pending entries are kept in an insertion ordered dict
+        # to allow removing downloaded entries in constant time
+        self._entries: dict[tuple[str, str], None] = {}
         self._entries_dict: list[dict] = []
         self._current_after: str = self._after
         self._current_results: int = 0
@@ -216,6 +288,10 @@ class ArchiveQuery:
     def _download_url(self) -> str:
         return f'{self._url}/entries/archive/query'
 
+    @property
+    def _uploads_url(self) -> str:
+        return f'{self._url}/uploads'
+
     @property
     def _fetch_request(self) -> dict:
         """
@@ -257,7 +333,7 @@ class ArchiveQuery:
         Clear all fetched and downloaded data. Users can then call .fetch() and .download() again.
         """
 
-        self._entries = []
+        self._entries = {}
         self._entries_dict = []
         self._current_after = self._after
         self._current_results = 0
@@ -358,13 +434,13 @@ class ArchiveQuery:
                     # current query has sufficient entries to exceed the limit
                     data = data[: self._actual_max - self._current_results]
                     self._current_results += len(data)
-                    self._entries.extend(data)
+                    self._add_entries(data)
                     break
                 else:
                     # current query should be added
                     num_entry += current_size
                     self._current_results += current_size
-                    self._entries.extend(data)
+                    self._add_entries(data)
 
                     # if exceeds the required number, exit
                     # `self._current_after` is automatically set
@@ -378,22 +454,43 @@ class ArchiveQuery:
 
         return num_entry
 
-    async def _download_async(self, number: int) -> list[EntryArchive]:
+    def _add_entries(self, ids: list[tuple[str, str]]):
+        """
+        Add entries to the end of the pending entries.
+        """
+        self._entries.update(dict.fromkeys(ids))
+
+    def _take_entries(self, number: int) -> list[tuple[str, str]]:
+        """
+        Remove and return the first `number` pending entries.
+        """
+        ids = list(islice(self._entries, number))
+        for item in ids:
+            del self._entries[item]
+        return ids
+
+    async def _download_async(
+        self, number: int, callback: Callable[[EntryArchive], Any] = None
+    ) -> list[EntryArchive]:
         """
         Download required entries asynchronously.
 
         Params:
             number (int): number of **entries** to download
+            callback (Callable): called with each EntryArchive as soon as it is received
 
         Returns:
             A list of EntryArchive
         """
         semaphore = Semaphore(self._semaphore)
 
-        actual_number: int = min(number, len(self._entries))
+        ids = self._take_entries(number)
+        contexts: dict[str, ClientContext] = {}
+        failed: list[tuple[str, str]] = []
 
         self._start_time = monotonic()
         self._accumulated_requests = 0
+        self._last_updates = {}
 
         def batched(iterable, chunk_size):
             iterator = iter(iterable)
@@ -401,26 +498,139 @@ class ArchiveQuery:
                 yield chunk
 
         with progressbar(  # type: ignore
-            length=actual_number, label=f'Downloading {actual_number} entries...'
+            length=len(ids), label=f'Downloading {len(ids)} entries...'
         ) as bar:
             async with AsyncClient(timeout=Timeout(timeout=300)) as session:
                 tasks = [
-                    asyncio.create_task(self._acquire(ids, session, semaphore, bar))
-                    for ids in batched(self._entries[:actual_number], self._batch_size)
+                    asyncio.create_task(
+                        self._acquire(
+                            batch, session, semaphore, bar, callback, contexts, failed
+                        )
+                    )
+                    for batch in batched(ids, self._batch_size)
                 ]
-                results = await asyncio.gather(*tasks)
+                try:
+                    results = await asyncio.gather(*tasks)
+                finally:
+                    self._add_entries(failed)
 
         return [archive for result in results if result for archive in result]
 
+    async def _iter_download_async(
+        self, number: int, prefetch: int = None
+    ) -> AsyncIterator[list[EntryArchive]]:
+        """
+        Download required entries asynchronously and yield them batch by batch in the
+        order of the pending entries. At most `prefetch` batches are requested ahead of
+        the consumer. Further entries are fetched lazily when the pending entries run
+        out.
+
+        Params:
+            number (int): number of **entries** to download, 0 for all
+            prefetch (int): number of batches to request ahead, defaults to `semaphore`
+
+        Returns:
+            An async iterator over lists of EntryArchive
+        """
+        prefetch = prefetch if prefetch and prefetch > 0 else self._semaphore
+        semaphore = Semaphore(self._semaphore)
+        contexts: dict[str, ClientContext] = {}
+        failed: list[tuple[str, str]] = []
+        tasks: deque = deque()
+        remaining: int = number
+        exhausted: bool = False
+
+        self._start_time = monotonic()
+        self._accumulated_requests = 0
+        self._last_updates = {}
+
+        async with AsyncClient(timeout=Timeout(timeout=300)) as session:
+            try:
+                while True:
+                    while len(tasks) < prefetch and (number == 0 or remaining > 0):
+                        if len(self._entries) < self._batch_size and not exhausted:
+                            fetched = await self._fetch_async(
+                                prefetch * self._batch_size
+                            )
+                            exhausted = fetched == 0 or self._current_after is None
+
+                        size = self._batch_size
+                        if number > 0:
+                            size = min(size, remaining)
+                        ids = self._take_entries(size)
+                        if not ids:
+                            break
+
+                        remaining -= len(ids)
+                        task = asyncio.create_task(
+                            self._acquire(
+                                ids,
+                                session,
+                                semaphore,
+                                contexts=contexts,
+                                failed=failed,
+                            )
+                        )
+                        tasks.append((ids, task))
+
+                    if not tasks:
+                        break
+
+                    _, task = tasks[0]
+                    results = await task
+                    if results:
+                        yield results
+                    # the batch is only done, once the consumer asks for the next one
+                    tasks.popleft()
+            finally:
+                for _, task in tasks:
+                    task.cancel()
+                await asyncio.gather(
+                    *(task for _, task in tasks), return_exceptions=True
+                )
+                # The entries of batches that were not handed over are downloaded again
+                # later and in order, regardless of the state of their download.
+                # Entries that were already retried are only added once.
+                pending = [id for ids, _ in tasks for id in ids]
+                self._entries = {**dict.fromkeys(pending), **self._entries}
+                self._add_entries(failed)
+
+    async def _upload_last_update(
+        self, session: AsyncClient, upload_id: str
+    ) -> str | None:
+        """
+        Returns the last update of the given upload, which is used to validate the
+        cached archives. Each upload is only queried once per download call.
+        """
+
+        async def fetch():
+            response = await session.get(
+                f'{self._uploads_url}/{upload_id}', headers=self._auth.headers()
+            )
+            if response.status_code != 200:
+                return None
+            return response.json()['data'].get('last_update')
+
+        last_update = self._last_updates.get(upload_id)
+        if last_update is None:
+            last_update = asyncio.ensure_future(fetch())
+            self._last_updates[upload_id] = last_update
+
+        return await asyncio.shield(last_update)
+
     async def _acquire(
         self,
         ids: list[tuple[str, str]],
         session: AsyncClient,
         semaphore: Semaphore,
-        bar,
+        bar=None,
+        callback: Callable[[EntryArchive], Any] = None,
+        contexts: dict[str, ClientContext] = None,
+        failed: list[tuple[str, str]] = None,
     ) -> list[EntryArchive] | None:
         """
-        Perform the download task.
+        Perform the download task. The archives are streamed as newline delimited JSON
+        and each entry is processed as soon as its line is received.
 
         Params:
             ids (list[tuple[str, str]]): a list of tuples of entry id and upload id
@@ -429,51 +639,147 @@ class ArchiveQuery:
 
             semaphore (asyncio.Semaphore): semaphore
 
+            callback (Callable): called with each EntryArchive as soon as it is received
+
+            contexts (dict): the client contexts by upload id shared between tasks
+
+            failed (list): collects the ids of failed or cancelled requests, if not
+                given, they are directly added to the pending entries again
+
         Returns:
             A list of EntryArchive
         """
-        entry_ids = [x for x, _ in ids]
+        if contexts is None:
+            contexts = {}
 
-        request = self._download_request(entry_ids)
+        # ids of the archives that were passed to the callback
+        delivered: set = set()
 
-        async with semaphore:
-            while self._accumulated_requests > self._allowed_requests:
-                await asyncio.sleep(0.1)
+        def to_archive(archive: dict, entry_id: str, upload_id: str) -> EntryArchive:
+            context = contexts.get(upload_id)
+            if context is None:
+                context = ClientContext(
+                    self._url, upload_id=upload_id, auth=self._auth, cache=self._cache
+                )
+                contexts[upload_id] = context
+            result = EntryArchive.m_from_dict(archive, m_context=context)
+
+            if callback is not None:
+                callback(result)
+            delivered.add(entry_id)
+
+            return result
+
+        def retry_later():
+            retry_ids = [x for x in ids if x[0] not in delivered]
+            if failed is None:
+                self._add_entries(retry_ids)
+            else:
+                failed.extend(retry_ids)
+
+        try:
+            async with semaphore:
+                while self._accumulated_requests > self._allowed_requests:
+                    await asyncio.sleep(0.1)
+
+                results: list = []
+                last_updates: dict = {}
+                missing = ids
+                if self._cache is not None:
+                    missing = []
+                    for entry_id, upload_id in ids:
+                        last_update = await self._upload_last_update(session, upload_id)
+                        last_updates[upload_id] = last_update
+                        archive = await asyncio.to_thread(
+                            self._cache.get, entry_id, self._required_hash, last_update
+                        )
+                        if archive is None:
+                            missing.append((entry_id, upload_id))
+                        else:
+                            results.append(to_archive(archive, entry_id, upload_id))
 
-            self._accumulated_requests += 1
+                    if not missing:
+                        if bar is not None:
+                            bar.update(len(ids))
+                        return results
 
-            response = await session.post(
-                self._download_url, json=request, headers=self._auth.headers()
-            )
-            bar.update(len(entry_ids))
-            for item in ids:
-                self._entries.remove(item)
+                entry_ids = [x for x, _ in missing]
+                request = self._download_request(entry_ids)
 
-            if response.status_code >= 400:
-                print(
-                    f'Request returns {response.status_code}, will retry in the next download call...'
-                )
-                self._entries.extend(ids)
-                return None
-
-            # successfully downloaded data
-            results: list = []
+                self._accumulated_requests += 1
 
-            response_json: list = response.json()['data']
+                headers = dict(self._auth.headers(), Accept='application/x-ndjson')
+                async with session.stream(
+                    'POST', self._download_url, json=request, headers=headers
+                ) as response:
+                    if bar is not None:
+                        bar.update(len(ids))
 
-            for index in range(len(ids)):
-                entry_id, upload_id = ids[index]
-                context = ClientContext(self._url, upload_id=upload_id, auth=self._auth)
-                result = EntryArchive.m_from_dict(
-                    response_json[index]['archive'], m_context=context
-                )
+                    if response.status_code >= 400:
+                        print(
+                            f'Request returns {response.status_code}, will retry in the next download call...'
+                        )
+                        retry_later()
+                        return None
+
+                    # successfully downloaded data
+                    received: set = set()
+
+                    async def add_entry(entry: dict):
+                        upload_id = entry['upload_id']
+                        if self._cache is not None:
+                            await asyncio.to_thread(
+                                self._cache.put,
+                                entry['entry_id'],
+                                upload_id,
+                                self._required_hash,
+                                last_updates.get(upload_id),
+                                entry['archive'],
+                            )
+
+                        received.add(entry['entry_id'])
+                        results.append(
+                            to_archive(entry['archive'], entry['entry_id'], upload_id)
+                        )
 
-                if not result:
-                    print(f'No result returned for id {entry_id}, is the query proper?')
+                    content_type = response.headers.get('content-type', '')
+                    if not content_type.startswith('application/x-ndjson'):
+                        # servers without streaming support respond with plain json
+                        for entry in json.loads(await response.aread())['data']:
+                            await add_entry(entry)
+                        complete = True
+                    else:
+                        # only the last line (without error) completes the response
+                        complete = False
+                        async for line in response.aiter_lines():
+                            if not line.strip():
+                                continue
+
+                            entry = json.loads(line)
+                            if 'entry_id' in entry:
+                                await add_entry(entry)
+                            elif 'detail' in entry:
+                                print(f'Request failed: {entry["detail"]}')
+                                break
+                            else:
+                                complete = True
+
+                    if not complete:
+                        print(
+                            'Response is incomplete, will retry the missing entries '
+                            'in the next download call...'
+                        )
+                        retry_later()
+                        return results
+        except asyncio.CancelledError:
+            retry_later()
+            raise
 
-                results.append(result)
+        for entry_id in entry_ids:
+            if entry_id not in received:
+                print(f'No result returned for id {entry_id}, is the query proper?')
 
-            return results
+        return results
 
     def fetch(self, number: int = 0) -> int:
         """
@@ -490,13 +796,18 @@ class ArchiveQuery:
 
         return run_async(self._fetch_async, number)
 
-    def download(self, number: int = 0) -> list[EntryArchive]:
+    def download(
+        self, number: int = 0, callback: Callable[[EntryArchive], Any] = None
+    ) -> list[EntryArchive]:
         """
         Download fetched entries from remote.
         Automatically call .fetch() if not fetched.
 
         Params:
             number (int): number of **entries** to download at a single time
+            callback (Callable): called with each downloaded EntryArchive as soon as it
+                is received, this allows to process entries while the download is
+                still running
 
         Returns:
             A list of downloaded EntryArchive
@@ -515,7 +826,7 @@ class ArchiveQuery:
             # if not sufficient fetched entries, fetch first
             self.fetch(number - pending_size)
 
-        async_query = run_async(self._download_async, number)
+        async_query = run_async(self._download_async, number, callback)
         self._entries_dict.append(async_query)
         return async_query
 
@@ -528,7 +839,9 @@ class ArchiveQuery:
 
         return await self._fetch_async(number)
 
-    async def async_download(self, number: int = 0) -> list[EntryArchive]:
+    async def async_download(
+        self, number: int = 0, callback: Callable[[EntryArchive], Any] = None
+    ) -> list[EntryArchive]:
         """
         Asynchronous interface for use in a running event loop.
         """
@@ -546,10 +859,79 @@ class ArchiveQuery:
             # if not sufficient fetched entries, fetch first
             await self.async_fetch(number - pending_size)
 
-        return await self._download_async(number)
+        return await self._download_async(number, callback)
+
+    def iter_download(
+        self, number: int = 0, prefetch: int = None
+    ) -> Iterator[EntryArchive]:
+        """
+        Download entries from remote and yield them one by one as they are received.
+        Entries are fetched lazily as needed. Different from .download(), the archives
+        are not kept by the query, only the archives of at most `prefetch` batches are
+        held in memory at any time. If the iteration is stopped early, the entries of
+        all batches that were not started remain in the `entry_list()`.
+
+        Params:
+            number (int): number of **entries** to download, 0 for all entries up to
+                `results_max`
+            prefetch (int): number of batches requested ahead of the consumer,
+                defaults to `semaphore`
+
+        Returns:
+            An iterator over the downloaded EntryArchive
+        """
+
+        for batch in iterate_async(self._iter_download_async, number, prefetch):
+            yield from batch
+
+    async def async_iter_download(
+        self, number: int = 0, prefetch: int = None
+    ) -> AsyncIterator[EntryArchive]:
+        """
+        Asynchronous interface of .iter_download() for use in a running event loop.
+        """
+
+        batches = self._iter_download_async(number, prefetch)
+        try:
+            async for batch in batches:
+                for archive in batch:
+                    yield archive
+        finally:
+            await batches.aclose()
+
+    def iter_dataframes(
+        self,
+        number: int = 0,
+        keys_to_filter: list[str] = None,
+        resolve_references: bool = False,
+        prefetch: int = None,
+    ):
+        """
+        Download entries like .iter_download(), but yield one pandas dataframe for
+        each downloaded batch of `batch_size` entries.
+
+        Params:
+            number (int): number of **entries** to download, 0 for all entries up to
+                `results_max`
+            keys_to_filter (list[str]): the keys to keep in the dataframes
+            resolve_references (bool): boolean if the references are to be resolved
+            prefetch (int): number of batches requested ahead of the consumer,
+                defaults to `semaphore`
+
+        Returns:
+            An iterator over pandas dataframes
+        """
+        for batch in iterate_async(self._iter_download_async, number, prefetch):
+            yield dict_to_dataframe(
+                [
+                    archive.m_to_dict(resolve_references=resolve_references)
+                    for archive in batch
+                ],
+                keys_to_filter=keys_to_filter if keys_to_filter else [],
+            )
 
     def entry_list(self) -> list[tuple[str, str]]:
-        return self._entries
+        return list(self._entries)
 
     def entries_to_dataframe(
         self,
@@ -0,0 +1,185 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from time import time
+
+import msgpack
+
+from nomad import utils
+from nomad.config import config
+
+
+def required_hash(required) -> str:
+    """Creates a hash for the given `required` specification of an archive request."""
+    return utils.hash(json.dumps(required, sort_keys=True))
+
+
+class ArchiveCache:
+    """
+    A local on-disk cache for archives downloaded with the client. The archives are
+    stored as msgpack in a SQLite database. They are keyed by entry id and the hash of
+    the `required` specification, and are only valid for the `last_update` of their
+    upload at the time of download. If the upload has changed since, the archives are
+    considered stale and are downloaded again.
+
+    If the total size of all cached archives exceeds `max_size`, the least recently
+    used archives are evicted.
+
+    Arguments:
+        directory: The directory for the cache database, default is taken from
+            ``config.client.archive_cache_dir``
+        max_size: The maximum size of all cached archives in bytes, default is taken
+            from ``config.client.archive_cache_max_size``
+    """
+
+    def __init__(self, directory: str = None, max_size: int = None):
+        if directory is None:
+            directory = config.client.archive_cache_dir
+        if directory is None:
+            directory = os.path.join(os.path.expanduser('~'), '.cache', 'nomad')
+        self.max_size = (
+            max_size if max_size is not None else config.client.archive_cache_max_size
+        )
+
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, 'archives.sqlite')
+
+        # the cache is also used from the threads running the async downloads
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS archives (
+                    entry_id TEXT NOT NULL,
+                    required_hash TEXT NOT NULL,
+                    upload_id TEXT,
+                    last_update TEXT,
+                    size INTEGER NOT NULL,
+                    accessed REAL NOT NULL,
+                    data BLOB NOT NULL,
+                    PRIMARY KEY (entry_id, required_hash)
+                )
+                """
+            )
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS archives_accessed ON archives (accessed)'
+            )
+            (self._size,) = self._connection.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM archives'
+            ).fetchone()
+
+    def get(self, entry_id: str, required_hash: str, last_update: str) -> dict | None:
+        """
+        Returns the cached archive as dict, or None if it is not cached or stale.
+        """
+        if last_update is None:
+            return None
+
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                'SELECT data FROM archives '
+                'WHERE entry_id = ? AND required_hash = ? AND last_update = ?',
+                (entry_id, required_hash, last_update),
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._connection.execute(
+                'UPDATE archives SET accessed = ? '
+                'WHERE entry_id = ? AND required_hash = ?',
+                (time(), entry_id, required_hash),
+            )
+
+        return msgpack.unpackb(row[0])
+
+    def put(
+        self,
+        entry_id: str,
+        upload_id: str,
+        required_hash: str,
+        last_update: str,
+        archive: dict,
+    ):
+        """
+        Adds the given archive dict to the cache, replacing any stale version.
+        """
+        if last_update is None:
+            return
+
+        data = msgpack.packb(archive, use_bin_type=True)
+
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                'SELECT size FROM archives WHERE entry_id = ? AND required_hash = ?',
+                (entry_id, required_hash),
+            ).fetchone()
+            if row is not None:
+                self._size -= row[0]
+
+            self._connection.execute(
+                'INSERT OR REPLACE INTO archives VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (
+                    entry_id,
+                    required_hash,
+                    upload_id,
+                    last_update,
+                    len(data),
+                    time(),
+                    data,
+                ),
+            )
+            self._size += len(data)
+
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        # Evicts down to 90% of the maximum size, to avoid evicting on every put. The
+        # size is recomputed, because other processes might share the cache.
+        (self._size,) = self._connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM archives'
+        ).fetchone()
+        target_size = int(self.max_size * 0.9)
+
+        evicted: list = []
+        for entry_id, required_hash, size in self._connection.execute(
+            'SELECT entry_id, required_hash, size FROM archives ORDER BY accessed'
+        ):
+            if self._size <= target_size:
+                break
+            evicted.append((entry_id, required_hash))
+            self._size -= size
+
+        self._connection.executemany(
+            'DELETE FROM archives WHERE entry_id = ? AND required_hash = ?', evicted
+        )
+
+    def clear(self):
+        """Removes all cached archives."""
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM archives')
+            self._size = 0
+
+    def close(self):
+        self._connection.close()
@@ -107,8 +107,13 @@ def normalize_all(entry_archive, logger=None):
     if entry_archive.metadata:
         entry_domain = entry_archive.metadata.domain
     for normalizer in normalizing.normalizers:
-        if normalizer.domain is None or normalizer.domain == entry_domain:
-            normalize(normalizer, entry_archive, logger=logger)
+        if normalizer.domain is not None and normalizer.domain != entry_domain:
+            continue
+        if normalizer.reads is not None and not normalizing.has_any_section(
+            entry_archive, normalizer.reads
+        ):
+            continue
+        normalize(normalizer, entry_archive, logger=logger)
 
 
 class LocalEntryProcessing:
@@ -148,6 +148,27 @@ class Services(ConfigBaseModel):
     h5grove_enabled = Field(
         True, description="""If true the app will serve the h5grove API."""
     )
+    h5grove_file_pool_size: int = Field(
+        32,
+        description="""
+        The number of HDF5 files that each h5grove app process keeps open between
+        requests. Use 0 to open the files for each request.
+    """,
+    )
+    h5grove_cache_ttl: int = Field(
+        60,
+        description="""
+        The time in seconds that the h5grove app keeps idle HDF5 files open and
+        caches granted upload access.
+    """,
+    )
+    h5grove_file_max_age: int = Field(
+        600,
+        description="""
+        The maximum time in seconds that the h5grove app keeps a HDF5 file open, even
+        if it is used continuously.
+    """,
+    )
 
     console_log_level: Union[int, str] = Field(
         logging.WARNING,
@@ -164,6 +185,15 @@ class Services(ConfigBaseModel):
         amount, the user cannot add more uploads.
     """,
     )
+    chunked_upload_expiry: int = Field(
+        24 * 3600,
+        description="""
+        The time in seconds after which chunked uploads that did not receive any data
+        are considered abandoned. Expired chunked uploads are deleted from
+        `fs.tmp/chunked_uploads` when a new chunked upload is started and by
+        `nomad admin clean`.
+    """,
+    )
     force_raw_file_decoding = Field(
         False,
         description="""
@@ -183,6 +213,30 @@ class Services(ConfigBaseModel):
         Page-after-value-based pagination is independent and can be used without limitations.
     """,
     )
+    archive_read_threads = Field(
+        4,
+        description="""
+        The number of threads per API process that are used to read archives when
+        answering archive queries. Reading archives is blocking I/O and decoding, which
+        is moved off the event loop and parallelized with these threads.
+    """,
+    )
+    user_group_cache_size = Field(
+        4096,
+        description="""
+        The maximum number of users for which the ids of their user groups are cached
+        per process. The cache is used to build the access filters of searches and
+        upload lists.
+    """,
+    )
+    user_group_cache_ttl = Field(
+        60,
+        description="""
+        The time in seconds that cached user group ids are valid. Changes to groups
+        invalidate the cache of the process that made the change; other processes see
+        the change after this time. Use 0 to disable the cache.
+    """,
+    )
     unavailable_value = Field(
         'unavailable',
         description="""
@@ -407,6 +461,20 @@ class Elastic(ConfigBaseModel):
     timeout = 60
     bulk_timeout = 600
     bulk_size = 1000
+    bulk_max_bytes: int = Field(
+        10 * 1024 * 1024,
+        description='The maximum size of a bulk index request body in bytes.',
+    )
+    bulk_concurrency: int = Field(
+        4, description='The number of bulk index requests that are sent concurrently.'
+    )
+    bulk_retries: int = Field(
+        3,
+        description="""
+            How often items of a bulk request that failed with a temporary error
+            (e.g. rejected due to a full queue) are sent again.
+        """,
+    )
     entries_per_material_cap = 1000
     entries_index = 'nomad_entries_v1'
     materials_index = 'nomad_materials_v1'
@@ -537,6 +605,38 @@ class Normalize(ConfigBaseModel):
             ),
         )
     )
+    external_api_backend: str = Field(
+        None,
+        description="""
+        The qualified name of a `nomad.datamodel.external_api.ExternalAPIBackend`
+        subclass that answers the requests to external APIs (e.g. PubChem, CAS), for
+        example from a local mirror. The default requests the public services.
+    """,
+    )
+    external_api_cache_file: str = Field(
+        None,
+        description="""
+        The SQLite file that caches the responses of external APIs. The default is
+        `external_api_cache.sqlite` in `fs.local_tmp`. The file should be on a local
+        file system, because SQLite's file locking is not reliable on network file
+        systems.
+    """,
+    )
+    external_api_cache_ttl: int = Field(
+        30 * 24 * 3600,
+        description="""
+        The time in seconds after which cached responses of external APIs are
+        requested again. Expired responses are still used, if the external API cannot
+        be reached. Use 0 to disable the cache.
+    """,
+    )
+    external_api_retry_interval: int = Field(
+        60,
+        description="""
+        The time in seconds without further requests to an external API after a
+        request failed to connect.
+    """,
+    )
     system_classification_with_clusters_threshold = Field(
         64,
         description="""
@@ -657,6 +757,20 @@ class Client(ConfigBaseModel):
     password: str = None
     access_token: str = None
     url = 'http://nomad-lab.eu/prod/v1/api'
+    archive_cache_dir: str = Field(
+        None,
+        description="""
+        The directory of the on-disk archive cache that can be enabled for
+        `ArchiveQuery`. The default is `~/.cache/nomad`.
+    """,
+    )
+    archive_cache_max_size: int = Field(
+        1024**3,
+        description="""
+        The maximum size of all cached archives in bytes. The least recently used
+        archives are evicted, if the cache grows beyond this size.
+    """,
+    )
 
 
 class DataCite(ConfigBaseModel):
@@ -692,6 +806,55 @@ class Process(ConfigBaseModel):
     metadata_file_extensions = ('json', 'yaml', 'yml')
     auxfile_cutoff = 100
     parser_matching_size = 150 * 80  # 150 lines of 80 ASCII characters per line
+    parser_matching_threads: int = Field(
+        4,
+        description="""
+        The number of threads used to match the files of an upload against the parsers.
+        Matching is mostly file IO and the results are still yielded in the order of the
+        files. Use 1 to match all files sequentially.
+    """,
+    )
+    entry_batch_size: int = Field(
+        1,
+        description="""
+        The maximum number of entries that are processed one after another in a single
+        celery task. Batching saves the broker and mongo overhead of one task per entry
+        for uploads with many small entries. Use 1 to process each entry in its own task.
+    """,
+    )
+    entry_batch_max_bytes: int = Field(
+        10 * 1024**2,
+        description="""
+        The maximum accumulated mainfile size of an entry batch. Entries with a larger
+        mainfile are processed in their own task.
+    """,
+    )
+    join_recount_threshold: int = Field(
+        10,
+        description="""
+        Parent processes count their pending child processes. Completing children only
+        check if all children are done and the parent can join, when at most this many
+        children are pending. Higher values make the join more robust against lost
+        counts, but cost a query over all children per completed child.
+    """,
+    )
+    join_recount_interval: int = Field(
+        600,
+        description="""
+        The time in seconds after which a waiting parent process that counts its child
+        processes recounts them and tries to join, regardless of the pending children
+        count. This prevents lost counts from keeping the parent waiting forever.
+    """,
+    )
+    schema_cache_size: int = Field(
+        100,
+        description="""
+        The number of initialized schema packages that each process keeps in memory
+        and shares between entries and API requests. Packages are cached by their
+        section definition id or by the content of their raw schema file. The least
+        recently used packages are evicted. Use 0 to disable the cache.
+    """,
+    )
     max_upload_size = 32 * (1024**3)
     use_empty_parsers = False
     redirect_stdouts: bool = Field(
@@ -717,6 +880,18 @@ class Reprocess(ConfigBaseModel):
     add_matched_entries_to_published = True
     delete_unmatched_published_entries = False
     index_individual_entries = False
+    only_changed_files: bool = Field(
+        False,
+        description="""
+            If only entries affected by changed raw files should be reprocessed. Only
+            applies to uploads in staging. The changes are determined by comparing the
+            raw files with a manifest of content hashes stored by the last processing
+            with this setting. Entries are affected if their mainfile, a file they read
+            during processing, or (depending on the parser) a file in the mainfile's
+            directory changed. Unsuccessful entries are always reprocessed. Without
+            a manifest, or if a metadata file changed, everything is reprocessed.
+        """,
+    )
 
 
 class RFC3161Timestamp(ConfigBaseModel):
@@ -877,6 +1052,36 @@ class Archive(ConfigBaseModel):
         1 * 2**20,
         description='GPFS needs at least 256K to achieve decent performance.',
     )
+    use_mmap = Field(
+        False,
+        description="""
+        If enabled, archive files are memory-mapped instead of read with buffered file reads.
+        Data is unpacked directly from slices of the mapping and all readers of the same
+        file share one mapping. This avoids a syscall and a copy for each read.
+        """,
+    )
+    reader_pool_size = Field(
+        64,
+        description="""
+        The maximum number of archive files that are kept open per process together with their
+        already decoded table of contents. Use 0 to disable the pool.
+        """,
+    )
+    reader_pool_max_bytes = Field(
+        256 * 2**20,
+        description="""
+        The approximate maximum size of all pooled readers, i.e. their file buffers
+        (see `read_buffer_size`) and decoded table of contents.
+        """,
+    )
+    pack_read_ahead_size = Field(
+        64 * 2**20,
+        description="""
+        The maximum number of bytes of entry archive files that are read ahead in the
+        background, when the archives of an upload are packed. Files larger than this
+        are read one at a time.
+        """,
+    )
     copy_chunk_size = Field(
         16 * 2**20,
         description="""
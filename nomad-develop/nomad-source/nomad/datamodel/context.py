@@ -16,11 +16,15 @@
 # limitations under the License.
 #
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Set, Tuple
 from urllib.parse import urlsplit, urlunsplit
+import hashlib
+import io
 import re
 import os.path
+import threading
 import requests
+from cachetools import LRUCache
 
 from nomad import utils
 from nomad.config import config
@@ -36,6 +40,71 @@ from nomad.metainfo import (
 from nomad.datamodel import EntryArchive
 
 
+# Initialized schemas shared by all contexts of this process. Keys either contain
+# definition ids or content hashes, values are schema archives or packages. Only
+# schemas that do not reference other files are shared, because the keys do not cover
+# the content of referenced files. The cached values are never bound to the contexts
+# that use them (see :func:`_share_schema`).
+_schema_cache: LRUCache = LRUCache(maxsize=max(config.process.schema_cache_size, 1))
+_schema_cache_lock = threading.Lock()
+
+
+def _get_cached_schema(key: tuple):
+    if config.process.schema_cache_size <= 0:
+        return None
+    with _schema_cache_lock:
+        return _schema_cache.get(key)
+
+
+def _cache_schema(key: tuple, value):
+    if config.process.schema_cache_size <= 0:
+        return
+    with _schema_cache_lock:
+        _schema_cache[key] = value
+
+
+def _share_schema(key: tuple, schema: MSection, definitions: MSection):
+    """
+    Puts an initialized schema into the cache. The references in its definitions are
+    resolved through the context that loaded the schema, before the schema is moved to
+    the shared schema context. This context does not load or cache anything, the
+    shared schema can be used by all contexts without modification. References from
+    other archives into the schema are created by the contexts of these archives.
+    """
+    if config.process.schema_cache_size <= 0:
+        return
+    errors, _ = definitions.m_all_validate()
+    if errors:
+        return
+    for section in schema.m_all_contents(include_self=True):
+        section.m_context = _shared_schema_context
+    _cache_schema(key, schema)
+
+
+def _is_schema_archive(archive: EntryArchive) -> bool:
+    """
+    Only archives with definitions and without data are shared, because data might
+    be changed by the entries that reference it.
+    """
+    return archive.definitions is not None and archive.data is None
+
+
+# Matches urls that point into other entries, raw files, or uploads
+_external_reference = re.compile(r'(?:/uploads?/|/entries/|://)[^\s\'"#]*#')
+
+
+def _has_external_references(value) -> bool:
+    if isinstance(value, (str, bytes)):
+        if isinstance(value, bytes):
+            value = value.decode(errors='replace')
+        return _external_reference.search(value) is not None
+    if isinstance(value, dict):
+        return any(_has_external_references(item) for item in value.values())
+    if isinstance(value, list):
+        return any(_has_external_references(item) for item in value)
+    return False
+
+
 class Context(MetainfoContext):
     """
     The nomad implementation of a metainfo context.
@@ -177,6 +246,23 @@ class Context(MetainfoContext):
             )
         )
 
+    def resolve_section_definition(self, definition_reference: str, definition_id: str):
+        # Definition ids are content hashes, self-contained packages can be shared.
+        cache_key = ('definition', definition_id)
+        package = _get_cached_schema(cache_key)
+        if package is None:
+            pkg_definition = self.retrieve_package_by_section_definition_id(
+                definition_reference, definition_id
+            )
+            package = self.load_package(pkg_definition)
+            if not _has_external_references(pkg_definition):
+                _share_schema(cache_key, package, package)
+
+        for section in package.section_definitions:
+            if section.definition_id == definition_id:
+                return section.section_cls
+        return None
+
     def load_archive(
         self, entry_id: str, upload_id: str, installation_url: str
     ) -> EntryArchive:
@@ -270,11 +356,40 @@ class Context(MetainfoContext):
         return value
 
 
+_shared_schema_context = Context()
+
+
 class ServerContext(Context):
     def __init__(self, upload=None):
         super().__init__()
         self.upload = upload
         self.file_handles = {}
+        # If set, the raw paths of all files of this upload that are read through this
+        # context are added to this set.
+        self.raw_file_dependencies: Set[str] = None
+        # The (upload_id, raw path) of the file behind each url in `archives`, the
+        # dependency also needs to be added if the url is resolved from `archives`.
+        self.archive_dependencies: Dict[str, Tuple[str, str]] = {}
+
+    def _add_raw_file_dependency(self, upload_id: str, path: str):
+        if (
+            self.raw_file_dependencies is not None
+            and path
+            and upload_id == self.upload_id
+        ):
+            self.raw_file_dependencies.add(path)
+
+    def resolve_archive_url(self, url: str) -> MSection:
+        if url in self.archive_dependencies:
+            self._add_raw_file_dependency(*self.archive_dependencies[url])
+
+        return super().resolve_archive_url(url)
+
+    def cache_archive(self, url: str, archive):
+        super().cache_archive(url, archive)
+        metadata = getattr(archive, 'metadata', None)
+        if metadata is not None and metadata.mainfile:
+            self.archive_dependencies[url] = (metadata.upload_id, metadata.mainfile)
 
     @property
     def upload_files(self):
@@ -307,11 +422,26 @@ class ServerContext(Context):
     ) -> EntryArchive:
         upload_files = self._get_upload_files(upload_id, installation_url)
 
+        cache_key = None
         try:
             with upload_files.read_archive(entry_id) as reader:
                 from nomad.archive import to_json
 
-                archive_dict = to_json(reader[entry_id])
+                entry = reader[entry_id]
+                metadata = entry.get('metadata')
+                processing_time = (
+                    metadata.get('last_processing_time') if metadata else None
+                )
+                if processing_time and 'definitions' in entry and 'data' not in entry:
+                    cache_key = ('archive', upload_id, entry_id, processing_time)
+                    archive = _get_cached_schema(cache_key)
+                    if archive is not None:
+                        self._add_raw_file_dependency(
+                            upload_id, metadata.get('mainfile')
+                        )
+                        return archive
+
+                archive_dict = to_json(entry)
         except KeyError:
             if upload_id != self.upload_id:
                 raise MetainfoReferenceError(
@@ -323,13 +453,23 @@ class ServerContext(Context):
                 return self.load_raw_file(entry.mainfile, upload_id, installation_url)
             raise MetainfoReferenceError(f'Could not load {entry_id}.')
 
-        context = self
-        if upload_id != self.upload_id:
-            from nomad.processing import Upload
+        self._add_raw_file_dependency(
+            upload_id, archive_dict.get('metadata', {}).get('mainfile')
+        )
 
-            context = ServerContext(Upload(upload_id=upload_id))
+        context = self._get_archive_context(upload_id)
+        archive = EntryArchive.m_from_dict(archive_dict, m_context=context)
+        if cache_key is not None and not _has_external_references(archive_dict):
+            _share_schema(cache_key, archive, archive.definitions)
+        return archive
 
-        return EntryArchive.m_from_dict(archive_dict, m_context=context)
+    def _get_archive_context(self, upload_id: str) -> 'ServerContext':
+        if upload_id == self.upload_id:
+            return self
+
+        from nomad.processing import Upload
+
+        return ServerContext(Upload(upload_id=upload_id))
 
     def load_raw_file(
         self, path: str, upload_id: str, installation_url: str, url: str = None
@@ -337,6 +477,18 @@ class ServerContext(Context):
         upload_files = self._get_upload_files(upload_id, installation_url)
 
         try:
+            self._add_raw_file_dependency(upload_id, path)
+            with upload_files.raw_file(path, 'rb') as f:
+                content = f.read()
+
+            # schemas are shared between entries as long as the file does not change
+            cache_key = ('raw', upload_id, path, hashlib.sha1(content).hexdigest())
+            archive = _get_cached_schema(cache_key)
+            if archive is not None:
+                if url:
+                    self.cache_archive(url, archive)
+                return archive
+
             # Make sure the archive has proper entry_id, even though we are just
             # loading a raw file. This is important to serialize references into this
             # archive!
@@ -351,11 +503,13 @@ class ServerContext(Context):
             from nomad.parsing.parser import ArchiveParser
 
             parser = ArchiveParser()
-            with upload_files.raw_file(path, 'rt') as f:
+            with io.StringIO(content.decode()) as f:
                 parser.parse_file(path, f, archive)
             if url:
                 self.cache_archive(url, archive)
             parser.validate_defintions(archive)
+            if _is_schema_archive(archive) and not _has_external_references(content):
+                _share_schema(cache_key, archive, archive.definitions)
             return archive
         except Exception:
             raise MetainfoReferenceError(f'Could not load {path}.')
@@ -364,6 +518,10 @@ class ServerContext(Context):
         return self.upload_files._raw_dir.os_path
 
     def raw_file(self, *args, **kwargs):
+        mode = (args[1] if len(args) > 1 else kwargs.get('mode')) or 'r'
+        if not any(char in mode for char in 'wax'):
+            path = args[0] if args else kwargs.get('file_path')
+            self._add_raw_file_dependency(self.upload_id, path)
         return self.upload_files.raw_file(*args, **kwargs)
 
     def raw_path_exists(self, path) -> bool:
@@ -431,6 +589,7 @@ class ServerContext(Context):
 
             file_id = match['file_id']
             if upload_files.raw_path_is_file(file_id):
+                self._add_raw_file_dependency(upload_files.upload_id, file_id)
                 hdf5_file = upload_files.raw_file(file_id, 'rb')
             else:
                 hdf5_file = upload_files.archive_hdf5_file(file_id)
@@ -449,6 +608,7 @@ class ServerContext(Context):
         for hdf5_file in self.file_handles.values():
             hdf5_file.close()
         self.file_handles = {}
+        super().close()
 
     def __enter__(self):
         return self
@@ -470,6 +630,7 @@ class ClientContext(Context):
         - installation_url: The installation_url that should be used for intra installation
             references.
         - local_dir: For intra "upload" references, files will be looked up here.
+        - cache: An optional `nomad.client.ArchiveCache` for the loaded archives.
     """
 
     def __init__(
@@ -480,6 +641,7 @@ class ClientContext(Context):
         username: str = None,
         password: str = None,
         auth=None,
+        cache=None,
     ):
         super().__init__(
             config.client.url + '/v1' if installation_url is None else installation_url
@@ -493,6 +655,8 @@ class ClientContext(Context):
 
             self._auth = Auth(user=username, password=password)
         self._upload_id = upload_id
+        self._cache = cache
+        self._last_updates: Dict[str, Optional[str]] = {}
 
     @property
     def upload_id(self):
@@ -507,12 +671,27 @@ class ClientContext(Context):
         else:
             url = f'{_validate_url(installation_url)}/uploads/{upload_id}/archive/{entry_id}'
 
-        response = requests.get(url, auth=self._auth)
+        archive = None
+        last_update = None
+        if self._cache is not None and upload_id is not None:
+            from nomad.client.cache import required_hash
 
-        if response.status_code != 200:
-            raise MetainfoReferenceError(
-                f'cannot retrieve archive {entry_id} from {installation_url}'
-            )
+            last_update = self._upload_last_update(upload_id, installation_url)
+            archive = self._cache.get(entry_id, required_hash('*'), last_update)
+
+        if archive is None:
+            response = requests.get(url, auth=self._auth)
+
+            if response.status_code != 200:
+                raise MetainfoReferenceError(
+                    f'cannot retrieve archive {entry_id} from {installation_url}'
+                )
+
+            archive = response.json()['data']['archive']
+            if last_update is not None:
+                self._cache.put(
+                    entry_id, upload_id, required_hash('*'), last_update, archive
+                )
 
         context = self
         if upload_id != self.upload_id:
@@ -521,11 +700,29 @@ class ClientContext(Context):
                 local_dir=self.local_dir,
                 upload_id=upload_id,
                 auth=self._auth,
+                cache=self._cache,
             )
+            context._last_updates = self._last_updates
 
-        return EntryArchive.m_from_dict(
-            response.json()['data']['archive'], m_context=context
-        )
+        return EntryArchive.m_from_dict(archive, m_context=context)
+
+    def _upload_last_update(self, upload_id: str, installation_url: str):
+        """
+        Returns the last update of the given upload to validate cached archives. Each
+        upload is only queried once during the lifetime of the context.
+        """
+        if upload_id not in self._last_updates:
+            response = requests.get(
+                f'{_validate_url(installation_url)}/uploads/{upload_id}',
+                auth=self._auth,
+            )
+            self._last_updates[upload_id] = (
+                response.json()['data'].get('last_update')
+                if response.status_code == 200
+                else None
+            )
+
+        return self._last_updates[upload_id]
 
     def load_raw_file(
         self, path: str, upload_id: str, installation_url: str, url: str = None
@@ -0,0 +1,247 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Lookups in external APIs (e.g. PubChem, CAS) that are used during normalization.
+
+All lookups go through a persistent cache that is keyed by the source, path, and
+search term of the lookup. The requests themselves are performed by an exchangeable
+backend, e.g. to answer from a local mirror or stub service during tests and
+air-gapped operation. If the external service cannot be reached, expired cache
+entries are still used.
+"""
+
+import importlib
+import json
+import os
+import sqlite3
+import threading
+from time import time
+from typing import Dict, Optional, Tuple
+
+import requests
+
+from nomad import utils
+from nomad.config import config
+
+logger = utils.get_logger(__name__)
+
+
+class ExternalAPIResponse:
+    """
+    The parts of a `requests.Response` that are used by the normalizers.
+    """
+
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self):
+        return json.loads(self.text)
+
+    def __repr__(self):
+        return f'<Response [{self.status_code}]>'
+
+
+class ExternalAPIBackend:
+    """
+    Performs the requests to the external APIs. Subclasses can answer requests
+    differently, e.g. from a local mirror, and are configured with
+    ``config.normalize.external_api_backend``.
+    """
+
+    def get(self, url: str, timeout: float) -> ExternalAPIResponse:
+        response = requests.get(url, timeout=timeout)
+        return ExternalAPIResponse(response.status_code, response.text)
+
+
+class ExternalAPICache:
+    """
+    A persistent cache for external API responses stored in a SQLite file.
+
+    Arguments:
+        path: The path of the SQLite file.
+        ttl: The time in seconds after which cached responses expire.
+    """
+
+    def __init__(self, path: str, ttl: float):
+        self.ttl = ttl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # multiple workers share the file, wait for their writes to finish
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    source TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    search TEXT NOT NULL,
+                    status_code INTEGER NOT NULL,
+                    text TEXT NOT NULL,
+                    time REAL NOT NULL,
+                    PRIMARY KEY (source, path, search)
+                )
+                """
+            )
+
+    def get(self, key: Tuple[str, str, str]) -> Tuple[ExternalAPIResponse, bool]:
+        """
+        Returns the cached response and whether it is expired, or None if there is
+        no cached response or the cache cannot be read.
+        """
+        try:
+            with self._lock:
+                row = self._connection.execute(
+                    'SELECT status_code, text, time FROM responses '
+                    'WHERE source = ? AND path = ? AND search = ?',
+                    key,
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warn('could not read external api cache', key=key, exc_info=e)
+            return None
+        if row is None:
+            return None
+
+        status_code, text, cache_time = row
+        return ExternalAPIResponse(status_code, text), time() - cache_time > self.ttl
+
+    def put(self, key: Tuple[str, str, str], response: ExternalAPIResponse):
+        """Caches the response. Failures are logged, the response is not cached."""
+        try:
+            with self._lock, self._connection:
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                    (*key, response.status_code, response.text, time()),
+                )
+        except sqlite3.Error as e:
+            logger.warn('could not write external api cache', key=key, exc_info=e)
+
+
+_cache: Optional[ExternalAPICache] = None
+_backend: Optional[ExternalAPIBackend] = None
+_offline_until: Dict[str, float] = {}
+_init_lock = threading.Lock()
+
+
+def get_cache() -> Optional[ExternalAPICache]:
+    """Returns the configured cache, or None if caching is disabled."""
+    global _cache
+    if config.normalize.external_api_cache_ttl <= 0:
+        return None
+    with _init_lock:
+        if _cache is None:
+            path = config.normalize.external_api_cache_file
+            if path is None:
+                # the file is locked by sqlite, which is not reliable on shared file
+                # systems, each node keeps its own cache
+                path = os.path.join(config.fs.local_tmp, 'external_api_cache.sqlite')
+            _cache = ExternalAPICache(path, config.normalize.external_api_cache_ttl)
+    return _cache
+
+
+def get_backend() -> ExternalAPIBackend:
+    """Returns the configured backend."""
+    global _backend
+    with _init_lock:
+        if _backend is None:
+            class_name = config.normalize.external_api_backend
+            if class_name is None:
+                _backend = ExternalAPIBackend()
+            else:
+                module_name, cls = class_name.rsplit('.', 1)
+                _backend = getattr(importlib.import_module(module_name), cls)()
+    return _backend
+
+
+def external_api_request(
+    source: str, url: str, timeout: float
+) -> Optional[ExternalAPIResponse]:
+    """
+    Performs the request with the backend. Returns None, if the service cannot be
+    reached. In this case, no further requests are made to the same source for a
+    while, so that normalization does not wait for the timeout of every single request.
+
+    Arguments:
+        source: The external service, e.g. `pubchem` or `cas`.
+        url: The url to request.
+        timeout: The timeout for the request in seconds.
+    """
+    if time() < _offline_until.get(source, 0.0):
+        return None
+
+    try:
+        return get_backend().get(url, timeout=timeout)
+    except requests.RequestException as e:
+        logger.warn('external api not reachable', url=url, exc_info=e)
+        _offline_until[source] = time() + config.normalize.external_api_retry_interval
+        return None
+
+
+def external_api_get(
+    key: Tuple[str, str, str], url: str, timeout: float
+) -> ExternalAPIResponse:
+    """
+    Gets the response for the given lookup from the cache, or from the backend if the
+    lookup is not cached or expired.
+
+    Arguments:
+        key: The source, path, and search term of the lookup.
+        url: The url to request, if the lookup is not cached.
+        timeout: The timeout for the request in seconds.
+    """
+    cache = get_cache()
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None and not cached[1]:
+        return cached[0]
+
+    response = external_api_request(key[0], url, timeout)
+    if response is None or response.status_code >= 500:
+        # the service is not available, use expired results rather than nothing
+        if cached is not None:
+            return cached[0]
+        return response if response is not None else ExternalAPIResponse(503, '')
+
+    # only definite answers are cached
+    if cache is not None and (response.ok or response.status_code == 404):
+        cache.put(key, response)
+
+    return response
+
+
+def is_cached(key: Tuple[str, str, str]) -> bool:
+    """Returns whether there is a cached and not expired response for the lookup."""
+    cache = get_cache()
+    cached = cache.get(key) if cache is not None else None
+    return cached is not None and not cached[1]
+
+
+def cache_response(key: Tuple[str, str, str], response: ExternalAPIResponse):
+    """
+    Adds a response to the cache, e.g. one of the lookups in a batched request.
+    """
+    cache = get_cache()
+    if cache is not None:
+        cache.put(key, response)
@@ -18,15 +18,19 @@
 import os
 from typing import TYPE_CHECKING, Iterable
 import datetime
+import json
 import re
+from time import monotonic
 from typing import (
     Dict,
     List,
+    Tuple,
 )
 
 from unidecode import unidecode
 import numpy as np
 import h5py
+import yaml
 from ase.data import (
     chemical_symbols,
     atomic_numbers,
@@ -58,6 +62,13 @@ from nomad.metainfo import (
 )
 from nomad.metainfo.util import MEnum
 from nomad.datamodel.util import create_custom_mapping
+from nomad.datamodel.external_api import (
+    ExternalAPIResponse,
+    cache_response,
+    external_api_get,
+    external_api_request,
+    is_cached,
+)
 from nomad.datamodel.data import (
     ArchiveSection,
     EntryData,
@@ -77,11 +88,27 @@ from nomad.datamodel.metainfo.annotations import (
 PUB_CHEM_PUG_PATH = 'https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound'
 CAS_API_PATH = 'https://commonchemistry.cas.org/api'
 EXTERNAL_API_TIMEOUT = 5
+PUB_CHEM_PROPERTIES = {
+    'Title': 'name',
+    'IUPACName': 'iupac_name',
+    'MolecularFormula': 'molecular_formula',
+    'ExactMass': 'molecular_mass',
+    'InChI': 'inchi',
+    'InChIKey': 'inchi_key',
+    'IsomericSMILES': 'smile',
+    'CanonicalSMILES': 'canonical_smile',
+}
+LAB_ID_CACHE_TTL = 300
+LAB_ID_CACHE_SIZE = 10000
+LAB_ID_MAX_RAW_FILE_SIZE = 1024 * 1024
+
+# Resolved lab ids of the current worker, values are (time, result) tuples.
+_lab_id_cache: Dict[tuple, tuple] = {}
 
 
 def pub_chem_api_get_properties(
     cid: int, properties: Iterable[str]
-) -> requests.Response:
+) -> ExternalAPIResponse:
     """
     Function for performing a get request to the PubChem PUG API to get properties for a
     given compound identifier.
@@ -91,15 +118,17 @@ def pub_chem_api_get_properties(
         properties (Iterable[str]): The properties to retrieve the value for.
 
     Returns:
-        requests.Response: The response as returned from the PubChem PUG API.
+        ExternalAPIResponse: The (cached) response of the PubChem PUG API.
     """
-    return requests.get(
-        url=f'{PUB_CHEM_PUG_PATH}/cid/{cid}/property/{str.join(",", properties)}/JSON',
+    properties = str.join(',', properties)
+    return external_api_get(
+        ('pubchem', 'property', f'{cid}/{properties}'),
+        url=f'{PUB_CHEM_PUG_PATH}/cid/{cid}/property/{properties}/JSON',
         timeout=EXTERNAL_API_TIMEOUT,
     )
 
 
-def pub_chem_api_get_synonyms(cid: int) -> requests.Response:
+def pub_chem_api_get_synonyms(cid: int) -> ExternalAPIResponse:
     """
     Function for performing a get request to the PubChem PUG API to get properties for a
     given compound identifier.
@@ -108,15 +137,61 @@ def pub_chem_api_get_synonyms(cid: int) -> requests.Response:
         cid (int): The compound identifier of the compound of interest.
 
     Returns:
-        requests.Response: The response as returned from the PubChem PUG API.
+        ExternalAPIResponse: The (cached) response of the PubChem PUG API.
     """
-    return requests.get(
+    return external_api_get(
+        ('pubchem', 'synonyms', str(cid)),
         url=f'{PUB_CHEM_PUG_PATH}/cid/{cid}/synonyms/JSON',
         timeout=EXTERNAL_API_TIMEOUT,
     )
 
 
-def pub_chem_api_search(path: str, search: str) -> requests.Response:
+def pub_chem_api_prefetch(cids: Iterable[int], properties: Iterable[str]) -> None:
+    """
+    Function for fetching the properties and synonyms of multiple compounds with one
+    request each. The results are split into the responses of the single compound
+    requests and cached, so that subsequent calls of `pub_chem_api_get_properties`
+    and `pub_chem_api_get_synonyms` do not need further requests.
+
+    Args:
+        cids (Iterable[int]): The compound identifiers of the compounds of interest.
+        properties (Iterable[str]): The properties to retrieve the value for.
+    """
+    properties = str.join(',', properties)
+    cids = sorted(set(cids))
+    lookups = (
+        ('property', f'/{properties}', 'PropertyTable', 'Properties'),
+        ('synonyms', '', 'InformationList', 'Information'),
+    )
+    for path, suffix, list_key, item_key in lookups:
+        missing = [
+            str(cid)
+            for cid in cids
+            if not is_cached(('pubchem', path, f'{cid}{suffix}'))
+        ]
+        if len(missing) < 2:
+            continue
+        response = external_api_request(
+            'pubchem',
+            f'{PUB_CHEM_PUG_PATH}/cid/{str.join(",", missing)}/{path}{suffix}/JSON',
+            timeout=EXTERNAL_API_TIMEOUT,
+        )
+        if response is None or not response.ok:
+            continue
+        try:
+            items = response.json()[list_key][item_key]
+        except (KeyError, ValueError):
+            continue
+        for item in items:
+            if 'CID' not in item:
+                continue
+            cache_response(
+                ('pubchem', path, f'{item["CID"]}{suffix}'),
+                ExternalAPIResponse(200, json.dumps({list_key: {item_key: [item]}})),
+            )
+
+
+def pub_chem_api_search(path: str, search: str) -> ExternalAPIResponse:
     """
     Function for performing a get request to the PubChem PUG API to search the given path
     for a given string.
@@ -126,15 +201,16 @@ def pub_chem_api_search(path: str, search: str) -> requests.Response:
         search (str): The string to search for a match with.
 
     Returns:
-        requests.Response: The response as returned from the PubChem PUG API.
+        ExternalAPIResponse: The (cached) response of the PubChem PUG API.
     """
-    return requests.get(
+    return external_api_get(
+        ('pubchem', path, search),
         url=f'{PUB_CHEM_PUG_PATH}/{path}/{search}/cids/JSON',
         timeout=EXTERNAL_API_TIMEOUT,
     )
 
 
-def cas_api_search(search: str) -> requests.Response:
+def cas_api_search(search: str) -> ExternalAPIResponse:
     """
     Function for performing a get request to the CAS API to search for a match with the
     given string.
@@ -143,15 +219,182 @@ def cas_api_search(search: str) -> requests.Response:
         search (str): The string to search for a match with.
 
     Returns:
-        requests.Response: The response as returned from the CAS API.
+        ExternalAPIResponse: The (cached) response of the CAS API.
     """
-    return requests.get(
-        f'{CAS_API_PATH}/search?q={search}',
+    return external_api_get(
+        ('cas', 'search', search),
+        url=f'{CAS_API_PATH}/search?q={search}',
         timeout=EXTERNAL_API_TIMEOUT,
     )
 
 
-def cas_api_details(cas_rn: str) -> requests.Response:
+def _get_cached_lab_ids(key: tuple):
+    cached = _lab_id_cache.get(key)
+    if cached is not None and monotonic() - cached[0] < LAB_ID_CACHE_TTL:
+        return cached[1]
+    return None
+
+
+def _set_cached_lab_ids(key: tuple, value):
+    if len(_lab_id_cache) >= LAB_ID_CACHE_SIZE:
+        _lab_id_cache.clear()
+    _lab_id_cache[key] = (monotonic(), value)
+
+
+def upload_lab_ids(archive) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Function for getting the lab ids of the archive files in the upload that is
+    currently processed. The lab ids are read from the `data` of the raw archive files
+    of all matched entries, which also covers the entries that are not processed or
+    indexed yet. The map is built once per upload process and worker.
+
+    Args:
+        archive (EntryArchive): An archive with the context of the processed upload.
+
+    Returns:
+        Dict[str, List[Tuple[str, str]]]: The upload and entry ids for each lab id.
+    """
+    upload = getattr(archive.m_context, 'upload', None)
+    if upload is None:
+        return {}
+
+    key = ('upload', upload.upload_id, upload.complete_time)
+    lab_ids = _get_cached_lab_ids(key)
+    if lab_ids is not None:
+        return lab_ids
+
+    from nomad.processing import Entry
+
+    lab_ids = {}
+    upload_files = upload.upload_files
+    entries = Entry.objects(
+        upload_id=upload.upload_id, parser_name='parsers/archive', mainfile_key=None
+    ).only('entry_id', 'mainfile')
+    for entry in entries:
+        try:
+            if upload_files.raw_file_size(entry.mainfile) > LAB_ID_MAX_RAW_FILE_SIZE:
+                continue
+            with upload_files.raw_file(entry.mainfile, 'rt') as f:
+                if entry.mainfile.endswith('.json'):
+                    data = json.load(f)
+                else:
+                    data = yaml.load(f, Loader=yaml.SafeLoader)
+            lab_id = data['data']['lab_id']
+        except Exception:
+            continue
+        if isinstance(lab_id, str):
+            lab_ids.setdefault(lab_id, []).append((upload.upload_id, entry.entry_id))
+
+    _set_cached_lab_ids(key, lab_ids)
+    return lab_ids
+
+
+def indexed_lab_ids(
+    lab_ids: Iterable[str], user_id: str
+) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Function for finding the indexed entries with the given lab ids. All lab ids that
+    are not cached are resolved together with one paginated search.
+
+    Args:
+        lab_ids (Iterable[str]): The lab ids to resolve.
+        user_id (str): The id of the user whose visible entries are searched.
+
+    Returns:
+        Dict[str, List[Tuple[str, str]]]: The upload and entry ids for found lab ids.
+    """
+    result: Dict[str, List[Tuple[str, str]]] = {}
+    missing = set()
+    for lab_id in lab_ids:
+        references = _get_cached_lab_ids(('search', user_id, lab_id))
+        if references is None:
+            missing.add(lab_id)
+        else:
+            result[lab_id] = references
+
+    if not missing:
+        return result
+
+    from nomad.search import search, MetadataPagination, MetadataRequired
+
+    found: Dict[str, List[Tuple[str, str]]] = {}
+    page_after_value = None
+    while True:
+        search_result = search(
+            owner='all',
+            query={'results.eln.lab_ids:any': sorted(missing)},
+            pagination=MetadataPagination(
+                page_size=min(10 * len(missing), 10000),
+                page_after_value=page_after_value,
+            ),
+            required=MetadataRequired(
+                include=['entry_id', 'upload_id', 'results.eln.lab_ids']
+            ),
+            user_id=user_id,
+        )
+        for entry in search_result.data:
+            entry_lab_ids = entry.get('results', {}).get('eln', {}).get('lab_ids', [])
+            for lab_id in entry_lab_ids:
+                if lab_id in missing:
+                    found.setdefault(lab_id, []).append(
+                        (entry['upload_id'], entry['entry_id'])
+                    )
+
+        page_after_value = search_result.pagination.next_page_after_value
+        if page_after_value is None or len(search_result.data) == 0:
+            break
+
+    # Only found lab ids are cached, the others might get indexed soon.
+    for lab_id, references in found.items():
+        _set_cached_lab_ids(('search', user_id, lab_id), references)
+
+    result.update(found)
+    return result
+
+
+def resolve_lab_id(archive, lab_id: str) -> List[Tuple[str, str]]:
+    """
+    Function for resolving a lab id to the entries that have this lab id. Entries of the
+    currently processed upload are found even if they are not indexed yet, and come
+    first. For the first lab id, all unresolved lab ids of the archive are resolved
+    together and the result is kept in the archive cache.
+
+    Args:
+        archive (EntryArchive): The archive containing the lab id reference.
+        lab_id (str): The lab id to resolve.
+
+    Returns:
+        List[Tuple[str, str]]: The upload and entry ids of all entries with the lab id.
+    """
+    resolved = archive.m_cache.setdefault('resolved_lab_ids', {})
+    if lab_id in resolved:
+        return resolved[lab_id]
+
+    lab_ids = {lab_id}
+    for section in archive.m_all_contents():
+        if (
+            isinstance(section, EntityReference)
+            and not section.m_is_set(EntityReference.reference)
+        ) or (
+            isinstance(section, ExperimentStep)
+            and not section.m_is_set(ExperimentStep.activity)
+        ):
+            if section.lab_id is not None and section.lab_id not in resolved:
+                lab_ids.add(section.lab_id)
+
+    in_upload = upload_lab_ids(archive)
+    indexed = indexed_lab_ids(lab_ids, archive.metadata.main_author.user_id)
+    for current_lab_id in lab_ids:
+        references = list(in_upload.get(current_lab_id, []))
+        for reference in indexed.get(current_lab_id, []):
+            if reference not in references:
+                references.append(reference)
+        resolved[current_lab_id] = references
+
+    return resolved[lab_id]
+
+
+def cas_api_details(cas_rn: str) -> ExternalAPIResponse:
     """
     Function for performing a get request to the CAS API to get the details for the
     substance with the given CAS registry number.
@@ -160,10 +403,11 @@ def cas_api_details(cas_rn: str) -> requests.Response:
         cas_rn (str): The CAS registry number of the substance for which to get details.
 
     Returns:
-        requests.Response: The response as returned from the CAS API.
+        ExternalAPIResponse: The (cached) response of the CAS API.
     """
-    return requests.get(
-        f'{CAS_API_PATH}/detail?cas_rn={cas_rn}',
+    return external_api_get(
+        ('cas', 'detail', cas_rn),
+        url=f'{CAS_API_PATH}/detail?cas_rn={cas_rn}',
         timeout=EXTERNAL_API_TIMEOUT,
     )
 
@@ -456,22 +700,13 @@ class EntityReference(SectionReference):
         """
         super(EntityReference, self).normalize(archive, logger)
         if self.reference is None and self.lab_id is not None:
-            from nomad.search import search, MetadataPagination
-
-            query = {'results.eln.lab_ids': self.lab_id}
-            search_result = search(
-                owner='all',
-                query=query,
-                pagination=MetadataPagination(page_size=1),
-                user_id=archive.metadata.main_author.user_id,
-            )
-            if search_result.pagination.total > 0:
-                entry_id = search_result.data[0]['entry_id']
-                upload_id = search_result.data[0]['upload_id']
+            references = resolve_lab_id(archive, self.lab_id)
+            if references:
+                upload_id, entry_id = references[0]
                 self.reference = f'../uploads/{upload_id}/archive/{entry_id}#data'
-                if search_result.pagination.total > 1:
+                if len(references) > 1:
                     logger.warn(
-                        f'Found {search_result.pagination.total} entries with lab_id: '
+                        f'Found {len(references)} entries with lab_id: '
                         f'"{self.lab_id}". Will use the first one found.'
                     )
             else:
@@ -521,22 +756,13 @@ class ExperimentStep(ActivityStep):
         """
         super(ExperimentStep, self).normalize(archive, logger)
         if self.activity is None and self.lab_id is not None:
-            from nomad.search import search, MetadataPagination
-
-            query = {'results.eln.lab_ids': self.lab_id}
-            search_result = search(
-                owner='all',
-                query=query,
-                pagination=MetadataPagination(page_size=1),
-                user_id=archive.metadata.main_author.user_id,
-            )
-            if search_result.pagination.total > 0:
-                entry_id = search_result.data[0]['entry_id']
-                upload_id = search_result.data[0]['upload_id']
+            references = resolve_lab_id(archive, self.lab_id)
+            if references:
+                upload_id, entry_id = references[0]
                 self.activity = f'../uploads/{upload_id}/archive/{entry_id}#data'
-                if search_result.pagination.total > 1:
+                if len(references) > 1:
                     logger.warn(
-                        f'Found {search_result.pagination.total} entries with lab_id: '
+                        f'Found {len(references)} entries with lab_id: '
                         f'"{self.lab_id}". Will use the first one found.'
                     )
             else:
@@ -1436,16 +1662,7 @@ class PubChemPureSubstanceSection(PureSubstanceSection):
         Args:
             logger (BoundLogger): A structlog logger.
         """
-        properties = {
-            'Title': 'name',
-            'IUPACName': 'iupac_name',
-            'MolecularFormula': 'molecular_formula',
-            'ExactMass': 'molecular_mass',
-            'InChI': 'inchi',
-            'InChIKey': 'inchi_key',
-            'IsomericSMILES': 'smile',
-            'CanonicalSMILES': 'canonical_smile',
-        }
+        properties = PUB_CHEM_PROPERTIES
         response = pub_chem_api_get_properties(
             cid=self.pub_chem_cid, properties=properties
         )
@@ -1576,6 +1793,18 @@ class PubChemPureSubstanceSection(PureSubstanceSection):
         if logger is None:
             logger = utils.get_logger(__name__)
 
+        if archive is not None and 'pub_chem_prefetched' not in archive.m_cache:
+            # fetch all compounds of the entry at once instead of one by one
+            archive.m_cache['pub_chem_prefetched'] = True
+            cids = [
+                section.pub_chem_cid
+                for section in archive.m_all_contents()
+                if isinstance(section, PubChemPureSubstanceSection)
+                and section.pub_chem_cid
+            ]
+            if len(cids) > 1:
+                pub_chem_api_prefetch(cids, PUB_CHEM_PROPERTIES)
+
         if self.pub_chem_cid:
             if any(getattr(self, value) is None for value in self.m_def.all_quantities):
                 self._populate_from_cid(logger)
@@ -30,6 +30,7 @@ almost readonly (beside metadata) storage.
     fs/staging/<upload>/raw/**
                        /archive/<entry_id>.msg
     fs/public/<upload>/raw-{access}.plain.zip
+                      /raw-{access}.index.sqlite
                       /archive-{access}.msg.msg
 
 Where `access` is either "public" (non-embargoed) or "restricted" (embargoed).
@@ -44,6 +45,9 @@ original mainfile, and vice versa.
 """
 
 from abc import ABCMeta
+from collections import deque
+import functools
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from typing import (
     IO,
     Set,
@@ -55,6 +59,7 @@ from typing import (
     Any,
     NamedTuple,
     Callable,
+    Optional,
 )
 from pydantic import BaseModel
 from datetime import datetime
@@ -62,10 +67,14 @@ import os.path
 import os
 import shutil
 import tarfile
+import time
 import zipstream
 import hashlib
 import io
 import json
+import pathlib
+import sqlite3
+import struct
 import yaml
 import magic
 import zipfile
@@ -75,6 +84,7 @@ from nomad.config import config
 from nomad.archive.storage import combine_archive
 from nomad.config.models.config import BundleImportSettings, BundleExportSettings
 from nomad.archive import write_archive, read_archive, ArchiveReader, to_json
+from nomad.archive.storage_v2 import ArchiveReaderPool
 
 decompress_file_extensions = (
     '.zip',
@@ -93,6 +103,12 @@ empty_zip_file_size = 22
 empty_hdf5_file_size = 96
 empty_archive_file_size = 32
 
+# Keeps the archive files of published uploads open across requests
+archive_reader_pool = ArchiveReaderPool(
+    max_readers=config.archive.reader_pool_size,
+    max_bytes=config.archive.reader_pool_max_bytes,
+)
+
 
 def auto_decompress(path: str):
     """
@@ -122,6 +138,40 @@ def auto_decompress(path: str):
     return None
 
 
+def _sanitize_member_name(name: str) -> str:
+    """
+    Removes leading '/', empty, '.' and '..' elements from an archive member name, like
+    `zipfile` does when extracting members.
+    """
+    return '/'.join(
+        element for element in name.split('/') if element not in ('', '.', '..')
+    )
+
+
+def _archive_members(
+    path: str, decompress: str
+) -> Iterator[Tuple[str, bool, Callable[[], IO]]]:
+    """
+    Iterates over the members of the zip or tar archive `path` without extracting it.
+    Yields tuples `(name, is_dir, open_member)`, where `name` is the sanitized member
+    path and `open_member` opens the member data for reading. Links and other special
+    members are skipped, as they could pose a security risk.
+    """
+    if decompress == 'zip':
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                name = _sanitize_member_name(info.filename)
+                if name:
+                    yield name, info.is_dir(), functools.partial(zf.open, info)
+    elif decompress == 'tar':
+        with tarfile.open(path) as tf:
+            for member in tf:
+                name = _sanitize_member_name(member.name)
+                if name and (member.isdir() or member.isfile()):
+                    open_member = functools.partial(tf.extractfile, member)
+                    yield name, member.isdir(), open_member
+
+
 def copytree(src, dst):
     """
     A close on ``shutils.copytree`` that does not try to copy the stats on all files.
@@ -163,6 +213,54 @@ def create_tmp_dir(prefix: str) -> str:
     )
 
 
+def chunked_upload_metadata_path(session_id: str) -> str:
+    """Returns the os path of the metadata file of the given chunked upload."""
+    return os.path.join(config.fs.tmp, 'chunked_uploads', f'{session_id}.json')
+
+
+def delete_expired_chunked_uploads(dry: bool = False) -> List[str]:
+    """
+    Deletes all chunked uploads that have not been changed for longer than
+    `services.chunked_upload_expiry` seconds, i.e. abandoned uploads that were neither
+    finalized nor aborted. Returns the ids of the expired chunked uploads. With `dry`,
+    nothing is deleted.
+    """
+    chunked_uploads_dir = os.path.dirname(chunked_upload_metadata_path(''))
+    if not os.path.isdir(chunked_uploads_dir):
+        return []
+
+    # The metadata file, the data directory, and the (partially) received file of a
+    # chunked upload share the session id. The most recent change of any of them counts.
+    last_changes: Dict[str, float] = {}
+    for root, dirs, file_names in os.walk(chunked_uploads_dir):
+        for name in dirs + file_names:
+            os_path = os.path.join(root, name)
+            session_id = os.path.relpath(os_path, chunked_uploads_dir).split(os.sep)[0]
+            session_id = session_id.removesuffix('.json')
+            try:
+                mtime = os.lstat(os_path).st_mtime
+            except FileNotFoundError:
+                continue
+            last_changes[session_id] = max(mtime, last_changes.get(session_id, 0))
+
+    expired_before = time.time() - config.services.chunked_upload_expiry
+    expired = [
+        session_id
+        for session_id, last_change in last_changes.items()
+        if last_change < expired_before
+    ]
+    if not dry:
+        for session_id in expired:
+            metadata_path = chunked_upload_metadata_path(session_id)
+            if os.path.exists(metadata_path):
+                os.remove(metadata_path)
+            data_dir = os.path.join(chunked_uploads_dir, session_id)
+            if os.path.exists(data_dir):
+                shutil.rmtree(data_dir, ignore_errors=True)
+
+    return expired
+
+
 def is_safe_basename(basename: str) -> bool:
     """
     Checks if `basename` is a *safe* base name (file/folder name). We consider it safe if
@@ -774,6 +872,7 @@ class UploadFiles(DirectoryObject, metaclass=ABCMeta):
         pass
 
     def delete(self) -> None:
+        archive_reader_pool.invalidate(self.upload_id)
         shutil.rmtree(self.os_path, ignore_errors=True)
         if config.fs.prefix_size > 0:
             # If using prefix, also remove the parent directory if empty
@@ -987,14 +1086,13 @@ class StagingUploadFiles(UploadFiles):
     ) -> None:
         """
         Adds the file or folder specified by `path` to this upload, in the raw directory
-        specified by `target_dir`. If `path` denotes a zip or tar archive file, it will
-        first be extracted to a temporary directory. The file(s) are *merged* with the
+        specified by `target_dir`. If `path` denotes a zip or tar archive file, its members
+        are extracted (see :func:`_extract_rawfiles`). The file(s) are *merged* with the
         existing upload files, i.e. new files are added, replacing old files if there
         already exists file(s) by the same names, the rest of the old files are left
         untouched.
 
         Cleanup
-        The method is responsible for trying to clean up temporarily extracted files.
         If `cleanup_source_file_and_dir` is True, the source file (defined by `path`), and
         its parent directory (which we also assume is temporary) are also cleaned up.
         Note: the cleanup steps are always carried out, also if the operation fails.
@@ -1009,9 +1107,9 @@ class StagingUploadFiles(UploadFiles):
                 folder is deleted if it's empty or if the operation failed. Use when the file/folder
                 to add is stored in a temporary directory.
             updated_files: An optional set of paths. If provided with the call, the raw
-                path of all files added or updated by the operation will be added to this set.
+                path of all files added or updated by the operation will be added to this set,
+                as soon as the respective file is added.
         """
-        tmp_dir = None
         try:
             assert not self.is_frozen
             assert os.path.exists(path), f'{path} does not exist'
@@ -1020,19 +1118,19 @@ class StagingUploadFiles(UploadFiles):
 
             is_dir = os.path.isdir(path)
             decompress = auto_decompress(path)
+            if decompress == 'error':
+                # Unknown / bad file format
+                assert False, 'Cannot extract file. Bad file format or file extension?'
+
+            os_target_dir = os.path.join(self._raw_dir.os_path, target_dir)
+            if not os.path.isdir(os_target_dir):
+                os.makedirs(os_target_dir)
+
             if decompress:
-                tmp_dir = create_tmp_dir(self.upload_id + '_unzip')
-                if decompress == 'zip':
-                    with zipfile.ZipFile(path) as zf:
-                        zf.extractall(tmp_dir)
-                elif decompress == 'tar':
-                    with tarfile.open(path) as tf:
-                        tf.extractall(tmp_dir)
-                elif decompress == 'error':
-                    # Unknown / bad file format
-                    assert (
-                        False
-                    ), 'Cannot extract file. Bad file format or file extension?'
+                self._extract_rawfiles(
+                    path, decompress, os_target_dir, target_dir, updated_files
+                )
+                return
 
             # Determine what to merge
             elements_to_merge: Iterable[Tuple[str, List[str], List[str]]] = []
@@ -1040,19 +1138,12 @@ class StagingUploadFiles(UploadFiles):
                 # Directory
                 source_dir = path
                 elements_to_merge = os.walk(source_dir)
-            elif decompress:
-                # Zipped archive
-                source_dir = tmp_dir
-                elements_to_merge = os.walk(source_dir)
             else:
                 # Single, non-compressed file
                 source_dir = os.path.dirname(path)
                 elements_to_merge = [(source_dir, [], [os.path.basename(path)])]
 
             # Do the merge
-            os_target_dir = os.path.join(self._raw_dir.os_path, target_dir)
-            if not os.path.isdir(os_target_dir):
-                os.makedirs(os_target_dir)
             for source_root, dirs, files in elements_to_merge:
                 elements = dirs + files
                 for element in elements:
@@ -1077,8 +1168,13 @@ class StagingUploadFiles(UploadFiles):
                         if not os.path.exists(element_target_path):
                             os.makedirs(element_target_path)
                     else:
-                        # File - copy or move it
-                        if cleanup_source_file_and_dir or decompress:
+                        # File - copy or move it. Hard linked files (e.g. local files
+                        # linked into a temporary directory) are copied, so that later
+                        # modifications of the raw file do not affect the other links.
+                        if (
+                            cleanup_source_file_and_dir
+                            and os.stat(element_source_path).st_nlink == 1
+                        ):
                             # Move the file
                             shutil.move(element_source_path, element_target_path)
                         else:
@@ -1096,8 +1192,6 @@ class StagingUploadFiles(UploadFiles):
             raise
         finally:
             # Cleanup
-            if tmp_dir and os.path.exists(tmp_dir):
-                shutil.rmtree(tmp_dir)
             if cleanup_source_file_and_dir:
                 if os.path.exists(path):
                     if os.path.isdir(path):
@@ -1108,6 +1202,100 @@ class StagingUploadFiles(UploadFiles):
                 if os.path.exists(parent_dir) and not os.listdir(parent_dir):
                     shutil.rmtree(parent_dir)
 
+    def _extract_rawfiles(
+        self,
+        path: str,
+        decompress: str,
+        os_target_dir: str,
+        target_dir: str,
+        updated_files: Set[str] = None,
+    ) -> None:
+        """
+        Extracts the zip or tar archive `path` into `os_target_dir`. The members are
+        streamed into a staging directory within the upload directory first. Only if
+        the whole archive was extracted, the files are moved into the raw directory.
+        Because the staging directory is on the same file system, moving files are just
+        renames. Corrupt archives or write errors leave the raw files untouched.
+        """
+        staging_dir = os.path.join(self.os_path, f'.extract-{utils.create_uuid()}')
+        try:
+            # the extracted members by path, later members replace earlier ones
+            members: Dict[str, bool] = {}
+            for element_relative_path, is_member_dir, open_member in _archive_members(
+                path, decompress
+            ):
+                element_staging_path = os.path.join(staging_dir, element_relative_path)
+                if is_member_dir:
+                    os.makedirs(element_staging_path, exist_ok=True)
+                else:
+                    os.makedirs(os.path.dirname(element_staging_path), exist_ok=True)
+                    if os.path.isdir(element_staging_path):
+                        assert False, f'Cannot merge a file with a directory or vice versa: {element_relative_path}'
+                    with open_member() as source:
+                        with open(element_staging_path, 'wb') as target:
+                            shutil.copyfileobj(source, target, 1024 * 1024)
+                members.pop(element_relative_path, None)
+                members[element_relative_path] = is_member_dir
+
+            # check for conflicts with the existing raw files before moving anything
+            for element_relative_path, is_member_dir in members.items():
+                relative_dir = (
+                    element_relative_path
+                    if is_member_dir
+                    else os.path.dirname(element_relative_path)
+                )
+                while relative_dir:
+                    os_path = os.path.join(os_target_dir, relative_dir)
+                    if os.path.lexists(os_path) and not os.path.isdir(os_path):
+                        assert False, f'Cannot merge a file with a directory or vice versa: {relative_dir}'
+                    relative_dir = os.path.dirname(relative_dir)
+                if not is_member_dir and os.path.isdir(
+                    os.path.join(os_target_dir, element_relative_path)
+                ):
+                    assert False, f'Cannot merge a file with a directory or vice versa: {element_relative_path}'
+
+            merged_dirs: Set[str] = set()
+            for element_relative_path, is_member_dir in members.items():
+                self._merge_directories(
+                    os_target_dir,
+                    element_relative_path
+                    if is_member_dir
+                    else os.path.dirname(element_relative_path),
+                    merged_dirs,
+                )
+                if is_member_dir:
+                    continue
+                os.replace(
+                    os.path.join(staging_dir, element_relative_path),
+                    os.path.join(os_target_dir, element_relative_path),
+                )
+                if updated_files is not None:
+                    updated_files.add(os.path.join(target_dir, element_relative_path))
+        finally:
+            if os.path.exists(staging_dir):
+                shutil.rmtree(staging_dir, ignore_errors=True)
+
+    @staticmethod
+    def _merge_directories(
+        os_target_dir: str, relative_dir: str, merged_dirs: Set[str]
+    ) -> None:
+        """
+        Creates the directory `relative_dir` and its parents within `os_target_dir`,
+        if they do not exist yet. Directories in `merged_dirs` are known to exist and
+        are skipped; created or checked directories are added to this set.
+        """
+        if not relative_dir or relative_dir in merged_dirs:
+            return
+        StagingUploadFiles._merge_directories(
+            os_target_dir, os.path.dirname(relative_dir), merged_dirs
+        )
+        os_path = os.path.join(os_target_dir, relative_dir)
+        if not os.path.isdir(os_path):
+            if os.path.lexists(os_path):
+                assert False, f'Cannot merge a file with a directory or vice versa: {relative_dir}'
+            os.mkdir(os_path)
+        merged_dirs.add(relative_dir)
+
     def delete_rawfiles(self, path, updated_files: Set[str] = None):
         assert is_safe_relative_path(path)
         raw_os_path = os.path.join(self.os_path, 'raw')
@@ -1165,6 +1353,65 @@ class StagingUploadFiles(UploadFiles):
         elif os.path.isdir(os_path_target):
             raise ValueError('Copying a directory is not possible.')
 
+    def raw_file_manifest(
+        self, previous: Dict[str, List[Any]] = None
+    ) -> Dict[str, List[Any]]:
+        """
+        Creates a manifest of all raw files, which maps the raw paths to lists
+        `[size, mtime_ns, hash]`. The content hash is reused from the `previous`
+        manifest, if the size and modification time of a file did not change.
+        """
+        manifest: Dict[str, List[Any]] = {}
+        for path_info in self.raw_directory_list(recursive=True, files_only=True):
+            path = path_info.path
+            os_path = self._raw_dir.join_file(path).os_path
+            stat = os.stat(os_path)
+            record = previous.get(path) if previous else None
+            if record is None or record[:2] != [stat.st_size, stat.st_mtime_ns]:
+                hash = hashlib.sha512()
+                with open(os_path, 'rb') as f:
+                    for data in iter(lambda: f.read(65536), b''):
+                        hash.update(data)
+                record = [stat.st_size, stat.st_mtime_ns, utils.make_websave(hash)]
+            manifest[path] = record
+        return manifest
+
+    def _raw_file_manifest_object(self, pending: bool) -> PathObject:
+        return self.join_file(
+            'raw-manifest.pending.json' if pending else 'raw-manifest.json'
+        )
+
+    def read_raw_file_manifest(
+        self, pending: bool = False
+    ) -> Optional[Dict[str, List[Any]]]:
+        """
+        Reads the stored raw file manifest (see :func:`raw_file_manifest`), or the
+        pending manifest of a running processing. Returns None, if there is none.
+        """
+        manifest_object = self._raw_file_manifest_object(pending)
+        if not manifest_object.exists():
+            return None
+        with open(manifest_object.os_path, 'rt') as f:
+            return json.load(f)
+
+    def write_raw_file_manifest(
+        self, manifest: Dict[str, List[Any]], pending: bool = False
+    ) -> None:
+        with open(self._raw_file_manifest_object(pending).os_path, 'wt') as f:
+            json.dump(manifest, f)
+
+    def commit_raw_file_manifest(self) -> None:
+        """
+        Replaces the stored raw file manifest with the pending one, if there is one.
+        Files that were added or modified since the pending manifest was created (i.e.
+        by the processing itself) are updated in the manifest.
+        """
+        pending = self.read_raw_file_manifest(pending=True)
+        if pending is None:
+            return
+        self.write_raw_file_manifest(self.raw_file_manifest(pending))
+        self._raw_file_manifest_object(pending=True).delete()
+
     def metadata_file_cached(self, path_dir: str = ''):
         """
         Gets the content of the metadata file located in the directory defined by `path_dir`.
@@ -1204,6 +1451,8 @@ class StagingUploadFiles(UploadFiles):
         create: bool = True,
         include_raw: bool = True,
         include_archive: bool = True,
+        progress: Callable[[str], None] = None,
+        progress_interval: float = 10,
     ) -> None:
         """
         Packs raw and/or archive files, to create the contents in the public file area.
@@ -1213,7 +1462,8 @@ class StagingUploadFiles(UploadFiles):
         If the public upload files directory does not exist, it will be created.
         If the target archive file or raw file zip exists, they will be overwritten.
         If an archive file or raw file zip with the wrong access exists, they will be deleted.
-        This is potentially a long running operation.
+        This is potentially a long running operation. The msgpack archive, the HDF5
+        archive, and the raw file zip are packed concurrently.
 
         Arguments:
             entries: A list of EntryMetadata to pack in the archive files
@@ -1222,6 +1472,9 @@ class StagingUploadFiles(UploadFiles):
             create: if the public upload files directory should be created. True by default.
             include_raw: determines if the raw data should be packed. True by default.
             include_archive: determines of the archive data should be packed. True by default.
+            progress: An optional callback that is called from the calling thread with
+                a progress message every `progress_interval` seconds.
+            progress_interval: The time in seconds between two progress messages.
         """
         self.logger.info('started to pack upload')
 
@@ -1249,18 +1502,114 @@ class StagingUploadFiles(UploadFiles):
                 PublicUploadFiles(self.upload_id).access == access
             ), 'Inconsistent access'
 
-        # zip archives
-        if include_archive:
+        # The number of packed items per task. Each count is only written by its task.
+        counts: Dict[str, int] = {}
+
+        def pack_msgpack():
             with utils.timer(self.logger, 'packed msgpack archive') as log_data:
                 number_of_entries = self._pack_archive_files(
-                    target_dir, entries, access, other_access
+                    target_dir, entries, access, other_access, counts
                 )
                 log_data.update(number_of_entries=number_of_entries)
 
-        # zip raw files
-        if include_raw:
+        def pack_hdf5():
+            with utils.timer(self.logger, 'packed hdf5 archive'):
+                self._pack_archive_hdf5_files(
+                    target_dir, entries, access, other_access, counts
+                )
+
+        def pack_raw():
             with utils.timer(self.logger, 'packed raw files'):
-                self._pack_raw_files(target_dir, access, other_access)
+                self._pack_raw_files(target_dir, access, other_access, counts)
+
+        tasks: List[Callable[[], None]] = []
+        if include_archive:
+            tasks.extend([pack_msgpack, pack_hdf5])
+        if include_raw:
+            tasks.append(pack_raw)
+
+        def progress_message():
+            number_of_entries = len(entries)
+            messages = [
+                f'{label} {counts[key]}{total}'
+                for key, label, total in [
+                    ('archive', 'archives', f'/{number_of_entries}'),
+                    ('hdf5', 'hdf5 files', f'/{number_of_entries}'),
+                    ('raw', 'raw files', ''),
+                ]
+                if key in counts
+            ]
+            return 'Packing ' + ', '.join(messages)
+
+        with ThreadPoolExecutor(
+            max_workers=max(len(tasks), 1), thread_name_prefix='pack'
+        ) as executor:
+            futures = [executor.submit(task) for task in tasks]
+            not_done = set(futures)
+            while not_done:
+                done, not_done = wait(
+                    not_done, timeout=progress_interval, return_when=FIRST_EXCEPTION
+                )
+                if any(future.exception() is not None for future in done):
+                    break
+                if not_done and progress is not None:
+                    progress(progress_message())
+
+        # re-raise the first exception, the executor already waited for all tasks
+        for future in futures:
+            future.result()
+
+        archive_reader_pool.invalidate(self.upload_id)
+
+    def _read_ahead_archive_files(
+        self, entries: List[datamodel.EntryMetadata]
+    ) -> Iterator[Tuple[str, bytes]]:
+        """
+        Yields the entry ids and the contents of the entries' archive files (or None).
+        A background thread reads the files of the next entries ahead of time, up to
+        `config.archive.pack_read_ahead_size` bytes in total.
+        """
+
+        def size(entry_id: str) -> int:
+            archive_file = self._archive_file_object(entry_id)
+            return archive_file.size if archive_file.exists() else 0
+
+        def read(entry_id: str):
+            archive_file = self._archive_file_object(entry_id)
+            if not archive_file.exists():
+                return None
+            with open(archive_file.os_path, 'rb') as f:
+                return f.read()
+
+        read_ahead_size = config.archive.pack_read_ahead_size
+        with ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='read_ahead'
+        ) as executor:
+            pending: deque = deque()
+            pending_size = 0
+            try:
+                for entry in entries:
+                    entry_size = size(entry.entry_id)
+                    while pending and pending_size + entry_size > read_ahead_size:
+                        entry_id, future, file_size = pending.popleft()
+                        pending_size -= file_size
+                        yield entry_id, future.result()
+
+                    pending.append(
+                        (
+                            entry.entry_id,
+                            executor.submit(read, entry.entry_id),
+                            entry_size,
+                        )
+                    )
+                    pending_size += entry_size
+
+                while pending:
+                    entry_id, future, _ = pending.popleft()
+                    yield entry_id, future.result()
+            finally:
+                for _, future, _ in pending:
+                    future.cancel()
 
     def _pack_archive_files(
         self,
@@ -1268,17 +1617,21 @@ class StagingUploadFiles(UploadFiles):
         entries: List[datamodel.EntryMetadata],
         access: str,
         other_access: str,
+        counts: Dict[str, int] = None,
     ):
         number_of_entries = len(entries)
+        if counts is None:
+            counts = {}
+        counts['archive'] = 0
 
         def create_iterator():
-            for entry in entries:
-                archive_file = self._archive_file_object(entry.entry_id)
-                if archive_file.exists():
-                    with read_archive(archive_file.os_path) as archive:
-                        yield entry.entry_id, archive
+            for entry_id, data in self._read_ahead_archive_files(entries):
+                if data is not None:
+                    with read_archive(io.BytesIO(data)) as archive:
+                        yield entry_id, archive
                 else:
-                    yield entry.entry_id, None
+                    yield entry_id, None
+                counts['archive'] += 1
 
         try:
             file_object = PublicUploadFiles._create_msg_file_object(target_dir, access)
@@ -1290,6 +1643,25 @@ class StagingUploadFiles(UploadFiles):
             if other_file_object.exists():
                 other_file_object.delete()  # This file should be empty, if it exists
 
+        except Exception as e:
+            self.logger.error('exception during packing archives', exc_info=e)
+            raise
+
+        return number_of_entries
+
+    def _pack_archive_hdf5_files(
+        self,
+        target_dir: DirectoryObject,
+        entries: List[datamodel.EntryMetadata],
+        access: str,
+        other_access: str,
+        counts: Dict[str, int] = None,
+    ):
+        if counts is None:
+            counts = {}
+        counts['hdf5'] = 0
+
+        try:
             file_object = PublicUploadFiles._create_archive_hdf5_file_object(
                 target_dir, access
             )
@@ -1297,12 +1669,12 @@ class StagingUploadFiles(UploadFiles):
 
             with h5py.File(file_object.os_path, 'w') as hdf5_target:
                 for entry in entries:
-                    with h5py.File(
-                        self.archive_hdf5_file(entry.entry_id), 'a'
-                    ) as hdf5_source:
-                        group = hdf5_target.create_group(entry.entry_id)
-                        for key in hdf5_source.keys():
-                            hdf5_source.copy(key, group)
+                    with self.archive_hdf5_file(entry.entry_id) as f:
+                        with h5py.File(f, 'a') as hdf5_source:
+                            group = hdf5_target.create_group(entry.entry_id)
+                            for key in hdf5_source.keys():
+                                hdf5_source.copy(key, group)
+                    counts['hdf5'] += 1
             other_file_object = PublicUploadFiles._create_archive_hdf5_file_object(
                 target_dir, other_access
             )
@@ -1310,14 +1682,20 @@ class StagingUploadFiles(UploadFiles):
                 other_file_object.delete()
 
         except Exception as e:
-            self.logger.error('exception during packing archives', exc_info=e)
+            self.logger.error('exception during packing hdf5 archives', exc_info=e)
             raise
 
-        return number_of_entries
-
     def _pack_raw_files(
-        self, target_dir: DirectoryObject, access: str, other_access: str
+        self,
+        target_dir: DirectoryObject,
+        access: str,
+        other_access: str,
+        counts: Dict[str, int] = None,
     ):
+        if counts is None:
+            counts = {}
+        counts['raw'] = 0
+
         try:
             raw_zip_file_object = PublicUploadFiles._create_raw_zip_file_object(
                 target_dir, access
@@ -1333,12 +1711,26 @@ class StagingUploadFiles(UploadFiles):
                     raw_zip.write(
                         self._raw_dir.join_file(path_info.path).os_path, path_info.path
                     )
+                    counts['raw'] += 1
+            RawZipIndex.create(
+                raw_zip_file_object.os_path,
+                PublicUploadFiles._create_raw_index_file_object(
+                    target_dir, access
+                ).os_path,
+            )
             # Remove the zip file with the opposite access, if it exists
             other_raw_zip_file_object = PublicUploadFiles._create_raw_zip_file_object(
                 target_dir, other_access
             )
             if other_raw_zip_file_object.exists():
                 other_raw_zip_file_object.delete()  # This file should be empty, if it exists
+            other_raw_index_file_object = (
+                PublicUploadFiles._create_raw_index_file_object(
+                    target_dir, other_access
+                )
+            )
+            if other_raw_index_file_object.exists():
+                other_raw_index_file_object.delete()
         except Exception as e:
             self.logger.error('exception during packing raw files', exc_info=e)
             raise
@@ -1431,10 +1823,217 @@ class StagingUploadFiles(UploadFiles):
             yield bundle_file_source.sub_source(bundle_info_filename)
 
 
+class ZipMemberFile(io.RawIOBase):
+    """
+    Reads an uncompressed member directly from the zip file, with random access and
+    without opening the zip file and reading its central directory.
+    """
+
+    def __init__(self, zip_path: str, name: str, offset: int, size: int):
+        self.name = name
+        self._file = open(zip_path, 'rb', buffering=0)
+        self._offset = offset
+        self._size = size
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        length = min(len(buffer), self._size - self._position)
+        if length <= 0:
+            return 0
+        self._file.seek(self._offset + self._position)
+        length = self._file.readinto(memoryview(buffer)[:length])
+        self._position += length
+        return length
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        if offset < 0:
+            raise ValueError('negative seek position')
+        self._position = offset
+        return offset
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+class RawZipIndex:
+    """
+    A sidecar index for the raw zip file of published uploads. It is stored as SQLite
+    file next to the zip file and contains all files and directories with their sizes.
+    For uncompressed files it also contains the offset of the data in the zip file.
+
+    With the index, paths and directory listings are looked up without reading the
+    central directory of the zip file, and uncompressed files are read directly. The
+    index is only used, if it was created for a zip file of the same size and
+    modification time.
+    """
+
+    # Reads are memory mapped up to this size.
+    mmap_size = 256 * 1024 * 1024
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    @staticmethod
+    def create(zip_path: str, index_path: str):
+        """Creates the index for the given zip file."""
+        rows: List[Tuple[str, str, str, bool, int, Optional[int]]] = []
+        directory_sizes: Dict[str, int] = {}
+        with zipfile.ZipFile(zip_path) as zf, open(zip_path, 'rb') as f:
+            for info in zf.infolist():
+                path = info.filename
+                file_name = os.path.basename(path)
+                directory_path = os.path.dirname(path)
+                size = info.file_size if file_name else 0
+
+                if directory_path:
+                    # Ensure that all parent directories are added
+                    sub_path = ''
+                    for directory in directory_path.split(os.path.sep):
+                        sub_path = os.path.join(sub_path, directory)
+                        directory_sizes[sub_path] = (
+                            directory_sizes.get(sub_path, 0) + size
+                        )
+
+                if not file_name:
+                    continue
+
+                offset = None
+                if info.compress_type == zipfile.ZIP_STORED and not info.flag_bits & 1:
+                    # The data follows the local file header and its variable fields
+                    f.seek(info.header_offset)
+                    header = f.read(30)
+                    if header[:4] == b'PK\x03\x04':
+                        name_length, extra_length = struct.unpack('<2H', header[26:30])
+                        offset = info.header_offset + 30 + name_length + extra_length
+                rows.append((path, directory_path, file_name, True, size, offset))
+
+            zip_stat = os.fstat(f.fileno())
+
+        tmp_index_path = f'{index_path}.tmp'
+        if os.path.exists(tmp_index_path):
+            os.remove(tmp_index_path)
+        connection = sqlite3.connect(tmp_index_path)
+        try:
+            with connection:
+                connection.execute(
+                    """
+                    CREATE TABLE paths (
+                        path TEXT PRIMARY KEY,
+                        directory TEXT NOT NULL,
+                        name TEXT NOT NULL,
+                        is_file INTEGER NOT NULL,
+                        size INTEGER NOT NULL,
+                        data_offset INTEGER
+                    )
+                    """
+                )
+                connection.execute(
+                    'CREATE INDEX paths_directory ON paths (directory, name)'
+                )
+                connection.executemany(
+                    'INSERT OR REPLACE INTO paths VALUES (?, ?, ?, ?, ?, ?)', rows
+                )
+                connection.executemany(
+                    'INSERT INTO paths VALUES (?, ?, ?, ?, ?, ?)',
+                    (
+                        (
+                            path,
+                            os.path.dirname(path),
+                            os.path.basename(path),
+                            False,
+                            size,
+                            None,
+                        )
+                        for path, size in directory_sizes.items()
+                    ),
+                )
+                connection.execute(
+                    """
+                    CREATE TABLE zip (
+                        size INTEGER NOT NULL,
+                        mtime_ns INTEGER NOT NULL
+                    )
+                    """
+                )
+                connection.execute(
+                    'INSERT INTO zip VALUES (?, ?)',
+                    (zip_stat.st_size, zip_stat.st_mtime_ns),
+                )
+        finally:
+            connection.close()
+        os.replace(tmp_index_path, index_path)
+
+    @staticmethod
+    def open(zip_path: str, index_path: str) -> Optional['RawZipIndex']:
+        """
+        Opens the index for the given zip file. Returns None, if there is no index or if
+        it does not match the zip file.
+        """
+        try:
+            zip_stat = os.stat(zip_path)
+            # the index is never changed, only replaced, sqlite does not need to lock it
+            connection = sqlite3.connect(
+                f'{pathlib.Path(index_path).absolute().as_uri()}?mode=ro&immutable=1',
+                uri=True,
+                check_same_thread=False,
+            )
+        except (OSError, sqlite3.Error):
+            return None
+
+        try:
+            connection.execute(f'PRAGMA mmap_size = {RawZipIndex.mmap_size}')
+            index_zip_stat = connection.execute(
+                'SELECT size, mtime_ns FROM zip'
+            ).fetchone()
+        except sqlite3.Error:
+            index_zip_stat = None
+        if index_zip_stat != (zip_stat.st_size, zip_stat.st_mtime_ns):
+            connection.close()
+            return None
+
+        return RawZipIndex(connection)
+
+    def get(self, path: str) -> Optional[Tuple[bool, int, Optional[int]]]:
+        """
+        Returns if the path is a file, its size, and the offset of the file data if it
+        is stored uncompressed. Returns None if the path does not exist.
+        """
+        return self._connection.execute(
+            'SELECT is_file, size, data_offset FROM paths WHERE path = ?', (path,)
+        ).fetchone()
+
+    def directory_list(self, path: str) -> List[Tuple[str, str, bool, int]]:
+        """Returns the name, path, if it is a file, and size for all directory items."""
+        return self._connection.execute(
+            'SELECT name, path, is_file, size FROM paths '
+            'WHERE directory = ? ORDER BY name',
+            (path,),
+        ).fetchall()
+
+    def close(self):
+        self._connection.close()
+
+
 class PublicUploadFiles(UploadFiles):
     def __init__(self, upload_id: str, create: bool = False):
         super().__init__(upload_id, create)
         self._directories: Dict[str, Dict[str, RawPathInfo]] = None
+        self._raw_index: RawZipIndex = None
+        self._raw_index_opened: bool = False
         self._raw_zip_file_object: PathObject = None
         self._raw_zip_file: zipfile.ZipFile = None
         self._archive_hdf5_file_object: PathObject = None
@@ -1459,6 +2058,8 @@ class PublicUploadFiles(UploadFiles):
         if self._raw_zip_file is not None:
             self._raw_zip_file.close()
 
+        self._close_raw_index()
+
         if self._archive_msg_file is not None:
             self._archive_msg_file.close()
 
@@ -1545,6 +2146,37 @@ class PublicUploadFiles(UploadFiles):
         self.access  # Invoke to initialize
         return self._raw_zip_file_object
 
+    @staticmethod
+    def _create_raw_index_file_object(
+        target_dir: DirectoryObject, access: str
+    ) -> PathObject:
+        return target_dir.join_file(f'raw-{access}.index.sqlite')
+
+    def _open_raw_index(self) -> Optional[RawZipIndex]:
+        """
+        Opens the index of the raw zip file. Returns None, if there is no index that
+        matches the raw zip file, e.g. for uploads that were packed without an index.
+        """
+        if not self._raw_index_opened:
+            self._raw_index_opened = True
+            try:
+                raw_zip_file_object = self.raw_zip_file_object()
+            except KeyError:
+                return None
+            self._raw_index = RawZipIndex.open(
+                raw_zip_file_object.os_path,
+                PublicUploadFiles._create_raw_index_file_object(
+                    self, self.access
+                ).os_path,
+            )
+        return self._raw_index
+
+    def _close_raw_index(self):
+        if self._raw_index is not None:
+            self._raw_index.close()
+        self._raw_index = None
+        self._raw_index_opened = False
+
     def _open_raw_zip_file(self) -> zipfile.ZipFile:
         if self._raw_zip_file:
             return self._raw_zip_file
@@ -1605,7 +2237,9 @@ class PublicUploadFiles(UploadFiles):
         if not msg_file_object.exists():
             raise FileNotFoundError()
 
-        archive = read_archive(msg_file_object.os_path, use_blocked_toc=use_blocked_toc)
+        archive = archive_reader_pool.open(
+            self.upload_id, msg_file_object.os_path, use_blocked_toc=use_blocked_toc
+        )
         assert archive is not None
         self._archive_msg_file = archive
 
@@ -1694,9 +2328,35 @@ class PublicUploadFiles(UploadFiles):
                     path=path, is_file=False, size=size, access=self.access
                 )
 
+    def _directory_content(self, path: str):
+        """
+        Returns the content of the directory as dict of names and RawPathInfo, or the
+        RawPathInfo if the path is a file, or None if the path does not exist.
+        """
+        raw_index = self._open_raw_index()
+        if raw_index is None:
+            self._parse_content()
+            return self._directories.get(path)
+
+        if path:
+            path_info = raw_index.get(path)
+            if path_info is None:
+                return None
+            is_file, size, _ = path_info
+            if is_file:
+                return RawPathInfo(
+                    path=path, is_file=True, size=size, access=self.access
+                )
+
+        return {
+            name: RawPathInfo(
+                path=item_path, is_file=bool(is_file), size=size, access=self.access
+            )
+            for name, item_path, is_file, size in raw_index.directory_list(path)
+        }
+
     def is_empty(self) -> bool:
-        self._parse_content()
-        return not self._directories.get('')
+        return not self._directory_content('')
 
     def raw_path_exists(self, path: str) -> bool:
         if not is_safe_relative_path(path):
@@ -1705,9 +2365,15 @@ class PublicUploadFiles(UploadFiles):
             return (
                 not path  # We consider the empty path (i.e. root) to always "exists".
             )
-        self._parse_content()
         explicit_directory_path = path.endswith(os.path.sep)
         path = path.rstrip(os.path.sep)
+        raw_index = self._open_raw_index()
+        if raw_index is not None:
+            path_info = raw_index.get(path) if path else (False, 0, None)
+            return path_info is not None and not (
+                explicit_directory_path and path_info[0]
+            )
+        self._parse_content()
         base_name = os.path.basename(path)
         directory_path = os.path.dirname(path)
         directory_content = self._directories.get(directory_path)
@@ -1724,11 +2390,15 @@ class PublicUploadFiles(UploadFiles):
     def raw_path_is_file(self, path: str) -> bool:
         if not is_safe_relative_path(path) or self.missing_raw_files:
             return False
-        self._parse_content()
         base_name = os.path.basename(path)
         directory_path = os.path.dirname(path)
         if not base_name:
             return False  # Requested path is an explicit directory path
+        raw_index = self._open_raw_index()
+        if raw_index is not None:
+            path_info = raw_index.get(path)
+            return path_info is not None and bool(path_info[0])
+        self._parse_content()
         directory_content = self._directories.get(directory_path)
         if directory_content and base_name in directory_content:
             path_info = directory_content[base_name]
@@ -1747,9 +2417,8 @@ class PublicUploadFiles(UploadFiles):
             return
         if not path and self.missing_raw_files:
             return
-        self._parse_content()
         path = path.rstrip(os.path.sep)
-        directory_content = self._directories.get(path)
+        directory_content = self._directory_content(path)
         if directory_content is not None:
             if isinstance(directory_content, RawPathInfo):
                 directory_content = {directory_content.path: directory_content}
@@ -1776,6 +2445,20 @@ class PublicUploadFiles(UploadFiles):
             del kwargs['mode']
         mode = mode if mode else 'rb'
 
+        raw_index = self._open_raw_index()
+        if raw_index is not None:
+            path_info = raw_index.get(file_path)
+            if path_info is None or not path_info[0]:
+                raise KeyError(file_path)
+            _, size, offset = path_info
+            if offset is not None and not kwargs:
+                f = io.BufferedReader(
+                    ZipMemberFile(
+                        self.raw_zip_file_object().os_path, file_path, offset, size
+                    )
+                )
+                return io.TextIOWrapper(f) if 't' in mode else f
+
         try:
             zf = self._open_raw_zip_file()
             f = zf.open(file_path, 'r', **kwargs)
@@ -1794,6 +2477,13 @@ class PublicUploadFiles(UploadFiles):
 
     def raw_file_size(self, file_path: str) -> int:
         assert is_safe_relative_path(file_path)
+        raw_index = self._open_raw_index()
+        if raw_index is not None:
+            path_info = raw_index.get(file_path)
+            if path_info is None or not path_info[0]:
+                raise KeyError(file_path)
+            return path_info[1]
+
         try:
             zf = self._open_raw_zip_file()
             info = zf.getinfo(file_path)
@@ -1830,6 +2520,7 @@ class PublicUploadFiles(UploadFiles):
         ):
             return  # Nothing to do
         self.close()
+        archive_reader_pool.invalidate(self.upload_id)
         new_access = 'restricted' if with_embargo else 'public'
         msg_file_object = PublicUploadFiles._create_msg_file_object(self, self.access)
         msg_file_object_new = PublicUploadFiles._create_msg_file_object(
@@ -1847,6 +2538,14 @@ class PublicUploadFiles(UploadFiles):
             if raw_zip_file_object_new.exists():
                 raw_zip_file_object_new.delete()  # We have checked that the file is empty anyway
             os.rename(raw_zip_file_object.os_path, raw_zip_file_object_new.os_path)
+        raw_index_file_object = PublicUploadFiles._create_raw_index_file_object(
+            self, self.access
+        )
+        raw_index_file_object_new = PublicUploadFiles._create_raw_index_file_object(
+            self, new_access
+        )
+        if raw_index_file_object.exists():
+            os.replace(raw_index_file_object.os_path, raw_index_file_object_new.os_path)
         hdf5_file_object = PublicUploadFiles._create_archive_hdf5_file_object(
             self, self.access
         )
@@ -1861,6 +2560,7 @@ class PublicUploadFiles(UploadFiles):
         # Clear the cached values
         self._access = None
         self._raw_zip_file = self._raw_zip_file_object = None
+        self._close_raw_index()
         self._archive_msg_file = self._archive_msg_file_object = None
         self._archive_hdf5_file = self._archive_hdf5_file_object = None
 
@@ -22,7 +22,7 @@ import dataclasses
 import functools
 import os
 import re
-from typing import Any, Callable, Type
+from typing import Any, Callable, Iterable, Type
 
 import orjson
 from fastapi import HTTPException
@@ -31,6 +31,7 @@ from mongoengine import Q
 from nomad import utils
 from nomad.app.v1.models import (
     MetadataPagination,
+    MetadataRequired,
     Pagination,
     PaginationResponse,
     Metadata,
@@ -38,7 +39,7 @@ from nomad.app.v1.models import (
 from nomad.app.v1.routers.datasets import DatasetPagination
 from nomad.app.v1.routers.entries import perform_search
 from nomad.app.v1.routers.uploads import (
-    get_upload_with_read_access,
+    check_upload_read_access,
     upload_to_pydantic,
     entry_to_pydantic,
     UploadProcDataQuery,
@@ -689,6 +690,11 @@ class GeneralReader:
     # controls the names of fields that are treated as dataset id
     __DATASET_ID__: set = {'datasets'}
     __CACHE__: str = '__CACHE__'
+    # keys in the cache pool under which resolved uploads and entries are memoized
+    __UPLOAD_CACHE__: str = '__UPLOAD_CACHE__'
+    __ENTRY_CACHE__: str = '__ENTRY_CACHE__'
+    # maximum number of ids checked by a single search or mongo query
+    __BATCH_SIZE__: int = 1000
 
     def __init__(
         self,
@@ -727,6 +733,8 @@ class GeneralReader:
         # can only store uploads in the reader
         # due to limitations of upload class (open/close limitations)
         self.upload_pool: dict[str, UploadFiles] = {}
+        # used for memoizing access checks if there is no global root
+        self._local_cache: dict = {}
 
         self.required_query: dict | RequestConfig
         if not init:
@@ -802,6 +810,84 @@ class GeneralReader:
             path, set()
         ).add(config_hash)
 
+    def _access_cache(self, name: str) -> dict:
+        """
+        Returns the memo with the given name that maps ids to the result of their access check.
+        The memo lives in the cache pool of the global root, so it is shared by all child readers
+        and discarded together with the rest of the cache once the request is done.
+        """
+        if self.global_root is None:
+            return self._local_cache.setdefault(name, {})
+
+        return self.global_root.setdefault(GeneralReader.__CACHE__, {}).setdefault(
+            name, {}
+        )
+
+    def _prefetch_uploads(self, upload_ids: list):
+        """
+        Checks the read access of all given uploads that are not memoized yet with one query.
+        The memo stores either the `Upload` or the `HTTPException` that denies access.
+        """
+        cache = self._access_cache(GeneralReader.__UPLOAD_CACHE__)
+        missing = list({v for v in upload_ids if isinstance(v, str) and v not in cache})
+        for start in range(0, len(missing), GeneralReader.__BATCH_SIZE__):
+            batch = missing[start : start + GeneralReader.__BATCH_SIZE__]
+            found = {
+                upload.upload_id: upload
+                for upload in Upload.objects(upload_id__in=batch)
+            }
+            for upload_id in batch:
+                try:
+                    cache[upload_id] = check_upload_read_access(
+                        found.get(upload_id), self.user, include_others=True
+                    )
+                except HTTPException as e:
+                    cache[upload_id] = e
+
+    def _get_upload(self, upload_id: str) -> Upload:
+        """
+        Memoized version of `get_upload_with_read_access`, raises `HTTPException` if no access.
+        """
+        self._prefetch_uploads([upload_id])
+        upload = self._access_cache(GeneralReader.__UPLOAD_CACHE__)[upload_id]
+        if isinstance(upload, HTTPException):
+            raise upload
+
+        return upload
+
+    def _prefetch_entries(self, entry_ids: list):
+        """
+        Checks the visibility of all given entries that are not memoized yet with one search
+        and loads the visible ones with one mongo query.
+        The memo stores the plain entry dict or `None` if the entry is not visible.
+        """
+        cache = self._access_cache(self.__ENTRY_CACHE__)
+        missing = list({v for v in entry_ids if isinstance(v, str) and v not in cache})
+        for start in range(0, len(missing), GeneralReader.__BATCH_SIZE__):
+            batch = missing[start : start + GeneralReader.__BATCH_SIZE__]
+            search_response = perform_search(
+                owner='all',
+                query={'entry_id:any': batch},
+                required=MetadataRequired(include=['entry_id']),
+                pagination=MetadataPagination(page_size=len(batch)),
+                user_id=self.user.user_id,
+            )
+            visible = [v['entry_id'] for v in search_response.data]
+            cache.update({entry_id: None for entry_id in batch})
+            for entry in Entry.objects(entry_id__in=visible):
+                cache[entry.entry_id] = self._overwrite_entry(entry)
+
+    def _prefetch(self, ids: Iterable, config: RequestConfig):
+        """
+        Resolves the access of a list of ids with a few queries, instead of one query per id.
+        """
+        if config.directive is DirectiveType.plain:
+            return
+        if config.resolve_type is ResolveType.upload:
+            self._prefetch_uploads(ids)
+        elif config.resolve_type is ResolveType.entry:
+            self._prefetch_entries(ids)
+
     def retrieve_user(self, user_id: str) -> str | dict:
         # `me` is a convenient way to refer to the current user
         if user_id == 'me':
@@ -841,9 +927,7 @@ class GeneralReader:
 
     def retrieve_upload(self, upload_id: str) -> str | dict:
         try:
-            upload: Upload = get_upload_with_read_access(
-                upload_id, self.user, include_others=True
-            )
+            upload: Upload = self._get_upload(upload_id)
         except HTTPException as e:
             if e.status_code == 404:
                 self._log(
@@ -870,19 +954,16 @@ class GeneralReader:
         return plain_dict
 
     def retrieve_entry(self, entry_id: str) -> str | dict:
-        if (
-            perform_search(
-                owner='all', query={'entry_id': entry_id}, user_id=self.user.user_id
-            ).pagination.total
-            == 0
-        ):
+        self._prefetch_entries([entry_id])
+        if (entry := self._access_cache(self.__ENTRY_CACHE__)[entry_id]) is None:
             self._log(
                 f'The value {entry_id} is not a valid entry id or not visible to current user.',
                 error_type=QueryError.NOACCESS,
             )
             return entry_id
 
-        return self._overwrite_entry(Entry.objects(entry_id=entry_id).first())
+        # the memoized dict may be handed out multiple times
+        return copy.deepcopy(entry)
 
     def retrieve_dataset(self, dataset_id: str) -> str | dict:
         if (
@@ -907,9 +988,7 @@ class GeneralReader:
             # get the archive
             # does the current user have access to the target archive?
             try:
-                upload: Upload = get_upload_with_read_access(
-                    upload_id, self.user, include_others=True
-                )
+                upload: Upload = self._get_upload(upload_id)
             except HTTPException:
                 raise ArchiveError(
                     f'Current user does not have access to upload {upload_id}.'
@@ -957,7 +1036,10 @@ class GeneralReader:
         # populate an empty list to keep the structure
         _populate_result(node.result_root, node.current_path, [])
         new_config: RequestConfig = config.new({'index': None}, retain_pattern=True)
-        for i in _normalise_index(config.index, len(node.archive)):
+        indices = list(_normalise_index(config.index, len(node.archive)))
+        # lazy, items are only loaded if the ids need to be resolved
+        self._prefetch((node.archive[i] for i in indices), new_config)
+        for i in indices:
             self._resolve(
                 node.replace(
                     archive=node.archive[i], current_path=node.current_path + [str(i)]
@@ -1732,23 +1814,25 @@ class EntryReader(MongoReader):
 
 
 class ElasticSearchReader(EntryReader):
-    def retrieve_entry(self, entry_id: str) -> str | dict:
-        search_response = perform_search(
-            owner='all', query={'entry_id': entry_id}, user_id=self.user.user_id
-        )
-
-        if search_response.pagination.total == 0:
-            self._log(
-                f'The value {entry_id} is not a valid entry id or not visible to current user.',
-                error_type=QueryError.NOACCESS,
+    # search results differ from the mongo entries memoized by other readers
+    __ENTRY_CACHE__: str = '__SEARCH_ENTRY_CACHE__'
+
+    def _prefetch_entries(self, entry_ids: list):
+        cache = self._access_cache(self.__ENTRY_CACHE__)
+        missing = list({v for v in entry_ids if isinstance(v, str) and v not in cache})
+        for start in range(0, len(missing), GeneralReader.__BATCH_SIZE__):
+            batch = missing[start : start + GeneralReader.__BATCH_SIZE__]
+            search_response = perform_search(
+                owner='all',
+                query={'entry_id:any': batch},
+                pagination=MetadataPagination(page_size=len(batch)),
+                user_id=self.user.user_id,
             )
-            return entry_id
-
-        plain_dict = search_response.data[0]
-        if mainfile := plain_dict.pop('mainfile', None):
-            plain_dict['mainfile_path'] = mainfile
-
-        return plain_dict
+            cache.update({entry_id: None for entry_id in batch})
+            for plain_dict in search_response.data:
+                if mainfile := plain_dict.pop('mainfile', None):
+                    plain_dict['mainfile_path'] = mainfile
+                cache[plain_dict['entry_id']] = plain_dict
 
     @classmethod
     def validate_config(cls, key: str, config: RequestConfig):
@@ -1848,9 +1932,7 @@ class FileSystemReader(GeneralReader):
             has_global_root = True
 
         try:
-            upload: Upload = get_upload_with_read_access(
-                upload_id, self.user, include_others=True
-            )
+            upload: Upload = self._get_upload(upload_id)
         except HTTPException:
             self._log(
                 f'Current user does not have access to upload {upload_id}.',
@@ -2466,9 +2548,7 @@ class ArchiveReader(GeneralReader):
         self, m_def: str | None, m_def_id: str | None, node: GraphNode
     ):
         # todo: more flexible definition retrieval, accounting for definition id, mismatches, etc.
-        context = ServerContext(
-            get_upload_with_read_access(node.upload_id, self.user, include_others=True)
-        )
+        context = ServerContext(self._get_upload(node.upload_id))
 
         def __resolve_definition_in_archive(
             _root: dict,
@@ -15,14 +15,63 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
-from typing import Iterable, List, Optional
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from cachetools import TTLCache
 from mongoengine import Document, StringField, ListField
 from mongoengine.queryset.visitor import Q
 
+from nomad.config import config
 from nomad.utils import create_uuid
 
 
+class UserGroupIdsCache:
+    """
+    A per process TTL/LRU cache for the ids of the user groups that users are owner or
+    member of. It is cleared whenever a :class:`UserGroup` is saved, updated, or deleted
+    in this process. Changes made by other processes become visible after the TTL.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.enabled = maxsize > 0 and ttl > 0
+        self._cache: TTLCache = TTLCache(maxsize=max(maxsize, 1), ttl=max(ttl, 1))
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, user_id: str) -> List[str]:
+        """Returns the group ids for the given user, loads them if not cached."""
+        if not self.enabled:
+            return UserGroup.get_ids_by_user_id(user_id)
+
+        with self._lock:
+            group_ids: Optional[Tuple[str, ...]] = self._cache.get(user_id)
+            if group_ids is not None:
+                self._hits += 1
+                return list(group_ids)
+            self._misses += 1
+
+        group_ids = tuple(UserGroup.get_ids_by_user_id(user_id))
+        with self._lock:
+            self._cache[user_id] = group_ids
+        return list(group_ids)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = self._hits + self._misses
+            return dict(
+                hits=self._hits,
+                misses=self._misses,
+                hit_rate=self._hits / requests if requests > 0 else 0.0,
+                users=len(self._cache),
+            )
+
+
 class UserGroup(Document):
     """
     A group of users. One user is the owner, all others are members.
@@ -37,6 +86,21 @@ class UserGroup(Document):
 
     meta = {'indexes': ['group_name', 'owner', 'members']}
 
+    def save(self, *args, **kwargs):
+        result = super().save(*args, **kwargs)
+        user_group_ids_cache.clear()
+        return result
+
+    def update(self, *args, **kwargs):
+        result = super().update(*args, **kwargs)
+        user_group_ids_cache.clear()
+        return result
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        user_group_ids_cache.clear()
+        return result
+
     @classmethod
     def get_by_user_id(cls, user_id: Optional[str]):
         """
@@ -59,6 +123,12 @@ class UserGroup(Document):
         return group_ids
 
 
+user_group_ids_cache = UserGroupIdsCache(
+    maxsize=config.services.user_group_cache_size,
+    ttl=config.services.user_group_cache_ttl,
+)
+
+
 def create_user_group(
     *,
     group_id: Optional[str] = None,
@@ -99,5 +169,13 @@ def user_group_exists(group_id: str, *, include_all=True) -> bool:
     return get_user_group(group_id) is not None
 
 
-def get_group_ids(user_id):
+def get_group_ids(user_id, *, use_cache: bool = False):
+    """
+    Returns the ids of all user groups of the given user, including the special group
+    'all'. With `use_cache`, the ids are taken from the :data:`user_group_ids_cache`,
+    which is only up to date with changes of this process. Only use it for read access
+    filters, not for authorizing changes.
+    """
+    if use_cache and user_id is not None:
+        return user_group_ids_cache.get(user_id)
     return UserGroup.get_ids_by_user_id(user_id)
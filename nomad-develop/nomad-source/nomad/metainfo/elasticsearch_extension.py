@@ -157,6 +157,15 @@ sub-sections as if they were direct sub-sections.
 """
 
 import math
+import time
+import weakref
+from concurrent.futures import (
+    ALL_COMPLETED,
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
 from typing import (
     Union,
     Any,
@@ -168,11 +177,15 @@ from typing import (
     Tuple,
     Optional,
     DefaultDict,
+    Iterable,
+    Iterator,
 )
 from collections import defaultdict
 import numpy as np
+import orjson
 from pint import Quantity as PintQuantity
 import re
+from elasticsearch.serializer import JSONSerializer
 from elasticsearch_dsl import Q
 
 from nomad import utils
@@ -193,6 +206,8 @@ from .metainfo import (
     QuantityReference,
     Unit,
     Package,
+    QuantitySerializer,
+    SectionSerializer,
 )
 
 from typing import TYPE_CHECKING
@@ -206,6 +221,32 @@ yaml_prefix = 'entry_id:'
 nexus_prefix = 'nexus.'
 
 
+class _IndexedQuantity(QuantitySerializer):
+    """
+    The serialization of one indexed quantity. The `actions` are the Elasticsearch
+    annotations that transform the value or collect suggestions.
+    """
+
+    def __init__(self, doc_type: 'DocumentType', quantity: Quantity):
+        super().__init__(quantity)
+
+        self.actions: List[Tuple[bool, 'Elasticsearch']] = []
+        for annotation in quantity.m_get_annotations(Elasticsearch, as_list=True):
+            if annotation.field is not None:
+                continue
+            if annotation.suggestion:
+                # the suggestions may have a different doc_type: we don't
+                # serialize them if the doc types don't match
+                if doc_type != entry_type and annotation.doc_type != doc_type:
+                    continue
+                self.actions.append((True, annotation))
+            elif annotation.value is not None:
+                # the first value transformation replaces the value, the
+                # remaining annotations are never reached
+                self.actions.append((False, annotation))
+                break
+
+
 class DocumentType:
     """
     DocumentType allows to create Elasticsearch index mappings and documents based on
@@ -238,85 +279,225 @@ class DocumentType:
         self.quantities: Dict[str, SearchQuantity] = {}
         self.suggestions: Dict[str, Elasticsearch] = {}
         self.metrics: Dict[str, Tuple[str, SearchQuantity]] = {}
+        # the section definitions that store an indexing plan of this document type,
+        # weak as sections of custom schemas come and go with their archives
+        self._indexed_section_defs: weakref.WeakSet = weakref.WeakSet()
 
     def _reset(self):
+        for section_def in list(self._indexed_section_defs):
+            section_def._serializers.pop(self.name, None)
+        self._indexed_section_defs.clear()
         self.indexed_properties.clear()
         self.nested_object_keys.clear()
         self.nested_sections.clear()
         self.quantities.clear()
         self.metrics.clear()
 
+    def _indexed_section(self, section_def: Section) -> SectionSerializer:
+        def create():
+            self._indexed_section_defs.add(section_def)
+            return SectionSerializer(
+                section_def,
+                lambda definition: definition in self.indexed_properties,
+                lambda quantity: _IndexedQuantity(self, quantity),
+            )
+
+        return SectionSerializer.get(section_def, self.name, create)
+
     def create_index_doc(self, root: MSection):
         """
         Creates an indexable document from the given archive.
+
+        The result is the same as `root.m_to_dict(...)` with all non indexed properties
+        excluded and values transformed according to the Elasticsearch annotations.
+        Instead of the generic `m_to_dict`, it follows an indexing plan that is compiled
+        once per section definition, see :class:`SectionSerializer`.
         """
         suggestions: DefaultDict = defaultdict(list)
+        root_path = root.m_path()
 
-        def transform(quantity, section, value, path):
+        def transform(indexed_quantity, section, value, path, section_path=None):
             """
-            Custom transform function that possibly transforms the indexed
-            values and also gathers the suggestion values for later storage.
+            Possibly transforms the indexed values and also gathers the suggestion
+            values for later storage.
             """
-            elasticsearch_annotations = quantity.m_get_annotations(
-                Elasticsearch, as_list=True
-            )
-            for elasticsearch_annotation in elasticsearch_annotations:
-                if elasticsearch_annotation.field is None:
-                    if elasticsearch_annotation.suggestion:
-                        # The suggestions may have a different doc_type: we
-                        # don't serialize them if the doc types don't match.
-                        if (
-                            self != entry_type
-                            and elasticsearch_annotation.doc_type != self
-                        ):
-                            continue
-
-                        # The suggestion values are saved into a temporary
-                        # dictionary. The actual path of the data in the
-                        # metainfo is used as a key. The suggestions will also
-                        # take into account any given variants of the input.
-                        transform_function = elasticsearch_annotation.value
-                        variants = elasticsearch_annotation.variants
-                        if transform_function is not None:
-                            if variants:
-                                suggestion_value = []
-                                for variant in variants(value):
-                                    suggestion_value.extend(transform_function(variant))
-                                suggestion_value = list(set(suggestion_value))
-                            else:
-                                suggestion_value = transform_function(value)
-                        else:
-                            suggestion_value = value
-                        section_path = section.m_path()[len(root.m_path()) :]
-                        name = elasticsearch_annotation.property_name
-                        if path:
-                            suggestion_path = f'{section_path}/{path}/{name}'
-                        else:
-                            suggestion_path = f'{section_path}/{name}'
-                        suggestions[suggestion_path].extend(suggestion_value)
+            for is_suggestion, elasticsearch_annotation in indexed_quantity.actions:
+                if not is_suggestion:
+                    return elasticsearch_annotation.value(section)
+
+                # The suggestion values are saved into a temporary
+                # dictionary. The actual path of the data in the
+                # metainfo is used as a key. The suggestions will also
+                # take into account any given variants of the input.
+                transform_function = elasticsearch_annotation.value
+                variants = elasticsearch_annotation.variants
+                if transform_function is not None:
+                    if variants:
+                        suggestion_value = []
+                        for variant in variants(value):
+                            suggestion_value.extend(transform_function(variant))
+                        suggestion_value = list(set(suggestion_value))
                     else:
-                        transform_function = elasticsearch_annotation.value
-                        if transform_function is not None:
-                            return transform_function(section)
+                        suggestion_value = transform_function(value)
+                else:
+                    suggestion_value = value
+                if section_path is None:
+                    section_path = section.m_path()
+                relative_path = section_path[len(root_path) :]
+                name = elasticsearch_annotation.property_name
+                if path:
+                    suggestion_path = f'{relative_path}/{path}/{name}'
+                else:
+                    suggestion_path = f'{relative_path}/{name}'
+                suggestions[suggestion_path].extend(suggestion_value)
 
             return value
 
+        def generic_transform(ref_path):
+            def transform_quantity(quantity, section, value, path):
+                indexed_quantity = self._indexed_section(
+                    section.m_def
+                ).quantity_serializers.get(quantity)
+                if indexed_quantity is None or not indexed_quantity.actions:
+                    return value
+                return transform(
+                    indexed_quantity,
+                    section,
+                    value,
+                    path if ref_path is None else ref_path,
+                )
+
+            return transform_quantity
+
         def exclude(property_, section):
-            if property_ not in self.indexed_properties:
-                return True
+            return property_ not in self.indexed_properties
+
+        def serialize_reference(indexed_quantity, section, value, path):
+            result = serialize_section(value.m_resolved(), None, path)
+            if indexed_quantity.actions:
+                return transform(indexed_quantity, section, result, path)
+            return result
+
+        def serialize_quantity(indexed_quantity, section, section_path, ref_path):
+            value = indexed_quantity.value(section)
+            if indexed_quantity.is_reference:
+                path = (
+                    f'{section_path}/{indexed_quantity.name}'
+                    if ref_path is None
+                    else ref_path
+                )
+                if indexed_quantity.shape_length == 0:
+                    return serialize_reference(indexed_quantity, section, value, path)
+                if indexed_quantity.shape_length == 1:
+                    return [
+                        serialize_reference(
+                            indexed_quantity,
+                            section,
+                            item,
+                            f'{path}/{index}' if ref_path is None else ref_path,
+                        )
+                        for index, item in enumerate(value)
+                    ]
+            else:
+                if indexed_quantity.actions:
+
+                    def serialize(item):
+                        return transform(
+                            indexed_quantity,
+                            section,
+                            indexed_quantity.serialize(section, item),
+                            ref_path,
+                            section_path,
+                        )
 
-            return False
+                else:
 
-        kwargs: Dict[str, Any] = dict(
-            with_meta=False,
-            include_defaults=True,
-            include_derived=True,
-            resolve_references=True,
-            exclude=exclude,
-            transform=transform,
-        )
+                    def serialize(item):
+                        return indexed_quantity.serialize(section, item)
+
+                if indexed_quantity.serialize_whole:
+                    return serialize(value)
+                if indexed_quantity.shape_length == 0:
+                    return serialize(value)
+                if indexed_quantity.shape_length == 1:
+                    return [serialize(item) for item in value]
+
+            raise NotImplementedError(
+                f'Higher shapes ({indexed_quantity.quantity.shape}) not supported: {indexed_quantity.quantity}'
+            )
+
+        def sub_section_path(parent_path, sub_section):
+            # the same as sub_section.m_path(), but without walking up to the root
+            name = sub_section.m_parent_sub_section.name
+            if sub_section.m_parent_index == -1:
+                return f'{parent_path}/{name}'
+            return f'{parent_path}/{name}/{sub_section.m_parent_index:d}'
+
+        def serialize_section(section, section_path, ref_path):
+            """
+            Serializes a section following the compiled plan. The `section_path` is the
+            `m_path` of the section (computed if `None`), the `ref_path` is the path of
+            the outermost reference, if the section was reached by resolving one.
+            """
+            indexed_section = self._indexed_section(section.m_def)
+            if indexed_section.is_generic(section):
+                return section.m_to_dict(
+                    with_meta=False,
+                    include_defaults=True,
+                    include_derived=True,
+                    resolve_references=True,
+                    exclude=exclude,
+                    transform=generic_transform(ref_path),
+                )
+
+            if section_path is None:
+                section_path = section.m_path()
+
+            result: Dict[str, Any] = {}
+            if (
+                section.m_parent
+                and section.m_parent_sub_section.sub_section != section.m_def
+            ):
+                # a specialized section in a base section sub section
+                result['m_def'] = section.m_def.definition_reference(section)
+
+            for indexed_quantity in indexed_section.quantities:
+                if not indexed_quantity.is_serialized(section):
+                    continue
+
+                try:
+                    result[indexed_quantity.name] = serialize_quantity(
+                        indexed_quantity, section, section_path, ref_path
+                    )
+                except ValueError as e:
+                    raise ValueError(
+                        f'Value error ({str(e)}) for {indexed_quantity.quantity}'
+                    )
+
+            parent_path = section_path.rstrip('/')
+            for name, sub_section_def, repeats in indexed_section.sub_sections:
+                if repeats:
+                    if section.m_sub_section_count(sub_section_def) > 0:
+                        result[name] = [
+                            None
+                            if item is None
+                            else serialize_section(
+                                item, sub_section_path(parent_path, item), ref_path
+                            )
+                            for item in section.m_get_sub_sections(sub_section_def)
+                        ]
+                else:
+                    sub_section = section.m_get_sub_section(sub_section_def, -1)
+                    if sub_section is not None:
+                        result[name] = serialize_section(
+                            sub_section,
+                            sub_section_path(parent_path, sub_section),
+                            ref_path,
+                        )
 
-        result = root.m_to_dict(**kwargs)
+            return result
+
+        result = serialize_section(root, root_path, None)
 
         # Add the collected suggestion values
         for path, value in suggestions.items():
@@ -1144,12 +1325,11 @@ class SearchQuantity:
         return getattr(self.annotation, name)
 
 
-def create_indices(
+def create_mappings(
     entry_section_def: Section = None, material_section_def: Section = None
 ):
     """
-    Creates the mapping for all document types and creates the indices in Elasticsearch.
-    The indices must not exist already. Prior created mappings will be replaced.
+    Creates the mapping for all document types. Prior created mappings will be replaced.
     """
     if entry_section_def is None:
         from nomad.datamodel import EntryArchive
@@ -1182,6 +1362,16 @@ def create_indices(
     ] + material_entry_type.nested_object_keys
     material_type.nested_object_keys.sort(key=lambda item: len(item))
 
+
+def create_indices(
+    entry_section_def: Section = None, material_section_def: Section = None
+):
+    """
+    Creates the mapping for all document types and creates the indices in Elasticsearch.
+    The indices must not exist already. Prior created mappings will be replaced.
+    """
+    create_mappings(entry_section_def, material_section_def)
+
     entry_index.create_index(upsert=True)  # TODO update the existing v0 index
     material_index.create_index()
 
@@ -1204,70 +1394,149 @@ def index_entries_with_materials(entries: List, refresh: bool = False):
     update_materials(entries, refresh=refresh)
 
 
+_json_serializer = JSONSerializer()
+_orjson_options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+# item status codes of bulk responses that are worth another try
+_bulk_retry_status = {429, 502, 503, 504}
+
+
+def _bulk_item(action: Dict[str, Any], doc: Dict[str, Any] = None) -> bytes:
+    """
+    Serializes a bulk action and its optional document into NDJSON. Types that orjson
+    does not know are handled like the Elasticsearch client would.
+    """
+    item = orjson.dumps(action) + b'\n'
+    if doc is not None:
+        item += (
+            orjson.dumps(doc, default=_json_serializer.default, option=_orjson_options)
+            + b'\n'
+        )
+    return item
+
+
+def _bulk_chunks(
+    items: Iterable[Tuple[str, bytes]],
+) -> Iterator[List[Tuple[str, bytes]]]:
+    """Groups bulk items into chunks of at most `config.elastic.bulk_max_bytes`."""
+    chunk: List[Tuple[str, bytes]] = []
+    chunk_size = 0
+    for item in items:
+        if chunk and chunk_size + len(item[1]) > config.elastic.bulk_max_bytes:
+            yield chunk
+            chunk, chunk_size = [], 0
+        chunk.append(item)
+        chunk_size += len(item[1])
+
+    if chunk:
+        yield chunk
+
+
+def _bulk(index: 'Index', items: Iterable[Tuple[str, bytes]]) -> Dict[str, str]:
+    """
+    Performs bulk requests for the given `(id, ndjson)` items. The items are consumed
+    lazily and sent in byte-sized chunks, with up to `config.elastic.bulk_concurrency`
+    requests in flight. Items that failed with a temporary error are retried, the
+    rest of a chunk is not sent again. Returns a dictionary of the format
+    {id: error_message} for all items that failed.
+    """
+
+    def send(chunk: List[Tuple[str, bytes]]) -> Dict[str, str]:
+        errors: Dict[str, str] = {}
+        for attempt in range(config.elastic.bulk_retries + 1):
+            result = index.bulk(
+                body=b''.join(item for _, item in chunk),
+                refresh=False,
+                timeout=f'{config.elastic.bulk_timeout}s',
+                request_timeout=config.elastic.bulk_timeout,
+            )
+            if not result['errors']:
+                return errors
+
+            retry = []
+            for (item_id, item), result_item in zip(chunk, result['items']):
+                item_result = next(iter(result_item.values()))
+                if item_result['status'] < 400:
+                    continue
+                if (
+                    item_result['status'] in _bulk_retry_status
+                    and attempt < config.elastic.bulk_retries
+                ):
+                    retry.append((item_id, item))
+                else:
+                    errors[item_id] = str(item_result.get('error'))
+
+            if not retry:
+                break
+
+            chunk = retry
+            time.sleep(0.5 * 2**attempt)
+
+        return errors
+
+    errors: Dict[str, str] = {}
+    concurrency = max(1, config.elastic.bulk_concurrency)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        in_flight: Set[Future] = set()
+
+        def collect(return_when):
+            done, not_done = wait(in_flight, return_when=return_when)
+            for future in done:
+                errors.update(future.result())
+            in_flight.intersection_update(not_done)
+
+        # creating the chunks (and docs) in this thread overlaps with the requests
+        for chunk in _bulk_chunks(items):
+            if len(in_flight) >= concurrency:
+                collect(FIRST_COMPLETED)
+            in_flight.add(executor.submit(send, chunk))
+
+        if in_flight:
+            collect(ALL_COMPLETED)
+
+    return errors
+
+
 def index_entries(entries: List, refresh: bool = False) -> Dict[str, str]:
     """
     Upserts the given entries in the entry index. Optionally updates the materials index
     as well. Returns a dictionary of the format {entry_id: error_message} for all entries
     that failed to index.
     """
-    rv = {}
-    # split into reasonably sized problems
-    if len(entries) > config.elastic.bulk_size:
-        for entries_part in [
-            entries[i : i + config.elastic.bulk_size]
-            for i in range(0, len(entries), config.elastic.bulk_size)
-        ]:
-            errors = index_entries(entries_part, refresh=refresh)
-            rv.update(errors)
-        return rv
-
     if len(entries) == 0:
-        return rv
+        return {}
 
     logger = utils.get_logger('nomad.search', n_entries=len(entries))
+    stats = dict(size=0, n_actions=0)
 
-    with utils.timer(logger, 'prepare bulk index of entries actions and docs'):
-        actions_and_docs = []
+    def items():
         for entry in entries:
+            entry_id = entry['entry_id']
             try:
-                entry_index_doc = entry_type.create_index_doc(entry)
-
-                actions_and_docs.append(dict(index=dict(_id=entry['entry_id'])))
-                actions_and_docs.append(entry_index_doc)
+                item = _bulk_item(
+                    dict(index=dict(_id=entry_id)), entry_type.create_index_doc(entry)
+                )
             except Exception as e:
                 logger.error(
-                    'could not create entry index doc',
-                    entry_id=entry['entry_id'],
-                    exc_info=e,
+                    'could not create entry index doc', entry_id=entry_id, exc_info=e
                 )
+                continue
 
-        timer_kwargs: Dict[str, Any] = {}
-        try:
-            import json
-
-            timer_kwargs['size'] = len(json.dumps(actions_and_docs))
-            timer_kwargs['n_actions'] = len(actions_and_docs)
-        except Exception:
-            pass
+            stats['size'] += len(item)
+            stats['n_actions'] += 2
+            yield entry_id, item
 
     with utils.timer(
         logger,
         'perform bulk index of entries',
         lnr_event='failed to bulk index entries',
-        **timer_kwargs,
-    ):
-        indexing_result = entry_index.bulk(
-            body=actions_and_docs,
-            refresh=refresh,
-            timeout=f'{config.elastic.bulk_timeout}s',
-            request_timeout=config.elastic.bulk_timeout,
-        )
-        # Extract only the errors from the indexing_result
-        if indexing_result['errors']:
-            for item in indexing_result['items']:
-                if item['index']['status'] >= 400:
-                    rv[item['index']['_id']] = str(item['index']['error'])
-        return rv
+    ) as timer_kwargs:
+        errors = _bulk(entry_index, items())
+        timer_kwargs.update(stats)
+
+    if refresh:
+        entry_index.refresh()
+
+    return errors
 
 
 def update_materials(entries: List, refresh: bool = False):
@@ -1307,49 +1576,57 @@ def update_materials(entries: List, refresh: bool = False):
 
     # Get existing materials for entries' material ids (i.e. the entry needs to be added
     # or updated).
-    with utils.timer(
-        logger, 'get existing materials', lnr_event='failed to get existing materials'
-    ):
-        if material_ids:
+    def get_existing_material_docs():
+        if not material_ids:
+            return []
+
+        with utils.timer(
+            logger,
+            'get existing materials',
+            lnr_event='failed to get existing materials',
+        ):
             elasticsearch_results = material_index.mget(
                 body={'docs': [dict(_id=material_id) for material_id in material_ids]},
                 request_timeout=config.elastic.bulk_timeout,
             )
-            existing_material_docs = [
+            return [
                 doc['_source']
                 for doc in elasticsearch_results['docs']
                 if '_source' in doc
             ]
-        else:
-            existing_material_docs = []
 
     # Get old materials that still have one of the entries, but the material id has changed
     # (i.e. the materials where entries need to be removed due entries having different
     # materials now).
-    with utils.timer(
-        logger, 'get old materials', lnr_event='failed to get old materials'
-    ):
-        elasticsearch_results = material_index.search(
-            body={
-                'size': len(entry_ids),
-                'query': {
-                    'bool': {
-                        'must': {
-                            'nested': {
-                                'path': 'entries',
-                                'query': {
-                                    'terms': {'entries.entry_id': list(entry_ids)}
-                                },
-                            }
-                        },
-                        'must_not': {'terms': {'material_id': list(material_ids)}},
-                    }
-                },
-            }
-        )
-        old_material_docs = [
-            hit['_source'] for hit in elasticsearch_results['hits']['hits']
-        ]
+    def get_old_material_docs():
+        with utils.timer(
+            logger, 'get old materials', lnr_event='failed to get old materials'
+        ):
+            elasticsearch_results = material_index.search(
+                body={
+                    'size': len(entry_ids),
+                    'query': {
+                        'bool': {
+                            'must': {
+                                'nested': {
+                                    'path': 'entries',
+                                    'query': {
+                                        'terms': {'entries.entry_id': list(entry_ids)}
+                                    },
+                                }
+                            },
+                            'must_not': {'terms': {'material_id': list(material_ids)}},
+                        }
+                    },
+                }
+            )
+            return [hit['_source'] for hit in elasticsearch_results['hits']['hits']]
+
+    # both are independent, send them at the same time
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        existing_material_docs_future = executor.submit(get_existing_material_docs)
+        old_material_docs = get_old_material_docs()
+        existing_material_docs = existing_material_docs_future.result()
 
     # Compare and create the appropriate materials index actions
     # First, we go through the existing materials. The following cases need to be covered:
@@ -1360,25 +1637,16 @@ def update_materials(entries: List, refresh: bool = False):
     #   case where an entry's material id changed within the set of other entries' material ids)
     # This n + m complexity with n=number of materials and m=number of entries
 
-    # We create lists of bulk operations. Each list only contains enough materials to
-    # have the ammount of entries in all these materials roughly match the desired bulk size.
-    # Using materials as a measure might not be good enough, if a single material has
-    # lots of nested entries.
-    _actions_and_docs_bulks: List[List[Any]] = []
-    _n_entries_in_bulk = [0]
-
-    def add_action_or_doc(action_or_doc):
-        if (
-            len(_actions_and_docs_bulks) == 0
-            or _n_entries_in_bulk[0] > config.elastic.bulk_size
-        ):
-            _n_entries_in_bulk[0] = 0
-            _actions_and_docs_bulks.append([])
-        _actions_and_docs_bulks[-1].append(action_or_doc)
-        if 'entries' in action_or_doc:
-            _n_entries_in_bulk[0] = _n_entries_in_bulk[0] + len(
-                action_or_doc['entries']
-            )
+    # We create a list of bulk operations. The docs are only serialized once all
+    # operations are known, because the material docs are still modified (e.g. capped)
+    # after their operation was added. The bulk requests are sized by bytes, which
+    # also accounts for materials with lots of nested entries.
+    _actions_and_docs: List[Tuple[str, Dict[str, Any], Optional[Dict[str, Any]]]] = []
+
+    def add_action(action, material_id, material_doc=None):
+        _actions_and_docs.append(
+            (material_id, {action: dict(_id=material_id)}, material_doc)
+        )
 
     material_docs = []
     material_docs_dict = {}
@@ -1422,8 +1690,7 @@ def update_materials(entries: List, refresh: bool = False):
         for index in reversed(material_entries_to_remove):
             del material_entries[index]
 
-        add_action_or_doc(dict(index=dict(_id=material_id)))
-        add_action_or_doc(material_doc)
+        add_action('index', material_id, material_doc)
         material_docs.append(material_doc)
 
     for entry_id in remaining_entry_ids:
@@ -1440,8 +1707,7 @@ def update_materials(entries: List, refresh: bool = False):
                 except Exception as e:
                     logger.error('could not create material index doc', exc_info=e)
                 material_docs_dict[material_id] = material_doc
-                add_action_or_doc(dict(create=dict(_id=material_id)))
-                add_action_or_doc(material_doc)
+                add_action('create', material_id, material_doc)
                 material_docs.append(material_doc)
             # The material does exist (now), but the entry is new.
             try:
@@ -1468,11 +1734,10 @@ def update_materials(entries: List, refresh: bool = False):
             del material_entries[index]
         if len(material_entries) == 0:
             # The material is empty now and needs to be removed.
-            add_action_or_doc(dict(delete=dict(_id=material_id)))
+            add_action('delete', material_id)
         else:
             # The material needs to be updated
-            add_action_or_doc(dict(index=dict(_id=material_id)))
-            add_action_or_doc(material_doc)
+            add_action('index', material_id, material_doc)
             material_docs.append(material_doc)
 
     # Third, we potentially cap the number of entries in a material. We ensure that only
@@ -1492,30 +1757,33 @@ def update_materials(entries: List, refresh: bool = False):
         all_n_entries += material_doc['n_entries']
 
     # Execute the created actions in bulk.
-    timer_kwargs: Dict[str, Any] = {}
-    try:
-        import json
+    stats = dict(
+        size=0,
+        n_actions=len(_actions_and_docs),
+        n_entries=all_n_entries,
+        n_entries_capped=all_n_entries_capped,
+    )
 
-        timer_kwargs['size'] = len(json.dumps(_actions_and_docs_bulks))
-        timer_kwargs['n_actions'] = sum([len(bulk) for bulk in _actions_and_docs_bulks])
-        timer_kwargs['n_entries'] = all_n_entries
-        timer_kwargs['n_entries_capped'] = all_n_entries_capped
-    except Exception:
-        pass
+    def items():
+        for material_id, action, material_doc in _actions_and_docs:
+            item = _bulk_item(action, material_doc)
+            stats['size'] += len(item)
+            yield material_id, item
 
     with utils.timer(
         logger,
         'perform bulk index of materials',
         lnr_event='failed to bulk index materials',
-        **timer_kwargs,
-    ):
-        for bulk in _actions_and_docs_bulks:
-            material_index.bulk(
-                body=bulk,
-                refresh=False,
-                timeout=f'{config.elastic.bulk_timeout}s',
-                request_timeout=config.elastic.bulk_timeout,
-            )
+    ) as timer_kwargs:
+        errors = _bulk(material_index, items())
+        timer_kwargs.update(stats)
+
+    if errors:
+        logger.warning(
+            'could not index all materials',
+            n_errors=len(errors),
+            error=next(iter(errors.values())),
+        )
 
     if refresh:
         entry_index.refresh()
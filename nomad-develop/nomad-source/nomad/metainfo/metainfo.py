@@ -1103,10 +1103,23 @@ class Context:
     def resolve_section_definition(
         self, definition_reference: str, definition_id: str
     ) -> Type[MSectionBound]:
-        pkg_definition = self.retrieve_package_by_section_definition_id(
-            definition_reference, definition_id
+        pkg = self.load_package(
+            self.retrieve_package_by_section_definition_id(
+                definition_reference, definition_id
+            )
         )
 
+        for section in pkg.section_definitions:
+            if section.definition_id == definition_id:
+                return section.section_cls
+        return None
+
+    def load_package(self, pkg_definition: dict) -> 'Package':
+        """
+        Creates and initializes the package from the given package definition, as
+        returned by :func:`retrieve_package_by_section_definition_id`.
+        """
+        pkg_definition = dict(pkg_definition)
         entry_id_based_name = pkg_definition.pop('entry_id_based_name')
         upload_id = pkg_definition.pop('upload_id', None)
         entry_id = pkg_definition.pop('entry_id', None)
@@ -1118,11 +1131,7 @@ class Context:
 
         pkg.m_context = self
         pkg.init_metainfo()
-
-        for section in pkg.section_definitions:
-            if section.definition_id == definition_id:
-                return section.section_cls
-        return None
+        return pkg
 
 
 class MSection(
@@ -3324,6 +3333,198 @@ class MSection(
         return to_dict(result) if dict else result
 
 
+class QuantitySerializer:
+    """
+    The serialization of a quantity as done by :func:`MSection.m_to_dict` with
+    `include_defaults`, `include_derived`, and `resolve_references`. All decisions
+    that only depend on the quantity definition are made once. This allows to
+    serialize many sections of the same definition, see :class:`SectionSerializer`.
+    """
+
+    def __init__(self, quantity: Quantity):
+        self.quantity = quantity
+        self.name = quantity.name
+        self.virtual = quantity.virtual
+        self.derived = quantity.derived
+        self.default = quantity.default
+        self.has_default = quantity.m_is_set(Quantity.default)
+        self.use_full_storage = quantity.use_full_storage
+        self.shape_length = len(quantity.shape)
+        self.is_scalar = quantity.is_scalar
+
+        quantity_type = quantity.type
+        self.target_name: Optional[str] = None
+        if isinstance(quantity_type, QuantityReference):
+            self.target_name = quantity_type.target_quantity_def.name
+            quantity_type = quantity_type.target_quantity_def.type
+        self.is_reference = isinstance(quantity_type, Reference)
+        # references that resolve to references are left to m_to_dict
+        self.supported = not (self.is_reference and self.target_name is not None)
+        self.serialize_whole = (
+            quantity_type in MTypes.numpy or quantity_type in MTypes.complex
+        )
+        self._serialize = None if self.is_reference else self._serializer(quantity_type)
+
+    def _serializer(self, quantity_type) -> TypingCallable[[MSection, Any], Any]:
+        quantity = self.quantity
+
+        if isinstance(quantity_type, DataType):
+            return lambda section, value: quantity_type.serialize(
+                section, quantity, value
+            )
+
+        if quantity_type in MTypes.complex:
+            return lambda section, value: serialize_complex(value)
+
+        if quantity_type in MTypes.primitive:
+            primitive = MTypes.primitive[quantity_type]
+            return lambda section, value: primitive(value)
+
+        if quantity_type in MTypes.numpy:
+            is_scalar = self.is_scalar
+
+            def serialize_dtype(section, value):
+                is_array = isinstance(value, np.ndarray)
+                if not (is_array ^ is_scalar):
+                    section.m_warning(
+                        'numpy quantity has wrong shape', quantity=str(quantity)
+                    )
+
+                return value.tolist() if is_array else value.item()
+
+            return serialize_dtype
+
+        if isinstance(quantity_type, MEnum):
+            return lambda section, value: None if value is None else str(value)
+
+        if quantity_type == Any:
+
+            def serialize_any(section, value):
+                if type(value) not in [
+                    str,
+                    int,
+                    float,
+                    bool,
+                    np.bool_,
+                    list,
+                    dict,
+                    type(None),
+                ]:
+                    raise MetainfoError(
+                        f'Only python primitives are allowed for Any typed non-virtual '
+                        f'quantities: {value} of quantity {quantity} in section {section}'
+                    )
+
+                return value
+
+            return serialize_any
+
+        def serialize_unknown(section, value):
+            raise MetainfoError(
+                f'Do not know how to serialize data with type {quantity_type} for quantity {quantity}'
+            )
+
+        return serialize_unknown
+
+    def is_serialized(self, section: MSection) -> bool:
+        """Returns True if `m_to_dict` includes this quantity for the given section."""
+        if self.virtual:
+            return self.derived is not None
+        return (
+            self.derived is not None
+            or self.name in section.__dict__
+            or self.has_default
+        )
+
+    def value(self, section: MSection) -> Any:
+        """Returns the (not yet serialized) value of this quantity in the given section."""
+        if self.virtual:
+            try:
+                return self.derived(section)
+            except Exception:
+                return self.default
+        if self.derived is not None or self.name in section.__dict__:
+            return section.__dict__[self.name]
+        return self.default
+
+    def serialize(self, section: MSection, value: Any) -> Any:
+        """Serializes a single (non reference) value of this quantity."""
+        if self.target_name is not None:
+            resolved = value.m_resolved()
+            try:
+                # account for derived quantities and values stored without units
+                value = resolved.__dict__[self.target_name]
+            except KeyError:
+                value = getattr(resolved, self.target_name)
+
+        return self._serialize(section, value)
+
+
+class SectionSerializer:
+    """
+    The serialization plan for one section definition: the included quantities and
+    subsections in the order :func:`MSection.m_to_dict` would produce them. Sections
+    that need features the plan does not cover are marked as `generic` and have to be
+    serialized with `m_to_dict`.
+
+    Plans are stored on their section definition (see :func:`get`) and are freed
+    together with it, e.g. with the definitions of custom schemas.
+    """
+
+    def __init__(
+        self,
+        section_def: Section,
+        include: TypingCallable[[Definition], bool],
+        quantity_serializer: TypingCallable[[Quantity], QuantitySerializer] = (
+            QuantitySerializer
+        ),
+    ):
+        self.section_def = section_def
+        self.quantities: List[QuantitySerializer] = [
+            quantity_serializer(quantity)
+            for quantity in section_def.all_quantities.values()
+            if include(quantity)
+        ]
+        self.quantity_serializers: Dict[Quantity, QuantitySerializer] = {
+            serializer.quantity: serializer for serializer in self.quantities
+        }
+        self.sub_sections: List[Tuple[str, SubSection, bool]] = [
+            (name, sub_section_def, sub_section_def.repeats)
+            for name, sub_section_def in section_def.all_sub_sections.items()
+            if include(sub_section_def)
+        ]
+        self.generic = any(
+            quantity.use_full_storage or not quantity.supported
+            for quantity in self.quantities
+        )
+
+    def is_generic(self, section: MSection) -> bool:
+        """Returns True if the given section has to be serialized with `m_to_dict`."""
+        return (
+            self.generic
+            or bool(section.m_annotations)
+            or 'm_attributes' in section.__dict__
+        )
+
+    @staticmethod
+    def get(
+        section_def: Section,
+        key: Any,
+        create: TypingCallable[[], SectionSerializer],
+    ) -> SectionSerializer:
+        """
+        Returns the plan that is stored on the given section definition under the given
+        key. The plan is created with `create`, if there is none.
+        """
+        serializer = section_def._serializers.get(key)
+        # copies of the definition (see `m_copy`) share the stored plans
+        if serializer is None or serializer.section_def is not section_def:
+            serializer = create()
+            section_def._serializers[key] = serializer
+
+        return serializer
+
+
 class MCategory(metaclass=MObjectMeta):
     m_def: Category = None
 
@@ -3584,7 +3785,11 @@ class Definition(MSection):
             # 1. loaded from file so archive.definitions.archive is set by parser
             # 2. loaded from versioned mongo so entry_id_based_name is set by mongo
             # second one has no metadata, so do not create reference
-            context = self.m_root().m_context
+            # the reference is created by the context of the source, if there is one,
+            # because definitions might be shared by multiple contexts
+            context = source.m_root().m_context if source is not None else None
+            if context is None:
+                context = self.m_root().m_context
             if context:
                 relative_name = context.create_reference(source, None, self, **kwargs)
                 if relative_name:
@@ -4412,6 +4617,7 @@ class Section(Definition):
 
     def __init__(self, *args, validate: bool = True, **kwargs):
         self._section_cls: Type[MSection] = None  # type: ignore
+        self._serializers: Dict[Any, SectionSerializer] = {}
 
         super().__init__(*args, **kwargs)
         self.validate = validate
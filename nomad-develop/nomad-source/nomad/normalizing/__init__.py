@@ -46,7 +46,9 @@ from nomad.config.models.plugins import (
     Normalizer as OldNormalizerPlugin,
     NormalizerEntryPoint,
 )
-from .normalizer import Normalizer
+from nomad.utils import get_logger
+
+from .normalizer import Normalizer, has_any_section, check_normalizer_order
 
 
 def import_normalizer(class_name: str):
@@ -58,8 +60,17 @@ def import_normalizer(class_name: str):
 
 
 class SortedNormalizers(UserList):
+    _checked = False
+
     def __iter__(self) -> Iterator:
         self.sort(key=lambda x: x.normalizer_level)
+        if not self._checked:
+            # skipping normalizers without input sections relies on the order
+            self._checked = True
+            for error in check_normalizer_order(self.data):
+                get_logger(__name__).warning(
+                    'normalizer might be skipped wrongly', details=error
+                )
         return super().__iter__()
 
 
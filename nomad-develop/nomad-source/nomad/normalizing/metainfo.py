@@ -25,6 +25,10 @@ from . import Normalizer
 
 class MetainfoNormalizer(Normalizer):
     domain: Optional[str] = None
+    # the normalize functions of all sections, mostly ELN data that fills metadata
+    # and results
+    reads = ['']
+    writes = ['data', 'metadata', 'results']
 
     def normalize_section(self, archive: EntryArchive, section, logger):
         normalize = None
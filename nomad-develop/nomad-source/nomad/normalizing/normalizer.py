@@ -17,7 +17,7 @@
 #
 
 from abc import ABCMeta, abstractmethod
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 from nomad.utils import get_logger
 from nomad.metainfo import MSection
@@ -37,6 +37,15 @@ class Normalizer(metaclass=ABCMeta):
     normalizer_level = 0
     """Deprecated: Specifies the order of normalization with respect to other normalizers. Lower level
     is executed first."""
+    reads: Optional[List[str]] = None
+    """The archive sections this normalizer reads as paths, e.g. `run` or `results.material`.
+    The empty path stands for the whole archive. The normalizer is skipped for archives
+    that contain none of them. Default is `None` for unknown, which applies the
+    normalizer to all archives."""
+    writes: Optional[List[str]] = None
+    """The archive sections this normalizer writes as paths. The empty path stands for
+    the whole archive. Normalizers that read these sections have to run later, see
+    :func:`check_normalizer_order`. Default is `None` for unknown."""
 
     def __init__(self, **kwargs) -> None:
         self.logger = get_logger(__name__)
@@ -47,6 +56,62 @@ class Normalizer(metaclass=ABCMeta):
             self.logger = logger.bind(normalizer=self.__class__.__name__)
 
 
+def has_any_section(archive: MSection, paths: List[str]) -> bool:
+    """Returns True, if the archive contains a section for one of the given paths."""
+    for path in paths:
+        sections = [archive]
+        for name in path.split('.') if path else []:
+            sub_sections = []
+            for section in sections:
+                sub_section_def = section.m_def.all_sub_sections.get(name)
+                if sub_section_def is not None:
+                    sub_sections.extend(section.m_get_sub_sections(sub_section_def))
+            sections = sub_sections
+
+        if sections:
+            return True
+
+    return False
+
+
+def _paths_overlap(read: str, write: str) -> bool:
+    return (
+        not write
+        or read == write
+        or read.startswith(f'{write}.')
+        or write.startswith(f'{read}.')
+    )
+
+
+def check_normalizer_order(normalizers: Iterable) -> List[str]:
+    """
+    Checks the declared `reads` and `writes` of the given normalizers in the order of
+    their execution. A normalizer is skipped, if none of the sections it reads exist
+    when it is executed. This is only correct, if the sections are not written by a
+    later normalizer. Normalizers that read the whole archive are never skipped.
+
+    Returns:
+        A message for each normalizer that reads sections written by a later one.
+    """
+    normalizers = list(normalizers)
+    errors = []
+    for index, normalizer in enumerate(normalizers):
+        reads = [path for path in normalizer.reads or [] if path]
+        for later in normalizers[index + 1 :]:
+            overlapping = [
+                read
+                for read in reads
+                if any(_paths_overlap(read, write) for write in later.writes or [])
+            ]
+            if overlapping:
+                errors.append(
+                    f'{normalizer.__name__} reads {", ".join(overlapping)}, which is '
+                    f'written by the later {later.__name__}'
+                )
+
+    return errors
+
+
 class SystemBasedNormalizer(Normalizer, metaclass=ABCMeta):
     """
     A normalizer base class for normalizers that only touch a section_system.
@@ -59,6 +124,8 @@ class SystemBasedNormalizer(Normalizer, metaclass=ABCMeta):
         only_representatives: Will only normalize the `representative` systems.
     """
 
+    reads = ['run']
+
     def __init__(self, only_representatives: bool = False, **kwargs):
         super().__init__(**kwargs)
         self.only_representatives = only_representatives
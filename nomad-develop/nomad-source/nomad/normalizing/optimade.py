@@ -89,6 +89,8 @@ class OptimadeNormalizer(SystemBasedNormalizer):
     It assumes that the :class:`SystemNormalizer` was run before.
     """
 
+    writes = ['metadata.optimade']
+
     def __init__(self):
         super().__init__(only_representatives=True)
 
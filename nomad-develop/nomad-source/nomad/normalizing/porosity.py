@@ -63,6 +63,8 @@ class PorosityNormalizer(SystemBasedNormalizer):
     In the future, the it will also compute the rcsr tological code.
     """
 
+    writes = ['results.material']
+
     def __init__(self):
         super().__init__(only_representatives=True)
 
@@ -102,6 +102,9 @@ def isint(value: Any) -> bool:
 class ResultsNormalizer(Normalizer):
     domain = None
     normalizer_level = 3
+    # results are created for all entries, also without run or measurement
+    reads = ['']
+    writes = ['results']
 
     def normalize(self, archive: EntryArchive, logger=None) -> None:
         self.entry_archive = archive
@@ -413,6 +413,7 @@ def _set_inf_to_nan_if_string(dct, key):
 
 class ChemotionParser(MatchingParser):
     creates_children = True
+    prefilter_by_name_and_mime = True
 
     def __init__(self) -> None:
         super().__init__(
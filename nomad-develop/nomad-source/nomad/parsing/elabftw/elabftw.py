@@ -320,6 +320,7 @@ _element_type_section_mapping = {'File': ELabFTWFile, 'Dataset': ElabFTWDataset}
 
 class ELabFTWParser(MatchingParser):
     creates_children = True
+    prefilter_by_name_and_mime = True
 
     def __init__(self) -> None:
         super().__init__(
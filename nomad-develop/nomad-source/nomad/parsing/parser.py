@@ -21,11 +21,11 @@ from abc import ABCMeta, abstractmethod
 import re
 import os
 import os.path
+import threading
 from functools import lru_cache
 import importlib
 from pydantic import BaseModel, Extra  # pylint: disable=unused-import
 import yaml
-import h5py
 import numpy as np
 import json
 
@@ -48,6 +48,13 @@ class Parser(metaclass=ABCMeta):
     Level 0 parsers are run first, then level 1, and so on. Normally the value should be 0,
     use higher values only when a parser depends on other parsers.
     """
+    reads_aux_files = True
+    """
+    If the parser might read other files in the mainfile's directory (aux files) directly.
+    When only changed files are reprocessed, entries of such parsers are reprocessed if
+    any file in this directory has changed. Files read through the archive context are
+    tracked regardless.
+    """
 
     def __init__(self):
         self.domain = 'dft'
@@ -199,6 +206,20 @@ class MatchingParser(Parser):
         supported_compressions: A list of [gz, bz2], if the parser supports compressed files
     """
 
+    # True, if `is_mainfile` rejects all files that do not match the mainfile name and
+    # mime type regexps. This allows to pre-filter these parsers before their
+    # `is_mainfile` is called. Subclasses that override `is_mainfile` have to set this
+    # explicitly, if they still use all checks of this class.
+    prefilter_by_name_and_mime = True
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if (
+            'is_mainfile' in cls.__dict__
+            and 'prefilter_by_name_and_mime' not in cls.__dict__
+        ):
+            cls.prefilter_by_name_and_mime = False
+
     def __init__(
         self,
         name: str = None,
@@ -310,9 +331,12 @@ class MatchingParser(Parser):
 
         def match(value, reference):
             if not isinstance(value, dict):
-                equal = value == (
-                    reference[()] if isinstance(reference, h5py.Dataset) else reference
-                )
+                if mime.startswith('application/x-hdf'):
+                    import h5py
+
+                    if isinstance(reference, h5py.Dataset):
+                        reference = reference[()]
+                equal = value == reference
                 return equal.all() if isinstance(equal, np.ndarray) else equal
 
             if not hasattr(reference, 'keys'):
@@ -347,6 +371,8 @@ class MatchingParser(Parser):
                 except Exception:
                     pass
             elif mime.startswith('application/x-hdf'):
+                import h5py
+
                 try:
                     with h5py.File(filename) as f:
                         is_match = match(self._mainfile_contents_dict, f)
@@ -396,6 +422,8 @@ class MatchingParser(Parser):
 
 # TODO remove this after merging hdf5 reference, only for parser compatibility
 def to_hdf5(value: Any, f: Union[str, IO], path: str):
+    import h5py
+
     with h5py.File(f, 'a') as root:
         segments = path.rsplit('/', 1)
         group = root.require_group(segments[0]) if len(segments) == 2 else root
@@ -432,27 +460,37 @@ class MatchingParserInterface(MatchingParser):
         parser_class_name: concatenation of module path and parser class name
     """
 
+    prefilter_by_name_and_mime = True
+
     def __init__(self, parser_class_name: str, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._parser_class_name = parser_class_name
         self._mainfile_parser = None
+        # is_mainfile is called from multiple matching threads
+        self._lock = threading.Lock()
 
     def new_parser_instance(self):
         """Forgets the existing parser instance and forces the creation of a new one."""
-        self._mainfile_parser = None
+        with self._lock:
+            self._mainfile_parser = None
         return self._mainfile_parser
 
     @property
     def mainfile_parser(self):
-        if self._mainfile_parser is None:
-            try:
-                Parser = self.import_parser_class()
-                self._mainfile_parser = Parser()
-            except Exception as e:
-                logger = utils.get_logger(__name__)
-                logger.error('cannot instantiate parser.', exc_info=e)
-                raise e
-        return self._mainfile_parser
+        mainfile_parser = self._mainfile_parser
+        if mainfile_parser is not None:
+            return mainfile_parser
+
+        with self._lock:
+            if self._mainfile_parser is None:
+                try:
+                    Parser = self.import_parser_class()
+                    self._mainfile_parser = Parser()
+                except Exception as e:
+                    logger = utils.get_logger(__name__)
+                    logger.error('cannot instantiate parser.', exc_info=e)
+                    raise e
+            return self._mainfile_parser
 
     def parse(
         self, mainfile: str, archive: EntryArchive, logger=None, child_archives=None
@@ -486,7 +524,8 @@ class MatchingParserInterface(MatchingParser):
                 mainfile_keys = self.mainfile_parser.get_mainfile_keys(
                     filename=filename, decoded_buffer=decoded_buffer
                 )
-                self.creates_children = True
+                with self._lock:
+                    self.creates_children = True
                 return mainfile_keys
             except Exception:
                 return is_mainfile
@@ -494,6 +533,8 @@ class MatchingParserInterface(MatchingParser):
 
 
 class ArchiveParser(MatchingParser):
+    reads_aux_files = False
+
     def __init__(self):
         super().__init__(
             name='parsers/archive',
@@ -17,7 +17,7 @@
 #
 
 import os.path
-from typing import Optional, Tuple, List, Dict
+from typing import Optional, Tuple, List, Dict, Pattern
 from collections.abc import Iterable
 
 from nomad.config import config
@@ -30,6 +30,7 @@ from .parser import (
     BrokenParser,
     Parser,
     ArchiveParser,
+    MatchingParser,
     MatchingParserInterface,
 )
 from .artificial import EmptyParser, GenerateRandomParser, TemplateParser, ChaosParser
@@ -55,6 +56,93 @@ except ImportError:
     pass
 
 
+class ParserIndex:
+    """
+    A pre-filter index over a list of parsers. It groups the parsers by the mainfile
+    name and mime type regexps that they check before anything else. This way, each
+    distinct regexp is only evaluated once per file and only the remaining candidates
+    need to be asked with `is_mainfile`. Parsers that do not allow pre-filtering
+    (see `MatchingParser.prefilter_by_name_and_mime`) are always candidates.
+
+    The candidates keep the order of the given parsers and the pre-filter never
+    removes a parser that would have matched. Hence, matching with the index gives
+    the same results as asking all parsers.
+    """
+
+    def __init__(self, parsers: List[Parser]):
+        self.parsers = list(parsers)
+        self._name_res: Dict[Pattern, List[int]] = {}
+        self._mime_res: Dict[Pattern, List[int]] = {}
+
+        for index, parser in enumerate(self.parsers):
+            if not isinstance(parser, MatchingParser):
+                continue
+            if not parser.prefilter_by_name_and_mime:
+                continue
+            if not parser._mainfile_alternative:
+                # alternative mainfiles also match without a matching name
+                self._name_res.setdefault(parser._mainfile_name_re, []).append(index)
+            self._mime_res.setdefault(parser._mainfile_mime_re, []).append(index)
+
+    def is_index_for(self, parsers: List[Parser]) -> bool:
+        """Checks if this index was created for the given list of parsers."""
+        return len(parsers) == len(self.parsers) and all(
+            a is b for a, b in zip(parsers, self.parsers)
+        )
+
+    @staticmethod
+    def _filter(
+        candidates: List[int], regexps: Dict[Pattern, List[int]], match
+    ) -> List[int]:
+        rejected = set()
+        for regexp, indices in regexps.items():
+            if match(regexp) is None:
+                rejected.update(indices)
+
+        if not rejected:
+            return candidates
+
+        return [index for index in candidates if index not in rejected]
+
+    def candidates_by_name(self, filename: str, strict=True) -> List[int]:
+        """
+        Returns the indices of all parsers that might match a file with the given
+        name. This does not require to open the file.
+        """
+        candidates = [
+            index
+            for index, parser in enumerate(self.parsers)
+            if not strict or not isinstance(parser, (MissingParser, EmptyParser))
+        ]
+        return self._filter(
+            candidates, self._name_res, lambda regexp: regexp.fullmatch(filename)
+        )
+
+    def candidates_by_mime(self, candidates: List[int], mime: str) -> List[int]:
+        """Further reduces the given candidates to those that accept the mime type."""
+        return self._filter(
+            candidates, self._mime_res, lambda regexp: regexp.match(mime)
+        )
+
+
+_parser_index: ParserIndex = None
+
+
+def get_parser_index() -> ParserIndex:
+    """
+    Returns a :class:`ParserIndex` for the currently registered parsers. The index is
+    re-created if the registered parsers have changed.
+    """
+    global _parser_index
+
+    parser_index = _parser_index
+    if parser_index is None or not parser_index.is_index_for(parsers):
+        parser_index = ParserIndex(parsers)
+        _parser_index = parser_index
+
+    return parser_index
+
+
 def match_parser(
     mainfile_path: str, strict=True, parser_name: Optional[str] = None
 ) -> Tuple[Parser, List[str]]:
@@ -81,6 +169,18 @@ def match_parser(
     if mainfile.startswith('.') or mainfile.startswith('~'):
         return None, None
 
+    if parser_name:
+        parser = parser_dict.get(parser_name)
+        assert parser is not None, f'parser by the name `{parser_name}` does not exist'
+        parser_index = ParserIndex([parser])
+    else:
+        parser_index = get_parser_index()
+
+    candidates = parser_index.candidates_by_name(mainfile_path, strict=strict)
+    if not candidates and not parser_name:
+        # no parser can match this file by its name, no need to open it
+        return None, None
+
     with open(mainfile_path, 'rb') as f:
         compression, open_compressed = _compressions.get(f.read(3), (None, open))
 
@@ -105,16 +205,9 @@ def match_parser(
                 decoded_buffer = buffer.decode(encoding)
             except Exception:
                 pass
-    if parser_name:
-        parser = parser_dict.get(parser_name)
-        assert parser is not None, f'parser by the name `{parser_name}` does not exist'
-        parsers_to_check = [parser]
-    else:
-        parsers_to_check = parsers
-    for parser in parsers_to_check:
-        if strict and isinstance(parser, (MissingParser, EmptyParser)):
-            continue
 
+    for index in parser_index.candidates_by_mime(candidates, mime_type):
+        parser = parser_index.parsers[index]
         match_result = parser.is_mainfile(
             mainfile_path, mime_type, buffer, decoded_buffer, compression
         )
@@ -145,8 +238,8 @@ def match_parser(
             # TODO: deal with multiple possible parser specs
             return parser, mainfile_keys
 
-    if parser_name and parser:
-        return parser, None  # Ignore any child entries
+    if parser_name:
+        return parser_index.parsers[0], None  # Ignore any child entries
 
     return None, None
 
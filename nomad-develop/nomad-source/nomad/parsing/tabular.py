@@ -16,7 +16,19 @@
 # limitations under the License.
 #
 import os
-from typing import List, Dict, Callable, Set, Any, Tuple, Iterator, Union, Iterable
+import csv
+from typing import (
+    List,
+    Dict,
+    Callable,
+    Set,
+    Any,
+    Tuple,
+    Iterator,
+    Union,
+    Iterable,
+    Optional,
+)
 
 import pandas as pd
 import re
@@ -154,7 +166,7 @@ class TableData(ArchiveSection):
 
         parsing_options = dict(annotation.parsing_options)
         with archive.m_context.raw_file(data_file) as f:
-            data = read_table_data(data_file, f, **parsing_options)
+            data = _read_tables(data_file, f, **parsing_options)
 
         mapping_options = annotation.mapping_options
         if mapping_options:
@@ -201,7 +213,7 @@ class TableData(ArchiveSection):
                                 if sheet_name not in list(data):
                                     continue
                                 try:
-                                    df = pd.DataFrame.from_dict(data.loc[0, sheet_name])
+                                    df = _get_table(data, sheet_name)
                                     tmp = np.array(df.loc[:, col_name])
                                     self.m_set(
                                         quantity,
@@ -212,7 +224,7 @@ class TableData(ArchiveSection):
                             else:
                                 # Otherwise, assume the sheet_name is the first sheet of Excel/csv
                                 try:
-                                    df = pd.DataFrame.from_dict(data.iloc[0, 0])
+                                    df = _get_table(data)
                                     tmp = np.array(df.loc[:, col_data])
                                     self.m_set(
                                         quantity,
@@ -709,6 +721,18 @@ def parse_columns(pd_dataframe, section: MSection):
     import pandas as pd
 
     data: pd.DataFrame = pd_dataframe
+    sheets: Dict[Union[str, int], pd.DataFrame] = {}
+
+    def get_sheet(sheet_name: Union[str, int]) -> pd.DataFrame:
+        # each sheet is only converted and cleaned once for all columns
+        if sheet_name not in sheets:
+            df = _get_table(data, sheet_name).copy(deep=False)
+
+            # trimming the column names from leading/trailing white-spaces
+            _strip_whitespaces_from_df_columns(df)
+            sheets[sheet_name] = df
+
+        return sheets[sheet_name]
 
     mapping = _create_column_to_quantity_mapping(section.m_def)  # type: ignore
     for column in mapping:
@@ -720,17 +744,11 @@ def parse_columns(pd_dataframe, section: MSection):
                     f"The sheet name {sheet_name} doesn't exist in the excel file"
                 )
 
-            df = pd.DataFrame.from_dict(data.loc[0, sheet_name])
-
-            # trimming the column names from leading/trailing white-spaces
-            _strip_whitespaces_from_df_columns(df)
+            df = get_sheet(sheet_name)
             mapping[column](section, df.loc[:, col_name])
         else:
             # Otherwise, assume the sheet_name is the first sheet of Excel/csv
-            df = pd.DataFrame.from_dict(data.iloc[0, 0])
-
-            # trimming the column names from leading/trailing white-spaces
-            _strip_whitespaces_from_df_columns(df)
+            df = get_sheet(0)
             if column in df:
                 mapping[column](section, df.loc[:, column])
 
@@ -759,11 +777,7 @@ def parse_table(pd_dataframe, section_def: Section, logger):
         if '/' in column:
             sheet_name = column.split('/')[0]
 
-    df = pd.DataFrame.from_dict(
-        data.loc[0, sheet_name]
-        if isinstance(sheet_name, str)
-        else data.iloc[0, sheet_name]
-    )
+    df = _get_table(data, sheet_name).copy(deep=False)
 
     # trimming the column names from leading/trailing white-spaces
     _strip_whitespaces_from_df_columns(df)
@@ -785,43 +799,49 @@ def parse_table(pd_dataframe, section_def: Section, logger):
         except Exception:
             continue
 
+    # Resolve the columns for all quantities and repetitions once. The values of each
+    # column are taken as a whole. Using lists (instead of rows) keeps the original
+    # types of the cells per column.
+    resolved_columns: List[List[Tuple[str, str, Callable, List[Any]]]] = []
+    for col_index in range(0, max_no_of_repeated_columns + 1):
+        columns = []
+        for column, set_value in mapping.items():
+            col_name = column.split('/')[1] if '/' in column else column
+            col_name = f'{col_name}.{col_index}' if col_index > 0 else col_name
+            if col_name in df:
+                columns.append((column, col_name, set_value, df[col_name].tolist()))
+        resolved_columns.append(columns)
+
     path_quantities_to_top_subsection: Set[str] = set()
-    for row_index, row in df.iterrows():
+    for row_position, row_index in enumerate(df.index):
         for col_index in range(0, max_no_of_repeated_columns + 1):
             section = section_def.section_cls()
             try:
-                for column in mapping:
-                    col_name = column.split('/')[1] if '/' in column else column
-                    col_name = f'{col_name}.{col_index}' if col_index > 0 else col_name
-
-                    if col_name in df:
-                        try:
-                            temp_quantity_path_container: List[str] = []
-                            mapping[column](
-                                section,
-                                row[col_name],
-                                section_path_to_top_subsection=temp_quantity_path_container,
-                            )
-                        except Exception as e:
-                            logger.error(
-                                'could not parse cell',
-                                details=dict(row=row_index, column=col_name),
-                                exc_info=e,
-                            )
-                        if (
-                            col_index > 0
-                            and temp_quantity_path_container[0].split('/')[1:]
-                        ):
-                            path_quantities_to_top_subsection.update(
-                                temp_quantity_path_container
-                            )
-                        elif (
-                            col_index > 0
-                            and not temp_quantity_path_container[0].split('/')[1:]
-                        ):
-                            raise TabularParserError(
-                                f'there is a repeated column {column} that is not placed into a subsection in the schema. Please fix the schema.'
-                            )
+                for column, col_name, set_value, values in resolved_columns[col_index]:
+                    try:
+                        temp_quantity_path_container: List[str] = []
+                        set_value(
+                            section,
+                            values[row_position],
+                            section_path_to_top_subsection=temp_quantity_path_container,
+                        )
+                    except Exception as e:
+                        logger.error(
+                            'could not parse cell',
+                            details=dict(row=row_index, column=col_name),
+                            exc_info=e,
+                        )
+                    if col_index > 0 and temp_quantity_path_container[0].split('/')[1:]:
+                        path_quantities_to_top_subsection.update(
+                            temp_quantity_path_container
+                        )
+                    elif (
+                        col_index > 0
+                        and not temp_quantity_path_container[0].split('/')[1:]
+                    ):
+                        raise TabularParserError(
+                            f'there is a repeated column {column} that is not placed into a subsection in the schema. Please fix the schema.'
+                        )
             except Exception as e:
                 logger.error(
                     'could not parse row', details=dict(row=row_index), exc_info=e
@@ -837,7 +857,7 @@ def parse_table(pd_dataframe, section_def: Section, logger):
                     for item in path_quantities_to_top_subsection:
                         section_name: List[str] = item.split('/')[1:]
                         _append_subsections_from_section(
-                            section_name, sections[row_index], section
+                            section_name, sections[row_position], section
                         )
                 except Exception as e:
                     logger.error(
@@ -885,18 +905,87 @@ def _append_subsections_from_section(
         _append_subsections_from_section(section_name, target_section, source_section)
 
 
-def read_table_data(
+def _sniff_csv_separator(
+    file_or_path, comment: str = None, skiprows: Union[list[int], int] = None
+) -> str:
+    """
+    Determines the separator from the first line that is not skipped, like pandas'
+    python engine does for `sep=None`. File objects are rewound afterwards.
+    """
+    if isinstance(skiprows, int):
+        skipped_rows = set(range(skiprows))
+    else:
+        skipped_rows = set(skiprows or [])
+
+    def sniff(f) -> str:
+        position = 0
+        line = f.readline()
+        while position in skipped_rows and line:
+            position += 1
+            line = f.readline()
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        if comment and comment in line:
+            line = line[: line.find(comment)]
+        return csv.Sniffer().sniff(line).delimiter
+
+    if isinstance(file_or_path, str):
+        with open(file_or_path, 'rt') as f:
+            return sniff(f)
+
+    start = file_or_path.tell()
+    try:
+        return sniff(file_or_path)
+    finally:
+        file_or_path.seek(start)
+
+
+def _read_csv(
+    file_or_path,
+    comment: str = None,
+    sep: str = None,
+    skiprows: Union[list[int], int] = None,
+):
+    """
+    Reads a CSV file with pandas' C engine. The separator is sniffed if not given.
+    Falls back to the slower python engine for everything the C engine does not support.
+    """
+    import pandas as pd
+
+    options: Dict[str, Any] = dict(
+        comment=comment, skiprows=skiprows, skipinitialspace=True
+    )
+    start = None if isinstance(file_or_path, str) else file_or_path.tell()
+
+    try:
+        c_sep = (
+            sep
+            if sep is not None
+            else _sniff_csv_separator(file_or_path, comment, skiprows)
+        )
+        if len(c_sep) == 1 or c_sep == r'\s+':
+            return pd.read_csv(file_or_path, engine='c', sep=c_sep, **options)
+    except Exception:
+        if start is not None:
+            file_or_path.seek(start)
+
+    return pd.read_csv(file_or_path, engine='python', sep=sep, **options)
+
+
+def _read_tables(
     path,
     file_or_path=None,
     comment: str = None,
     sep: str = None,
     skiprows: Union[list[int], int] = None,
     separator: str = None,
-):
+) -> Dict[Union[str, int], 'pd.DataFrame']:
+    """
+    Reads all sheets of an Excel file, or the table of a CSV file (as sheet 0), into
+    data frames. Takes the same arguments as :func:`read_table_data`.
+    """
     import pandas as pd
 
-    df = pd.DataFrame()
-
     if file_or_path is None:
         file_or_path = path
 
@@ -904,32 +993,71 @@ def read_table_data(
         excel_file: pd.ExcelFile = pd.ExcelFile(
             file_or_path if isinstance(file_or_path, str) else file_or_path.name
         )
-        for sheet_name in excel_file.sheet_names:
-            df.loc[0, sheet_name] = [
-                pd.read_excel(
-                    excel_file,
-                    skiprows=skiprows,
-                    sheet_name=sheet_name,
-                    comment=comment,
-                ).to_dict()
-            ]
-    else:
-        df.loc[0, 0] = [
-            pd.read_csv(
-                file_or_path,
-                engine='python',
-                comment=comment,
-                sep=sep if sep else separator,
-                skiprows=skiprows,
-                skipinitialspace=True,
-            ).to_dict()
-        ]
+        return {
+            sheet_name: pd.read_excel(
+                excel_file, skiprows=skiprows, sheet_name=sheet_name, comment=comment
+            )
+            for sheet_name in excel_file.sheet_names
+        }
+
+    return {
+        0: _read_csv(
+            file_or_path,
+            comment=comment,
+            sep=sep if sep else separator,
+            skiprows=skiprows,
+        )
+    }
+
+
+def _get_table(data, sheet_name: Union[str, int] = 0) -> 'pd.DataFrame':
+    """
+    Returns the data frame for the given sheet name (or sheet index). The data can be
+    given as returned by :func:`_read_tables` or by :func:`read_table_data`. The
+    returned data frame must not be modified.
+    """
+    import pandas as pd
+
+    if isinstance(data, dict):
+        if isinstance(sheet_name, str):
+            return data[sheet_name]
+        return list(data.values())[sheet_name]
+
+    return pd.DataFrame.from_dict(
+        data.loc[0, sheet_name]
+        if isinstance(sheet_name, str)
+        else data.iloc[0, sheet_name]
+    )
+
+
+def read_table_data(
+    path,
+    file_or_path=None,
+    comment: str = None,
+    sep: str = None,
+    skiprows: Union[list[int], int] = None,
+    separator: str = None,
+):
+    import pandas as pd
+
+    df = pd.DataFrame()
+    tables = _read_tables(
+        path,
+        file_or_path,
+        comment=comment,
+        sep=sep,
+        skiprows=skiprows,
+        separator=separator,
+    )
+    for sheet_name, table in tables.items():
+        df.loc[0, sheet_name] = [table.to_dict()]
 
     return df
 
 
 class TabularDataParser(MatchingParser):
     creates_children = True
+    prefilter_by_name_and_mime = True
 
     def __init__(self) -> None:
         super().__init__(
@@ -968,8 +1096,6 @@ class TabularDataParser(MatchingParser):
     ) -> Union[bool, Iterable[str]]:
         # We use the main file regex capabilities of the superclass to check if this is a
         # .csv file
-        import pandas as pd
-
         is_tabular = super().is_mainfile(
             filename, mime, buffer, decoded_buffer, compression
         )
@@ -977,11 +1103,10 @@ class TabularDataParser(MatchingParser):
             return False
 
         try:
-            data = read_table_data(filename)
+            data = _get_table(_read_tables(filename))
         except Exception:
             # If this cannot be parsed as a .csv file, we don't match with this file
             return False
-        data = pd.DataFrame.from_dict(data.iloc[0, 0])
         return [str(item) for item in range(0, data.shape[0])]
 
     def parse(self, logger=None, **kwargs):
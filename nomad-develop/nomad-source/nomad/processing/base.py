@@ -41,9 +41,11 @@ from mongoengine import (
     ListField,
     DateTimeField,
     IntField,
+    FloatField,
     ValidationError,
 )
 from mongoengine.connection import ConnectionFailure
+from pymongo import ReturnDocument, UpdateOne
 from datetime import datetime
 import functools
 
@@ -256,6 +258,13 @@ class Proc(Document):
             to ensure state consistency and atomicity. There are three types of sync operations:
             when scheduling a process, starting a process, and completing a process.
             NOTE: This value is managed by the framework, do not tamper with this value.
+        pending_children: The number of child processes that have been announced with
+            :func:`expect_children` and have not completed yet. Not set, if the children
+            are not counted.
+            NOTE: This value is managed by the framework, do not tamper with this value.
+        join_recount_time: The time (in seconds since the epoch) of the next scheduled
+            recount of the children (see :func:`_schedule_join_recount`).
+            NOTE: This value is managed by the framework, do not tamper with this value.
     """
 
     id_field: str = None
@@ -277,6 +286,8 @@ class Proc(Document):
 
     queue = ListField()
     sync_counter = IntField(default=0)
+    pending_children = IntField(default=None)
+    join_recount_time = FloatField(default=None)
 
     @property
     def process_running(self) -> bool:
@@ -367,6 +378,9 @@ class Proc(Document):
         self.worker_hostname = worker_hostname
         if clear_queue:
             self.queue = []
+        # The counter might only have been changed in mongo, always unset it on save
+        self.pending_children = None
+        self._mark_as_changed('pending_children')
 
     @classmethod
     def reset_pymongo_update(
@@ -478,6 +492,20 @@ class Proc(Document):
         self.process_status = ProcessStatus.FAILURE
         if complete:
             self._sync_complete_process(force_clear_queue_on_failure=True)
+            flags = self.current_process_flags
+            if flags is not None and flags.is_child:
+                # The parent is not joined here, but we still need to count this child
+                # as completed
+                try:
+                    self.parent()._complete_children()
+                except Exception as e:
+                    Proc.log(
+                        logger,
+                        logging.ERROR,
+                        'could not complete child on parent',
+                        exc_info=e,
+                        error=str(e),
+                    )
 
     def warning(self, *warnings, log_level=logging.WARNING, **kwargs):
         """Allows to save warnings. Takes strings or exceptions as args."""
@@ -534,13 +562,7 @@ class Proc(Document):
         self_id = self.id.__str__()
         cls_name = self.__class__.__name__
 
-        queue = None
-        if (
-            config.celery.routing == CELERY_WORKER_ROUTING
-            and self.worker_hostname is not None
-        ):
-            queue = worker_direct(self.worker_hostname).name
-
+        queue = _worker_queue(self.worker_hostname)
         priority = config.celery.priorities.get('%s.%s' % (cls_name, func_name), 1)
 
         logger = utils.get_logger(__name__, cls=cls_name, id=self_id, func=func_name)
@@ -557,6 +579,96 @@ class Proc(Document):
             priority=priority,
         )
 
+    @classmethod
+    def process_batch(cls, procs: List['Proc'], func_name: str, *args, **kwargs):
+        """
+        Schedules the @process function `func_name` for all given `procs` and sends them
+        to the workers in a single celery task (per worker queue), which runs them in
+        sequence. This avoids a broker message and several mongo round trips per proc.
+        Only child processes can be batched, and the procs should be children of a running
+        blocking process, i.e. nobody else should schedule processes on them at the
+        same time. Procs that are already processing are scheduled individually (i.e.
+        their call is queued). The given objects are not reloaded.
+        """
+        flags = process_flags[cls.__name__][func_name]
+        assert flags.is_child and not flags.is_local, 'can only batch child processes'
+
+        batches: Dict[str, List[Proc]] = defaultdict(list)
+        for proc in procs:
+            if proc.process_running:
+                getattr(proc, func_name)(*args, **kwargs)
+            else:
+                batches[proc.worker_hostname].append(proc)
+
+        kwargs['_meta_label'] = config.meta.label
+        for hostname, batch in batches.items():
+            self_ids = [proc.id for proc in batch]
+            # Corresponds to the PENDING transition in _sync_schedule_process
+            result = cls._get_collection().update_many(
+                {
+                    '_id': {'$in': self_ids},
+                    'process_status': {'$nin': ProcessStatus.STATUSES_PROCESSING},
+                },
+                {
+                    '$inc': {'sync_counter': 1},
+                    '$set': dict(
+                        process_status=ProcessStatus.PENDING,
+                        current_process=func_name,
+                        last_status_message='Pending: ' + func_name,
+                    ),
+                },
+            )
+            if result.modified_count != len(self_ids):
+                raise ProcessSyncFailure(
+                    'Failed to schedule process batch - should not happen'
+                )
+
+            try:
+                cls._send_batch_to_worker(
+                    [str(self_id) for self_id in self_ids],
+                    func_name,
+                    *args,
+                    worker_hostname=hostname,
+                    **kwargs,
+                )
+            except Exception as e:
+                for proc in batch:
+                    proc.reload()
+                    proc.fail(e)
+                raise
+
+    @classmethod
+    def _send_batch_to_worker(
+        cls, self_ids: List[str], func_name, *args, worker_hostname=None, **kwargs
+    ):
+        """Invokes a celery task, which will prompt a worker to pick up the Proc objects."""
+        cls_name = cls.__name__
+        queue = _worker_queue(worker_hostname)
+        priority = config.celery.priorities.get('%s.%s' % (cls_name, func_name), 1)
+
+        logger = utils.get_logger(__name__, cls=cls_name, func=func_name)
+        logger.info(
+            'calling process function on batch',
+            queue=queue,
+            priority=priority,
+            worker_hostname=worker_hostname,
+            n_procs=len(self_ids),
+        )
+
+        return proc_batch_task.apply_async(
+            args=[cls_name, self_ids, func_name, args, kwargs],
+            queue=queue,
+            priority=priority,
+        )
+
+    @classmethod
+    def prepare_batch(cls, procs: List['Proc']):
+        """
+        Called on the worker before the procs of a batch (see :func:`process_batch`) are
+        processed. Override to share resources between the procs of the batch.
+        """
+        pass
+
     def __str__(self):
         return 'proc celery_task_id=%s worker_hostname=%s' % (
             self.celery_task_id,
@@ -578,6 +690,78 @@ class Proc(Document):
         """
         raise NotImplementedError('`child_cls` not implemented')
 
+    def expect_children(self, count: int):
+        """
+        Announces that `count` child processes will be started, which this process is
+        going to wait for. It has to be called before the child processes are started.
+        Counting the children allows them to complete without querying the state of all
+        the other children (see :func:`_complete_children`).
+        """
+        self._get_collection().update_one(
+            {'_id': self.id}, {'$inc': {'pending_children': count}}
+        )
+
+    def _complete_children(self, count: int = 1) -> bool:
+        """
+        Called on the parent Proc when `count` of its child processes have completed.
+        Atomically decrements the pending children and returns True if the parent should
+        try to join. This is the case if the children are not counted, or if only a few
+        (`config.process.join_recount_threshold`) pending children are left. In any case,
+        :func:`_try_to_join` verifies that no child is processing anymore. This also
+        makes up for decrements that got lost, e.g. because of crashed workers. If more
+        decrements got lost, the scheduled recounts join the parent
+        (see :func:`_schedule_join_recount`).
+        """
+        record = self._get_collection().find_one_and_update(
+            {'_id': self.id, 'pending_children': {'$exists': True}},
+            {'$inc': {'pending_children': -count}},
+            projection={'pending_children': True},
+            return_document=ReturnDocument.AFTER,
+        )
+        if record is None:
+            return True
+        return record['pending_children'] <= config.process.join_recount_threshold
+
+    def _schedule_join_recount(self, recount_time: float = None):
+        """
+        Schedules a task that tries to join this Proc after
+        `config.process.join_recount_interval` seconds, regardless of the pending
+        children count. Lost decrements could otherwise keep a parent, that counts its
+        children, waiting forever. There is only one scheduled recount per Proc: without
+        `recount_time`, a recount is only scheduled if this Proc counts its children,
+        waits for results, and no recount is due. With `recount_time`, the recount task
+        for this time continues to schedule recounts while the Proc is processing.
+        """
+        now = time.time()
+        if recount_time is None:
+            query = {
+                'process_status': ProcessStatus.WAITING_FOR_RESULT,
+                'pending_children': {'$exists': True},
+                '$or': [
+                    {'join_recount_time': None},
+                    {'join_recount_time': {'$lt': now}},
+                ],
+            }
+        else:
+            query = {
+                'process_status': {'$in': ProcessStatus.STATUSES_PROCESSING},
+                'join_recount_time': recount_time,
+            }
+        next_recount_time = now + config.process.join_recount_interval
+        record = self._get_collection().find_one_and_update(
+            dict(_id=self.id, **query),
+            {'$set': {'join_recount_time': next_recount_time}},
+            projection={'_id': True},
+        )
+        if record is None:
+            return
+
+        proc_join_recount_task.apply_async(
+            args=[self.__class__.__name__, str(self.id), next_recount_time],
+            queue=_worker_queue(self.worker_hostname),
+            countdown=config.process.join_recount_interval,
+        )
+
     def _try_to_join(self) -> bool:
         """
         Called on the parent Proc object to join (resume) the current process.
@@ -612,7 +796,10 @@ class Proc(Document):
             # To join, we need to read and update the mongo record as a single atomic operation
             old_record = self._get_collection().find_one_and_update(
                 {'_id': self.id, 'process_status': ProcessStatus.WAITING_FOR_RESULT},
-                {'$set': {'process_status': ProcessStatus.RUNNING}},
+                {
+                    '$set': {'process_status': ProcessStatus.RUNNING},
+                    '$unset': {'pending_children': ''},
+                },
             )
             if (
                 old_record
@@ -668,12 +855,14 @@ class Proc(Document):
                 else:
                     mongo_update['$set'].update(queue=[[func_name, args, kwargs]])
             else:
-                # Nothing is running
+                # Nothing is running. Children of previous processes, which were not
+                # joined, must not be counted for the new process.
                 mongo_update['$set'].update(
                     process_status=ProcessStatus.PENDING,
                     current_process=func_name,
                     last_status_message='Pending: ' + func_name,
                 )
+                mongo_update['$unset'] = {'pending_children': ''}
             # Try to update self atomically. Will fail if someone else has managed to write
             # a sync op in between.
             old_record = self._get_collection().find_one_and_update(
@@ -730,7 +919,8 @@ class Proc(Document):
                     celery_task_id=None,
                     errors=[],
                     warnings=[],
-                )
+                ),
+                '$unset': {'pending_children': ''},
             }
             # Try to update self atomically. Will fail if someone else has managed to write
             # a sync op in between.
@@ -799,7 +989,12 @@ class Proc(Document):
         try_counter = 0
         while True:
             next_process = None
-            mongo_update = {'$set': {'sync_counter': self.sync_counter + 1}}
+            # Children that are still pending, e.g. because the process failed after
+            # announcing them, are not joined anymore.
+            mongo_update = {
+                '$set': {'sync_counter': self.sync_counter + 1},
+                '$unset': {'pending_children': ''},
+            }
             if self.queue:
                 # Something in the queue
                 if (
@@ -854,6 +1049,13 @@ process_flags: Dict[str, Dict[str, ProcessFlags]] = defaultdict(dict)
 """ { <Proc class name>: { <process func name>: ProcessFlags } } """
 
 
+def _worker_queue(hostname: str) -> str:
+    """Returns the celery queue for tasks that should run on the given worker (if any)."""
+    if config.celery.routing == CELERY_WORKER_ROUTING and hostname is not None:
+        return worker_direct(hostname).name
+    return None
+
+
 class NomadCeleryRequest(Request):
     """
     A custom celery request class that allows to catch error in the worker main
@@ -896,13 +1098,25 @@ class NomadCeleryTask(Task):
     Request = NomadCeleryRequest
 
 
-def unwarp_task(task, cls_name, self_id, *args, **kwargs):
-    """
-    Retrieves the proc object that the given task is executed on from the database.
-    """
-    logger = utils.get_logger(__name__, cls=cls_name, id=self_id)
+class NomadCeleryBatchRequest(NomadCeleryRequest):
+    """The celery request class for batch tasks, it fails all procs still processing."""
 
-    # get the process class
+    def _fail(self, event, **kwargs):
+        cls_name, self_ids = self._payload[0][:2]
+        if infrastructure.mongo_client is None:
+            infrastructure.setup_mongo()
+
+        for proc in unwarp_batch_task(self.task, cls_name, self_ids):
+            if proc.process_running:
+                proc.fail(event, **kwargs)
+
+
+class NomadCeleryBatchTask(Task):
+    Request = NomadCeleryBatchRequest
+
+
+def _proc_cls(cls_name, logger):
+    """Returns the Proc class with the given name."""
     global all_proc_cls
     cls = all_proc_cls.get(cls_name, None)
     if cls is None:
@@ -914,6 +1128,18 @@ def unwarp_task(task, cls_name, self_id, *args, **kwargs):
         logger.critical('document not a subclass of Proc')
         raise ProcNotRegistered('document %s not a subclass of Proc' % cls_name)
 
+    return cls
+
+
+def unwarp_task(task, cls_name, self_id, *args, **kwargs):
+    """
+    Retrieves the proc object that the given task is executed on from the database.
+    """
+    logger = utils.get_logger(__name__, cls=cls_name, id=self_id)
+
+    # get the process class
+    cls = _proc_cls(cls_name, logger)
+
     # get the process instance
     try:
         try:
@@ -928,64 +1154,87 @@ def unwarp_task(task, cls_name, self_id, *args, **kwargs):
     return self
 
 
-@app.task(
-    bind=True,
-    base=NomadCeleryTask,
-    ignore_results=True,
-    max_retries=3,
-    acks_late=config.celery.acks_late,
-    soft_time_limit=config.celery.timeout,
-    time_limit=config.celery.timeout * 2,
-)
-def proc_task(task, cls_name, self_id, func_name, args, kwargs):
+def unwarp_batch_task(task, cls_name, self_ids) -> List[Proc]:
     """
-    The celery task that is used to execute async process functions.
-    It retries for 3 times with a countdown of 3 in case of propagation problems, since this
-    might happen in sharded, distributed mongo setups where the updates might not
-    have yet propagated to everyone.
+    Retrieves the proc objects that the given batch task is executed on from the database.
+    Objects that are still missing after all retries are omitted.
     """
-    # Obtain the Proc object. Raises exception to make celery retry if object has not propagated.
-    proc: Proc = unwarp_task(task, cls_name, self_id)
-    logger = proc.get_logger()
-    logger.debug('Executing celery task')
+    logger = utils.get_logger(__name__, cls=cls_name)
+    cls = _proc_cls(cls_name, logger)
 
-    if '_meta_label' in kwargs:
-        config.meta.label = kwargs['_meta_label']
-        del kwargs['_meta_label']
+    procs = {
+        str(proc.id): proc for proc in cls.objects(**{f'{cls.id_field}__in': self_ids})
+    }
+    missing = [self_id for self_id in self_ids if self_id not in procs]
+    if missing:
+        try:
+            logger.warning('called objects are missing, retry', proc_ids=missing)
+            raise task.retry(exc=KeyError(missing), countdown=3)
+        except KeyError:
+            logger.critical(
+                'called objects are missing, retries exceeded', proc_ids=missing
+            )
+
+    return [procs[self_id] for self_id in self_ids if self_id in procs]
 
-    try_to_join = False
-    deleting = False
 
+def _unwrapped_process_function(proc: Proc, func_name, logger):
+    """
+    Returns the unwrapped @process function `func_name` of the given proc. If there is
+    none, the proc is failed and None is returned.
+    """
     # get the process function
     func = getattr(proc, func_name, None)
     if func is None:  # "Should not happen"
         logger.error('called function not a function of proc class')
         proc.fail(
             'called function %s is not a function of proc class %s'
-            % (func_name, cls_name)
+            % (func_name, proc.__class__.__name__)
         )
-        return
+        return None
 
     # unwrap the process decorator
     unwrapped_func = getattr(func, '__process_unwrapped', None)
     if unwrapped_func is None:  # "Should not happen"
         logger.error('called function was not decorated with @process')
         proc.fail('called function %s was not decorated with @process' % func_name)
-        return
+        return None
+
+    return unwrapped_func
+
+
+def _execute_process(
+    task,
+    proc: Proc,
+    func_name,
+    unwrapped_func,
+    args,
+    kwargs,
+    logger,
+    set_running=True,
+) -> Tuple[bool, bool]:
+    """
+    Calls the unwrapped process function on the given proc and translates the outcome
+    into the proc's process status. Exceptions fail the proc (without completing it), a
+    `SystemExit` is re-raised after completing the proc as failed. Returns a tuple
+    (try_to_join, deleting).
+    """
+    try_to_join = False
+    deleting = False
 
     # call the process function
     try:
-        is_child = process_flags[cls_name][func_name].is_child
         os.chdir(config.fs.working_directory)
         with utils.timer(logger, 'process executed on worker', log_memory=True):
-            # Set state to RUNNING
-            proc.process_status = ProcessStatus.RUNNING
-            proc.last_status_message = 'Started: ' + func_name
-            proc.worker_hostname = worker_hostname
-            proc.celery_task_id = task.request.id
-            proc.errors = []
-            proc.warnings = []
-            proc.save()
+            if set_running:
+                # Set state to RUNNING
+                proc.process_status = ProcessStatus.RUNNING
+                proc.last_status_message = 'Started: ' + func_name
+                proc.worker_hostname = worker_hostname
+                proc.celery_task_id = task.request.id
+                proc.errors = []
+                proc.warnings = []
+                proc.save()
             # Actually call the process function
             rv = unwrapped_func(proc, *args, **kwargs)
             if proc.errors:
@@ -1025,7 +1274,7 @@ def proc_task(task, cls_name, self_id, func_name, args, kwargs):
                 raise ValueError('Invalid return value from process function')
     except SystemExit as e:
         proc.fail(e)
-        return
+        raise
     except SoftTimeLimitExceeded as e:
         logger.error('exceeded the celery task soft time limit')
         proc.fail(e, complete=False)
@@ -1035,24 +1284,16 @@ def proc_task(task, cls_name, self_id, func_name, args, kwargs):
     except Exception as e:
         proc.fail(e, complete=False)
 
-    # The proc is done running
-    if is_child and proc.process_status in ProcessStatus.STATUSES_COMPLETED:
-        try:
-            next_process = proc._sync_complete_process()
-            if next_process:
-                # More jobs in the queue
-                func_name, args, kwargs = next_process
-                proc._send_to_worker(func_name, *args, **kwargs)
-                return
-            # Processing finished (successful or not)
-            # Switch to the parent to try to join.
-            proc = proc.parent()
-            logger = proc.get_logger()
-            try_to_join = True
-        except Exception as e:  # "Should not happen"
-            proc.fail(e)
-            return
+    return try_to_join, deleting
 
+
+def _join_and_complete(proc: Proc, logger, try_to_join=False, deleting=False):
+    """
+    Tries to join the given proc (if `try_to_join`), and completes its process if it is
+    done, sending the next queued up process to the workers. If the proc counts its
+    children and keeps waiting, a recount is scheduled.
+    """
+    recount = try_to_join
     while try_to_join:
         try_to_join = False
         try:
@@ -1094,6 +1335,16 @@ def proc_task(task, cls_name, self_id, func_name, args, kwargs):
         except Exception as e:
             proc.fail(e, complete=False)
 
+    if (
+        recount
+        and proc.process_status == ProcessStatus.WAITING_FOR_RESULT
+        and proc.pending_children is not None
+    ):
+        try:
+            proc._schedule_join_recount()
+        except Exception as e:
+            logger.error('could not schedule a join recount', exc_info=e)
+
     if not deleting and proc.process_status in ProcessStatus.STATUSES_COMPLETED:
         # We are about to transition from RUNNING to completed (FAILURE or SUCCESS)
         # But, if something is queued up we should actually go to PENDING instead, and
@@ -1107,6 +1358,291 @@ def proc_task(task, cls_name, self_id, func_name, args, kwargs):
             proc.fail(e)
 
 
+def _complete_child(proc: Proc) -> Proc:
+    """
+    Completes the process of a completed child proc. Returns the parent, or None if the
+    next queued up process was sent to the workers.
+    """
+    next_process = proc._sync_complete_process()
+    if next_process:
+        # More jobs in the queue
+        func_name, args, kwargs = next_process
+        proc._send_to_worker(func_name, *args, **kwargs)
+        return None
+    # Processing finished (successful or not)
+    return proc.parent()
+
+
+def _sync_complete_batch(procs: List[Proc]) -> List[Proc]:
+    """
+    Completes the processes of the given completed procs with a single mongo bulk write.
+    This corresponds to :func:`Proc._sync_complete_process` for procs with an empty queue.
+    Returns the procs that could not be completed like this (e.g. because something
+    has been queued up in the meantime) and have to be completed individually.
+    """
+    operations = []
+    batched: List[Proc] = []
+    individual: List[Proc] = []
+    for proc in procs:
+        try:
+            proc.validate()
+            set_data, unset_data = proc._delta()
+        except Exception:
+            individual.append(proc)
+            continue
+        set_data.update(
+            process_status=proc.process_status, sync_counter=proc.sync_counter + 1
+        )
+        mongo_update: Dict[str, Any] = {'$set': set_data}
+        if unset_data:
+            mongo_update['$unset'] = unset_data
+        operations.append(
+            UpdateOne(
+                {
+                    '_id': proc.id,
+                    'sync_counter': proc.sync_counter,
+                    'queue.0': {'$exists': False},
+                },
+                mongo_update,
+            )
+        )
+        batched.append(proc)
+
+    if not operations:
+        return individual
+
+    collection = batched[0]._get_collection()
+    result = collection.bulk_write(operations, ordered=False)
+    if result.matched_count == len(batched):
+        completed_ids = {proc.id for proc in batched}
+    else:
+        sync_counters = {proc.id: proc.sync_counter + 1 for proc in batched}
+        completed_ids = {
+            record['_id']
+            for record in collection.find(
+                {'_id': {'$in': list(sync_counters)}}, {'sync_counter': 1}
+            )
+            if record.get('sync_counter') == sync_counters[record['_id']]
+        }
+
+    for proc in batched:
+        if proc.id in completed_ids:
+            proc.sync_counter += 1
+            proc._clear_changed_fields()
+        else:
+            individual.append(proc)
+
+    return individual
+
+
+@app.task(
+    bind=True,
+    base=NomadCeleryTask,
+    ignore_results=True,
+    max_retries=3,
+    acks_late=config.celery.acks_late,
+    soft_time_limit=config.celery.timeout,
+    time_limit=config.celery.timeout * 2,
+)
+def proc_task(task, cls_name, self_id, func_name, args, kwargs):
+    """
+    The celery task that is used to execute async process functions.
+    It retries for 3 times with a countdown of 3 in case of propagation problems, since this
+    might happen in sharded, distributed mongo setups where the updates might not
+    have yet propagated to everyone.
+    """
+    # Obtain the Proc object. Raises exception to make celery retry if object has not propagated.
+    proc: Proc = unwarp_task(task, cls_name, self_id)
+    logger = proc.get_logger()
+    logger.debug('Executing celery task')
+
+    if '_meta_label' in kwargs:
+        config.meta.label = kwargs['_meta_label']
+        del kwargs['_meta_label']
+
+    unwrapped_func = _unwrapped_process_function(proc, func_name, logger)
+    if unwrapped_func is None:
+        return
+
+    try:
+        try_to_join, deleting = _execute_process(
+            task, proc, func_name, unwrapped_func, args, kwargs, logger
+        )
+    except SystemExit:
+        return
+
+    # The proc is done running
+    is_child = process_flags[cls_name][func_name].is_child
+    if is_child and proc.process_status in ProcessStatus.STATUSES_COMPLETED:
+        try:
+            proc = _complete_child(proc)
+            if proc is None or not proc._complete_children():
+                return
+            # Switch to the parent to try to join.
+            logger = proc.get_logger()
+            try_to_join = True
+        except Exception as e:  # "Should not happen"
+            proc.fail(e)
+            return
+
+    _join_and_complete(proc, logger, try_to_join, deleting)
+
+
+@app.task(
+    bind=True,
+    base=NomadCeleryTask,
+    ignore_results=True,
+    max_retries=3,
+    acks_late=config.celery.acks_late,
+    soft_time_limit=config.celery.timeout,
+    time_limit=config.celery.timeout * 2,
+)
+def proc_join_recount_task(task, cls_name, self_id, recount_time):
+    """
+    The celery task that is used to recount the children of a waiting proc and to try
+    to join it (see :func:`Proc._schedule_join_recount`).
+    """
+    proc: Proc = unwarp_task(task, cls_name, self_id)
+    logger = proc.get_logger()
+    if proc.join_recount_time != recount_time:
+        # another recount has been scheduled in the meantime
+        return
+
+    if (
+        proc.process_status == ProcessStatus.WAITING_FOR_RESULT
+        and proc.pending_children is not None
+    ):
+        logger.info('recounting children', pending_children=proc.pending_children)
+        _join_and_complete(proc, logger, try_to_join=True)
+
+    proc._schedule_join_recount(recount_time)
+
+
+@app.task(
+    bind=True,
+    base=NomadCeleryBatchTask,
+    ignore_results=True,
+    max_retries=3,
+    acks_late=config.celery.acks_late,
+    soft_time_limit=config.celery.timeout,
+    time_limit=config.celery.timeout * 2,
+)
+def proc_batch_task(task, cls_name, self_ids, func_name, args, kwargs):
+    """
+    The celery task that is used to execute an async child process function on a batch
+    of procs (see :func:`Proc.process_batch`). The procs are processed one after another
+    with the same per proc failure handling as in :func:`proc_task`. The completed procs
+    are written back with a single bulk write and each parent tries to join only once.
+    If the batch takes longer than half of the task time limit, the remaining procs are
+    sent to a new batch task.
+    """
+    procs = unwarp_batch_task(task, cls_name, self_ids)
+    if not procs:
+        return
+    cls = procs[0].__class__
+    logger = utils.get_logger(__name__, cls=cls_name, func=func_name)
+    logger.debug('Executing celery batch task', n_procs=len(procs))
+
+    if '_meta_label' in kwargs:
+        config.meta.label = kwargs['_meta_label']
+        del kwargs['_meta_label']
+
+    # Set state to RUNNING
+    running = dict(
+        process_status=ProcessStatus.RUNNING,
+        last_status_message='Started: ' + func_name,
+        worker_hostname=worker_hostname,
+        celery_task_id=task.request.id,
+        errors=[],
+        warnings=[],
+    )
+    cls._get_collection().update_many(
+        {'_id': {'$in': [proc.id for proc in procs]}}, {'$set': running}
+    )
+    for proc in procs:
+        for key, value in running.items():
+            setattr(proc, key, value)
+    cls.prepare_batch(procs)
+
+    start_time = time.time()
+    completed: List[Proc] = []
+    remaining: List[Proc] = []
+    for index, proc in enumerate(procs):
+        if index > 0 and time.time() - start_time > config.celery.timeout / 2:
+            remaining = procs[index:]
+            break
+        proc_logger = proc.get_logger()
+        unwrapped_func = _unwrapped_process_function(proc, func_name, proc_logger)
+        if unwrapped_func is None:
+            continue
+        try:
+            try_to_join, deleting = _execute_process(
+                task,
+                proc,
+                func_name,
+                unwrapped_func,
+                args,
+                kwargs,
+                proc_logger,
+                set_running=False,
+            )
+        except SystemExit:
+            remaining = procs[index + 1 :]
+            break
+
+        if proc.process_status in ProcessStatus.STATUSES_COMPLETED:
+            completed.append(proc)
+        elif try_to_join or deleting:
+            _join_and_complete(proc, proc_logger, try_to_join, deleting)
+
+    if remaining:
+        logger.info('sending remaining procs to new batch task', n_procs=len(remaining))
+        remaining_ids = [proc.id for proc in remaining]
+        cls._get_collection().update_many(
+            {'_id': {'$in': remaining_ids}},
+            {'$set': dict(process_status=ProcessStatus.PENDING)},
+        )
+        cls._send_batch_to_worker(
+            [str(self_id) for self_id in remaining_ids],
+            func_name,
+            *args,
+            worker_hostname=remaining[0].worker_hostname,
+            _meta_label=config.meta.label,
+            **kwargs,
+        )
+
+    # The procs are done running
+    parents: Dict[Any, Proc] = {}
+    completed_children: Dict[Any, int] = defaultdict(int)
+    try:
+        individual = _sync_complete_batch(completed)
+    except Exception as e:  # "Should not happen"
+        logger.error('could not complete batch', exc_info=e)
+        individual = completed
+
+    for proc in completed:
+        try:
+            if proc in individual:
+                parent = _complete_child(proc)
+            else:
+                parent = proc.parent()
+            if parent is not None:
+                parents.setdefault(parent.id, parent)
+                completed_children[parent.id] += 1
+        except Exception as e:  # "Should not happen"
+            proc.fail(e)
+
+    # Switch to the parents to try to join.
+    for parent_id, parent in parents.items():
+        try:
+            if not parent._complete_children(completed_children[parent_id]):
+                continue
+        except Exception as e:  # "Should not happen"
+            parent.fail(e)
+            continue
+        _join_and_complete(parent, parent.get_logger(), try_to_join=True)
+
+
 def process(
     is_blocking: bool = False,
     clear_queue_on_failure: bool = True,
@@ -56,7 +56,10 @@ from mongoengine import (
 from pymongo import UpdateOne
 from structlog import wrap_logger
 from contextlib import contextmanager
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import copy
+import functools
 import os.path
 from datetime import datetime
 import hashlib
@@ -98,7 +101,7 @@ from nomad.processing.base import (
 )
 from nomad.parsing import Parser
 from nomad.parsing.parsers import parser_dict, match_parser
-from nomad.normalizing import normalizers
+from nomad.normalizing import normalizers, has_any_section
 from nomad.datamodel import (
     EntryArchive,
     EntryMetadata,
@@ -190,6 +193,55 @@ _log_processors = [
 ]
 
 
+def _lazy_section_dict(
+    section: metainfo.MSection, overlay: Dict[str, Any] = None, **kwargs
+) -> Dict[str, Any]:
+    """
+    Serializes the section like :func:`MSection.m_to_dict`, but the subsections are
+    serialized lazily, i.e. only when the archive writer packs them. This way, the
+    serialized archive does not have to be held in memory as a whole. The values in
+    `overlay` (quantity values in serialized form, or subsection objects) replace the
+    respective properties without modifying the section.
+    """
+    if (
+        isinstance(section, metainfo.Definition)
+        or type(section).m_to_dict is not metainfo.MSection.m_to_dict
+    ):
+        # Definitions pass their serialization settings on to their subsections
+        return section.m_to_dict(**kwargs)
+
+    overlay = overlay or {}
+
+    def exclude(definition, container):
+        return container is section and isinstance(definition, metainfo.SubSection)
+
+    result = section.m_to_dict(exclude=exclude, **kwargs)
+    for name, value in overlay.items():
+        if name in section.m_def.all_quantities:
+            result[name] = value
+
+    for name, sub_section_def in section.m_def.all_sub_sections.items():
+        if name in overlay:
+            sub_sections = overlay[name]
+        elif sub_section_def.repeats:
+            sub_sections = section.m_get_sub_sections(sub_section_def)
+        else:
+            sub_sections = section.m_get_sub_section(sub_section_def, -1)
+
+        if sub_section_def.repeats:
+            if sub_sections:
+                result[name] = [
+                    None
+                    if sub_section is None
+                    else functools.partial(_lazy_section_dict, sub_section, **kwargs)
+                    for sub_section in sub_sections
+                ]
+        elif sub_sections is not None:
+            result[name] = functools.partial(_lazy_section_dict, sub_sections, **kwargs)
+
+    return result
+
+
 def get_rfc3161_token(
     hash_string: str,
     server: Optional[str] = None,
@@ -912,6 +964,8 @@ class Entry(Proc):
         entry_coauthors: a user provided list of co-authors specific for this entry. Note
             that normally, coauthors should be set on the upload level.
         datasets: a list of user curated datasets this entry belongs to
+        raw_file_dependencies: the raw files read through the archive context by the
+            last processing of this entry, including the mainfile
     """
 
     upload_id = StringField(required=True)
@@ -931,6 +985,7 @@ class Entry(Proc):
     references = ListField(StringField())
     entry_coauthors = ListField()
     datasets = ListField(StringField())
+    raw_file_dependencies = ListField(StringField(), default=None)
 
     entry_timestamp = EmbeddedDocumentField(Timestamp)
 
@@ -1257,6 +1312,16 @@ class Entry(Proc):
         """Processes or reprocesses an entry."""
         self._process_entry_local()
 
+    @classmethod
+    def prepare_batch(cls, entries: List['Entry']):
+        # All entries of an upload share the upload object and upload files
+        uploads: Dict[str, Tuple['Upload', StagingUploadFiles]] = {}
+        for entry in entries:
+            if entry.upload_id not in uploads:
+                uploads[entry.upload_id] = entry.upload, entry.upload_files
+            else:
+                entry._upload, entry._upload_files = uploads[entry.upload_id]
+
     @process_local
     def process_entry_local(self):
         """Processes or reprocesses an entry locally."""
@@ -1349,10 +1414,21 @@ class Entry(Proc):
                     'Have you placed many mainfiles in the same directory?'
                 )
 
-            self.parsing()
-            for entry in self._main_and_child_entries():
-                entry.normalizing()
-                entry.archiving()
+            # Record the raw files read through the context. Entries processed during
+            # the processing of this entry keep their own record.
+            archive_context = self.upload.archive_context
+            outer_dependencies = archive_context.raw_file_dependencies
+            archive_context.raw_file_dependencies = {self.mainfile}
+            try:
+                self.parsing()
+                for entry in self._main_and_child_entries():
+                    entry.normalizing()
+                    entry.archiving()
+                self.raw_file_dependencies = sorted(
+                    archive_context.raw_file_dependencies
+                )
+            finally:
+                archive_context.raw_file_dependencies = outer_dependencies
 
         elif self.upload.published:
             self.set_last_status_message('Preserving entry data')
@@ -1532,8 +1608,18 @@ class Entry(Proc):
             context = dict(normalizer=normalizer_name, step=normalizer_name)
             logger = self.get_logger(**context)
 
+            # the declared input sections are checked before the normalizer is
+            # instantiated, earlier normalizers might have added them
+            reads = normalizer.reads
+            if reads is not None and not has_any_section(self._parser_results, reads):
+                logger.debug('normalizer skipped, no input sections', reads=reads)
+                continue
+
             with utils.timer(
-                logger, 'normalizer executed', input_size=self.mainfile_file.size
+                logger,
+                'normalizer executed',
+                log_memory=True,
+                input_size=self.mainfile_file.size,
             ):
                 try:
                     normalizer(self._parser_results).normalize(logger=logger)
@@ -1597,24 +1683,22 @@ class Entry(Proc):
         except Exception as e:
             self.get_logger().error('could not write mongodb archive entry', exc_info=e)
 
-        if archive is not None:
-            archive = archive.m_copy()
-        else:
+        if archive is None:
             archive = datamodel.EntryArchive(m_context=self.upload.archive_context)
 
-        if archive.metadata is None:
-            archive.m_add_sub_section(
-                datamodel.EntryArchive.metadata, self._entry_metadata
-            )
-
-        archive.processing_logs = self._filtered_processing_logs()
+        # metadata and logs are added to the serialized archive, without copying or
+        # modifying the archive
+        overlay: Dict[str, Any] = dict(processing_logs=self._filtered_processing_logs())
+        metadata = archive.metadata
+        if metadata is None:
+            metadata = overlay[section_metadata] = self._entry_metadata
 
         if config.process.store_package_definition_in_mongo:
             if archive.definitions is not None:
                 store_package_definition(
                     archive.definitions,
-                    upload_id=archive.metadata.upload_id,
-                    entry_id=archive.metadata.entry_id,
+                    upload_id=metadata.upload_id,
+                    entry_id=metadata.entry_id,
                 )
             if archive.data is not None:
                 pkg_definitions = getattr(
@@ -1623,18 +1707,29 @@ class Entry(Proc):
                 if pkg_definitions is not None:
                     store_package_definition(
                         pkg_definitions,
-                        upload_id=archive.metadata.upload_id,
-                        entry_id=archive.metadata.entry_id,
+                        upload_id=metadata.upload_id,
+                        entry_id=metadata.entry_id,
                     )
 
         # save the archive msg-pack
+        with_def_id = config.process.write_definition_id_to_archive
         try:
-            return self.upload_files.write_archive(
-                self.entry_id,
-                archive.m_to_dict(
-                    with_def_id=config.process.write_definition_id_to_archive
-                ),
-            )
+            if config.archive.use_new_writer:
+                # subsections are only serialized while they are packed
+                archive_dict = _lazy_section_dict(
+                    archive, overlay, with_def_id=with_def_id
+                )
+            else:
+                archive_dict = archive.m_to_dict(with_def_id=with_def_id)
+                archive_dict.update(
+                    {
+                        name: value.m_to_dict(with_def_id=with_def_id)
+                        if isinstance(value, metainfo.MSection)
+                        else value
+                        for name, value in overlay.items()
+                    }
+                )
+            return self.upload_files.write_archive(self.entry_id, archive_dict)
         except Exception:
             # most likely failed due to domain data, try to write metadata and processing logs
             archive = datamodel.EntryArchive(m_context=self.upload.archive_context)
@@ -1875,7 +1970,9 @@ class Upload(Proc):
                 if isinstance(self.upload_files, StagingUploadFiles):
                     with utils.timer(logger, 'staged upload files packed'):
                         self.staging_upload_files.pack(
-                            entries, with_embargo=self.with_embargo
+                            entries,
+                            with_embargo=self.with_embargo,
+                            progress=self.set_last_status_message,
                         )
 
                 with utils.timer(logger, 'index updated'):
@@ -2022,6 +2119,13 @@ class Upload(Proc):
 
         # All looks ok, process
         updated_files = self.update_files(file_operations, only_updated_files)
+        if (
+            settings.only_changed_files
+            and not self.published
+            and not path_filter
+            and updated_files is None
+        ):
+            updated_files = self._changed_raw_files()
         self.match_all(settings, path_filter, updated_files)
         self.parser_level = None
         if self.parse_next_level(0, path_filter, updated_files):
@@ -2227,6 +2331,70 @@ class Upload(Proc):
                     raise ValueError(f'Unknown operation {op}')
         return updated_files
 
+    def _changed_raw_files(self) -> Optional[Set[str]]:
+        """
+        Compares the raw files with the manifest stored by the last processing, and
+        returns the raw paths that need to be processed: added, modified, and deleted
+        files, and the mainfiles of all entries affected by them. Returns None, if
+        everything needs to be processed. The new manifest is stored as pending, and
+        committed in :func:`cleanup`.
+        """
+        logger = self.get_logger()
+        staging_upload_files = self.staging_upload_files
+        self.set_last_status_message('Detecting changed files')
+        previous = staging_upload_files.read_raw_file_manifest()
+        with utils.timer(logger, 'raw file manifest created'):
+            manifest = staging_upload_files.raw_file_manifest(previous)
+            staging_upload_files.write_raw_file_manifest(manifest, pending=True)
+        if previous is None:
+            return None
+
+        changed_files = {
+            path
+            for path in previous.keys() | manifest.keys()
+            if path not in previous
+            or path not in manifest
+            or previous[path][2] != manifest[path][2]
+        }
+        if any(
+            os.path.basename(path).startswith(config.process.metadata_file_name + '.')
+            for path in changed_files
+        ):
+            # Metadata files might affect any entry
+            return None
+
+        changed_dirs = {os.path.dirname(path) for path in changed_files}
+        updated_files = set(changed_files)
+        for entry in Entry._get_collection().find(
+            {'upload_id': self.upload_id, 'mainfile_key': None},
+            {
+                'mainfile': 1,
+                'parser_name': 1,
+                'process_status': 1,
+                'raw_file_dependencies': 1,
+            },
+        ):
+            parser = parser_dict.get(entry.get('parser_name'))
+            dependencies = entry.get('raw_file_dependencies')
+            if (
+                entry.get('process_status') != ProcessStatus.SUCCESS
+                or parser is None
+                or dependencies is None
+                or not changed_files.isdisjoint(dependencies)
+                or (
+                    parser.reads_aux_files
+                    and os.path.dirname(entry['mainfile']) in changed_dirs
+                )
+            ):
+                updated_files.add(entry['mainfile'])
+
+        logger.info(
+            'changed raw files detected',
+            changed_files=len(changed_files),
+            updated_files=len(updated_files),
+        )
+        return updated_files
+
     def _preprocess_files(self, path):
         """
         Some files need preprocessing. Currently we need to add a stripped POTCAR version
@@ -2295,37 +2463,71 @@ class Upload(Proc):
             # Scan everything
             scan = [('', True)]
 
-        for path, recursive in scan:
-            path_infos: Iterable[RawPathInfo] = (
-                [RawPathInfo(path=path, is_file=True, size=None, access=None)]
-                if staging_upload_files.raw_path_is_file(path)
-                else staging_upload_files.raw_directory_list(
-                    path, recursive, files_only=True
+        def candidate_paths() -> Iterator[str]:
+            for path, recursive in scan:
+                path_infos: Iterable[RawPathInfo] = (
+                    [RawPathInfo(path=path, is_file=True, size=None, access=None)]
+                    if staging_upload_files.raw_path_is_file(path)
+                    else staging_upload_files.raw_directory_list(
+                        path, recursive, files_only=True
+                    )
                 )
-            )
 
-            for path_info in path_infos:
-                self._preprocess_files(path_info.path)
+                for path_info in path_infos:
+                    self._preprocess_files(path_info.path)
 
-                if skip_matching and path_info.path not in entries_metadata:
-                    continue
+                    if skip_matching and path_info.path not in entries_metadata:
+                        continue
 
-                try:
-                    parser, mainfile_keys = match_parser(
-                        staging_upload_files.raw_file_object(path_info.path).os_path
-                    )
-                    if parser is not None:
-                        mainfile_keys_including_main_entry: List[str] = [None] + (
-                            mainfile_keys or []
-                        )  # type: ignore
-                        for mainfile_key in mainfile_keys_including_main_entry:
-                            yield path_info.path, mainfile_key, parser
-                except Exception as e:
-                    self.get_logger().error(
-                        'exception while matching pot. mainfile',
-                        mainfile=path_info.path,
-                        exc_info=e,
-                    )
+                    yield path_info.path
+
+        def match(path: str):
+            try:
+                return match_parser(staging_upload_files.raw_file_object(path).os_path)
+            except Exception as e:
+                return e
+
+        def results(path: str, result) -> Iterator[Tuple[str, str, Parser]]:
+            if isinstance(result, Exception):
+                self.get_logger().error(
+                    'exception while matching pot. mainfile',
+                    mainfile=path,
+                    exc_info=result,
+                )
+                return
+
+            parser, mainfile_keys = result
+            if parser is not None:
+                mainfile_keys_including_main_entry: List[str] = [None] + (
+                    mainfile_keys or []
+                )  # type: ignore
+                for mainfile_key in mainfile_keys_including_main_entry:
+                    yield path, mainfile_key, parser
+
+        threads = config.process.parser_matching_threads
+        if threads <= 1:
+            for path in candidate_paths():
+                yield from results(path, match(path))
+            return
+
+        # Matching is mostly file IO. We match a bounded window of files concurrently,
+        # but yield the results in the order of the files.
+        executor = ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix='match_mainfiles'
+        )
+        try:
+            pending: deque = deque()
+            for path in candidate_paths():
+                pending.append((path, executor.submit(match, path)))
+                if len(pending) >= threads * 4:
+                    path, future = pending.popleft()
+                    yield from results(path, future.result())
+
+            while pending:
+                path, future = pending.popleft()
+                yield from results(path, future.result())
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
 
     def match_all(
         self,
@@ -2527,10 +2729,16 @@ class Upload(Proc):
                         n_entries=len(next_entries),
                     )
                     self.set_last_status_message(f'Parsing level {next_level}')
+                    self.expect_children(len(next_entries))
                     with utils.timer(logger, 'processes triggered'):
                         for entry in next_entries:
                             entry.worker_hostname = self.worker_hostname
-                            entry.process_entry()
+                        if config.process.entry_batch_size > 1:
+                            for batch in self._entry_batches(next_entries):
+                                Entry.process_batch(batch, 'process_entry')
+                        else:
+                            for entry in next_entries:
+                                entry.process_entry()
                     return True
             return False
         except Exception as e:
@@ -2540,6 +2748,31 @@ class Upload(Proc):
                 self._cleanup_staging_files()
             raise
 
+    def _entry_batches(self, entries: List[Entry]) -> Iterable[List[Entry]]:
+        """
+        Splits the entries into batches that are processed in one task each. A batch is
+        limited by the number of entries and the accumulated size of their mainfiles.
+        """
+        max_size = config.process.entry_batch_size
+        max_bytes = config.process.entry_batch_max_bytes
+        batch: List[Entry] = []
+        batch_bytes = 0
+        for entry in entries:
+            try:
+                mainfile_bytes = self.upload_files.raw_file_size(entry.mainfile)
+            except Exception:
+                mainfile_bytes = max_bytes
+            if batch and (
+                len(batch) >= max_size or batch_bytes + mainfile_bytes > max_bytes
+            ):
+                yield batch
+                batch = []
+                batch_bytes = 0
+            batch.append(entry)
+            batch_bytes += mainfile_bytes
+        if batch:
+            yield batch
+
     def process_updated_raw_file(self, path: str, allow_modify: bool):
         """
         Used when parsers add/modify raw files during processing.
@@ -2586,6 +2819,8 @@ class Upload(Proc):
                 else:
                     # Running normally, using the worker/queue system
                     if self.parser_level >= parser.level:
+                        if not entry.process_running:
+                            self.expect_children(1)
                         entry.process_entry()  # Will queue the job if already running.
 
     def child_cls(self):
@@ -2613,6 +2848,9 @@ class Upload(Proc):
 
         self.reprocess_settings = None  # Don't need this anymore
 
+        if not self.published:
+            self.staging_upload_files.commit_raw_file_manifest()
+
         if self.published:
             # We have reprocessed an already published upload
             logger.info('started to repack re-processed upload')
@@ -2623,6 +2861,7 @@ class Upload(Proc):
                     with_embargo=self.with_embargo,
                     create=False,
                     include_raw=False,
+                    progress=self.set_last_status_message,
                 )
 
             self._cleanup_staging_files()
@@ -2641,7 +2880,9 @@ class Upload(Proc):
                 with self.entries_metadata() as entries:
                     with utils.timer(logger, 'upload staging files packed'):
                         self.staging_upload_files.pack(
-                            entries, with_embargo=self.with_embargo
+                            entries,
+                            with_embargo=self.with_embargo,
+                            progress=self.set_last_status_message,
                         )
 
                 with utils.timer(logger, 'upload staging files deleted'):
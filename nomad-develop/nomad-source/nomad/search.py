@@ -69,7 +69,7 @@ from nomad.datamodel import (
     user_reference,
     author_reference,
 )
-from nomad.groups import UserGroup
+from nomad.groups import get_group_ids
 from nomad.metainfo import Quantity, Datetime, Package
 from nomad.app.v1.models.models import (
     AggregationPagination,
@@ -641,11 +641,21 @@ def _owner_es_query(
             q |= query(viewers__user_id=user_id)
 
         if user_id is not None or force_groups:
-            user_group_ids = UserGroup.get_ids_by_user_id(user_id)
-            q |= query('terms', viewer_groups=user_group_ids)
+            q |= viewer_groups_query()
 
         return q
 
+    viewer_groups_q: Optional[Q] = None
+
+    def viewer_groups_query() -> Q:
+        # resolve the group memberships only once per query
+        nonlocal viewer_groups_q
+        if viewer_groups_q is None:
+            user_group_ids = get_group_ids(user_id, use_cache=True)
+            viewer_groups_q = query('terms', viewer_groups=user_group_ids)
+
+        return viewer_groups_q
+
     if owner == 'all':
         q = query(published=True)
         q |= viewers_query(user_id, force_groups=True)
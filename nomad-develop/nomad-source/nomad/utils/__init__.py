@@ -57,7 +57,6 @@ import orjson
 import os
 import unicodedata
 import re
-import pandas as pd
 
 from nomad.config import config
 
@@ -912,6 +911,8 @@ def dict_to_dataframe(
         result: Pandas DataFrame with flattened and sorted data.
     """
 
+    import pandas as pd
+
     if not keys_to_filter:
         keys_to_filter = []
 
@@ -18,6 +18,7 @@
 import pytest
 import os
 import h5py
+import numpy as np
 from fastapi.testclient import TestClient
 
 from nomad.app import h5grove_app
@@ -79,3 +80,63 @@ def test_h5grove(
     assert resp.status_code == status_code
     if status_code == 200:
         assert resp.content == b'"test"'
+
+
+@pytest.mark.parametrize(
+    'shape, points, step',
+    [
+        pytest.param((10,), 20, [1], id='1d-small'),
+        pytest.param((1001,), 100, [21], id='1d'),
+        pytest.param((30, 1001), 10, [3, 101], id='2d'),
+    ],
+)
+def test_downsample(tmp_path, monkeypatch, shape, points, step):
+    monkeypatch.setattr(h5grove_app, 'DOWNSAMPLE_SLAB_SIZE', 500)
+    data = np.random.default_rng(0).random(shape)
+    with h5py.File(tmp_path / 'test.h5', 'w') as h5file:
+        h5file.create_dataset('data', data=data)
+        result = h5grove_app.downsample(h5file['data'], points)
+
+    assert result['step'] == step
+    if len(shape) == 1:
+        assert np.array_equal(data[result['indices']], result['data'])
+        assert np.all(np.diff(result['indices']) >= 0)
+        # the extrema are preserved
+        assert data.max() in result['data'] and data.min() in result['data']
+    else:
+        assert result['max'].shape == (10, 10)
+        assert result['max'][0, 0] == data[:3, :101].max()
+        assert result['min'][-1, -1] == data[27:, 909:].min()
+
+
+def test_h5_file_pool(tmp_path):
+    file_path = tmp_path / 'test.h5'
+    with h5py.File(file_path, 'w') as h5file:
+        h5file.create_dataset('data', data=[1, 2, 3])
+
+    def open_file(pool, version):
+        file_object = open(file_path, 'rb')
+        f = h5grove_app.PooledH5File(file_object, 'r')
+        pool.put(('upload', 'raw', 'test.h5'), version, f, file_object)
+        return f, file_object
+
+    pool = h5grove_app.H5FilePool(max_size=1, ttl=60, max_age=600)
+    f, file_object = open_file(pool, 1)
+
+    # files stay open when h5grove closes them
+    f.close()
+    assert pool.get(('upload', 'raw', 'test.h5'), 1) is f
+    assert f['data'][1] == 2
+
+    # changed files are reopened, but only closed when they are not used anymore
+    assert pool.get(('upload', 'raw', 'test.h5'), 2) is None
+    assert f.id.valid and not file_object.closed
+    f.close()
+    assert not f.id.valid and file_object.closed
+
+    # files are reopened after max_age, even if they are used continuously
+    pool = h5grove_app.H5FilePool(max_size=1, ttl=60, max_age=0)
+    f, file_object = open_file(pool, 1)
+    f.close()
+    assert pool.get(('upload', 'raw', 'test.h5'), 1) is None
+    assert not f.id.valid and file_object.closed
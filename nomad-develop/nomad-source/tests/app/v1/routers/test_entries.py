@@ -21,9 +21,14 @@ from urllib.parse import urlencode
 import zipfile
 import io
 import json
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from nomad.metainfo.elasticsearch_extension import entry_type, schema_separator
 from nomad.utils.exampledata import ExampleData
+from nomad.app.v1.routers import entries as entries_router
 
 from tests.test_files import example_mainfile_contents, append_raw_files  # pylint: disable=unused-import
 from tests.config import python_schema_name
@@ -1064,6 +1069,119 @@ def test_entries_archive(client, example_data, required, status_code):
     )
 
 
+@pytest.mark.parametrize('http_method', ['post', 'get'])
+def test_entries_archive_ndjson(client, example_data, http_method):
+    headers = {'Accept': 'application/x-ndjson'}
+    pagination = {'page_size': 5}
+    if http_method == 'post':
+        response = client.post(
+            'entries/archive/query',
+            headers=headers,
+            json=dict(pagination=pagination, required={'metadata': '*'}),
+        )
+    else:
+        response = client.get(
+            'entries/archive?%s' % urlencode(pagination), headers=headers
+        )
+
+    assert_response(response, 200)
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    trailer = lines.pop()
+    assert 'data' not in trailer
+    assert trailer['pagination']['page_size'] == 5
+    assert len(lines) == 5
+    for line in lines:
+        assert line['entry_id'] == line['archive']['metadata']['entry_id']
+
+    # the streamed entries match the regular response
+    if http_method == 'post':
+        response = client.post(
+            'entries/archive/query',
+            json=dict(pagination=pagination, required={'metadata': '*'}),
+        )
+        assert [entry['entry_id'] for entry in response.json()['data']] == [
+            line['entry_id'] for line in lines
+        ]
+
+
+class _Request:
+    """A request that disconnects after the given number of checks."""
+
+    def __init__(self, disconnect_after: int = None):
+        self.disconnect_after = disconnect_after
+        self.checks = 0
+
+    async def is_disconnected(self):
+        self.checks += 1
+        return self.disconnect_after is not None and self.checks > self.disconnect_after
+
+
+def _read_entries(request, entries):
+    async def read():
+        return [
+            entry
+            async for entry in entries_router._read_entries_from_archive(
+                request, entries, None
+            )
+        ]
+
+    return asyncio.run(read())
+
+
+@pytest.fixture
+def archive_read_threads(monkeypatch):
+    monkeypatch.setattr('nomad.config.services.archive_read_threads', 4)
+    executor = ThreadPoolExecutor(max_workers=4)
+    monkeypatch.setattr(entries_router, '_archive_read_executor', executor)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def test_entries_archive_read_order(monkeypatch, archive_read_threads):
+    upload_ids = ['a', 'b', 'a', 'c', 'b', 'a', 'c', 'a']
+    entries = [
+        dict(entry_id=f'entry_{index}', upload_id=upload_id)
+        for index, upload_id in enumerate(upload_ids)
+    ]
+
+    def read_entry(entry, uploads, required_reader):
+        # the first entries take longest, results must not be yielded as they arrive
+        time.sleep(0.01 * (len(entries) - int(entry['entry_id'].split('_')[1])))
+        return dict(entry, archive=entry['upload_id'])
+
+    monkeypatch.setattr(entries_router, '_read_entry_from_archive', read_entry)
+
+    results = _read_entries(_Request(), entries)
+    assert [entry['entry_id'] for entry in results] == [
+        entry['entry_id'] for entry in entries
+    ]
+    assert [entry['archive'] for entry in results] == upload_ids
+
+
+def test_entries_archive_read_disconnect(monkeypatch, archive_read_threads):
+    entries = [dict(entry_id=f'entry_{index}', upload_id='a') for index in range(40)]
+    read = []
+    released = threading.Event()
+
+    def read_entry(entry, uploads, required_reader):
+        read.append(entry['entry_id'])
+        if entry['entry_id'] != 'entry_0':
+            released.wait(timeout=10)
+        return entry
+
+    monkeypatch.setattr(entries_router, '_read_entry_from_archive', read_entry)
+
+    results = _read_entries(_Request(disconnect_after=1), entries)
+    released.set()
+    archive_read_threads.shutdown(wait=True)
+
+    assert [entry['entry_id'] for entry in results] == ['entry_0']
+    # each of the 4 chunks finishes at most the read it was waiting on
+    assert len(read) <= 5
+
+
 @pytest.mark.parametrize(
     'user, entry_id, status_code',
     [
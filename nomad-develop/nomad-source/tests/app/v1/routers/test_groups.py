@@ -1,7 +1,12 @@
 import pytest
 from .common import assert_response, perform_get, perform_post
 from nomad.app.v1.routers.groups import UserGroup, UserGroups
-from nomad.groups import get_user_group, user_group_exists
+from nomad.groups import (
+    get_group_ids,
+    get_user_group,
+    user_group_exists,
+    user_group_ids_cache,
+)
 
 
 base_url = 'groups'
@@ -252,3 +257,21 @@ def test_delete_group_invalid(
     response = client.delete(f'{base_url}/invalid-group-id', headers=user_auth)
     assert_response(response, expected_status_code)
     assert user_group_exists(group_id)
+
+
+def test_group_ids_cache(auth_headers, client, groups_function):
+    group = groups_function['group123']
+    member_id = group.members[0]
+
+    metrics_before = user_group_ids_cache.metrics()
+    assert group.group_id in get_group_ids(member_id, use_cache=True)
+    assert group.group_id in get_group_ids(member_id, use_cache=True)
+    metrics = user_group_ids_cache.metrics()
+    assert metrics['misses'] == metrics_before['misses'] + 1
+    assert metrics['hits'] == metrics_before['hits'] + 1
+
+    response = client.delete(
+        f'{base_url}/{group.group_id}', headers=auth_headers['user1']
+    )
+    assert_response(response, 204)
+    assert group.group_id not in get_group_ids(member_id, use_cache=True)
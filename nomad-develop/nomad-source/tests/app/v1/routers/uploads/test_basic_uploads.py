@@ -16,6 +16,7 @@
 # limitations under the License.
 #
 
+import hashlib
 import io
 import os
 import time
@@ -46,6 +47,7 @@ from tests.processing.test_edit_metadata import (
 from tests.test_files import (
     assert_upload_files,
     empty_file,
+    example_file,
     example_file_aux,
     example_file_corrupt_zip,
     example_file_mainfile_different_atoms,
@@ -2543,6 +2545,62 @@ def test_post_upload_raw_create_dir_path(
         assert not upload.upload_files.raw_path_is_file(path)
 
 
+def test_upload_chunked(
+    auth_headers, client, proc_infra, non_empty_processed, example_data_writeable
+):
+    upload_id = 'examples_template'
+    user_auth = auth_headers['user1']
+    with open(example_file, 'rb') as f:
+        data = f.read()
+    checksum = hashlib.sha256(data).hexdigest()
+    chunk_size = len(data) // 3 + 1
+
+    response = client.post(
+        f'uploads/{upload_id}/chunked?path=chunked&file_name=data.zip',
+        headers=user_auth,
+    )
+    assert_response(response, 200)
+    session_id = response.json()['session_id']
+    url = f'uploads/{upload_id}/chunked/{session_id}'
+    assert_response(client.get(url, headers=auth_headers['user2']), 404)
+
+    # send the first two chunks, the second one twice (e.g. after an interruption)
+    for offset in (0, chunk_size, chunk_size):
+        response = client.put(
+            f'{url}?offset={offset}',
+            data=data[offset : offset + chunk_size],
+            headers=user_auth,
+        )
+        assert_response(response, 200)
+        assert response.json()['offset'] == offset + chunk_size
+
+    response = client.put(
+        f'{url}?offset={3 * chunk_size}', data=b'data', headers=user_auth
+    )
+    assert_response(response, 409)
+
+    response = client.get(url, headers=user_auth)
+    assert_response(response, 200)
+    offset = response.json()['offset']
+    response = client.put(
+        f'{url}?offset={offset}', data=data[offset:], headers=user_auth
+    )
+    assert_response(response, 200)
+    assert response.json()['offset'] == len(data)
+
+    response = client.post(f'{url}/finalize?checksum=wrong', headers=user_auth)
+    assert_response(response, 400)
+    response = client.post(f'{url}/finalize?checksum={checksum}', headers=user_auth)
+    assert_response(response, 200)
+    assert_response(client.get(url, headers=user_auth), 404)
+
+    block_until_completed(client, upload_id, user_auth)
+    assert_expected_mainfiles(
+        upload_id,
+        ['examples_template/template.json', 'chunked/examples_template/template.json'],
+    )
+
+
 @pytest.mark.parametrize(
     'user, upload_id, path, use_upload_token, expected_status_code, expected_mainfiles',
     [
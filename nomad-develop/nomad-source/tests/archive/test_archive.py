@@ -211,6 +211,22 @@ def test_write_archive_multi(monkeypatch, example_uuid, example_entry, new_write
     assert example_uuid in toc
 
 
+def test_write_archive_lazy(monkeypatch, example_uuid, example_entry):
+    monkeypatch.setattr('nomad.config.archive.use_new_writer', True)
+
+    def lazy(value):
+        if isinstance(value, dict):
+            return lambda: {key: lazy(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [lazy(item) for item in value]
+        return value
+
+    f, lazy_f = BytesIO(), BytesIO()
+    write_archive(f, 1, [(example_uuid, example_entry)])
+    write_archive(lazy_f, 1, [(example_uuid, lazy(example_entry)())])
+    assert lazy_f.getvalue() == f.getvalue()
+
+
 @pytest.mark.parametrize('new_writer', [True, False])
 @pytest.mark.parametrize('use_blocked_toc', [False, True])
 def test_read_archive_single(
@@ -276,6 +292,101 @@ def test_read_archive_multi(
             assert float(i) == entry['large_list'][i]
 
 
+def test_read_archive_mmap(monkeypatch, raw_files_function, example_entry):
+    from nomad.archive.storage_v2 import (
+        ArchiveReadCounter,
+        ArchiveReader as ArchiveReaderNew,
+        MappedArchiveFile,
+    )
+
+    monkeypatch.setattr('nomad.config.archive.small_obj_optimization_threshold', 256)
+
+    archive_size = _entries_per_block * 2 + 23
+    path = os.path.join(config.fs.tmp, 'test_mmap.msg')
+    write_archive(
+        path,
+        archive_size,
+        [(create_example_uuid(i), example_entry) for i in range(0, archive_size)],
+    )
+
+    counters = ArchiveReadCounter(), ArchiveReadCounter()
+    readers = [
+        ArchiveReaderNew(path, use_mmap=use_mmap, counter=counter)
+        for use_mmap, counter in zip((True, False), counters)
+    ]
+    shared = ArchiveReaderNew(path, use_mmap=True)
+    assert len(MappedArchiveFile._mapped) == 1
+
+    for i in (0, archive_size // 2, archive_size - 1):
+        key = create_example_uuid(i)
+        mapped, buffered = (reader[key] for reader in readers)
+        assert to_json(mapped) == to_json(buffered) == example_entry
+        assert mapped['large_list'][199] == 199.0
+        assert to_json(shared[key]['run']) == example_entry['run']
+
+    assert counters[0]() == counters[1]()
+
+    for reader in readers:
+        reader.close()
+    assert len(MappedArchiveFile._mapped) == 1
+    shared.close()
+    assert len(MappedArchiveFile._mapped) == 0
+    assert shared.is_closed()
+
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+def test_archive_reader_pool(monkeypatch, tmp_path, example_entry, use_mmap):
+    from nomad.archive.storage_v2 import ArchiveReaderPool
+
+    monkeypatch.setattr('nomad.config.archive.use_mmap', use_mmap)
+
+    paths = []
+    for i in range(3):
+        paths.append(str(tmp_path / f'test_pool_{i}.msg'))
+        write_archive(paths[i], 1, [(create_example_uuid(i), example_entry)])
+
+    pool = ArchiveReaderPool(max_readers=2, max_bytes=2**30)
+
+    with pool.open('upload_0', paths[0]) as reader:
+        assert to_json(reader[create_example_uuid(0)]) == example_entry
+    with pool.open('upload_0', paths[0]) as reader:
+        pooled = next(iter(pool._readers.values()))
+        assert reader._toc is pooled._toc
+        assert to_json(reader[create_example_uuid(0)]) == example_entry
+    assert pool.metrics()['hits'] == 1
+    assert pool.metrics()['misses'] == 1
+
+    # a re-written file is not served from the pool
+    write_archive(paths[0], 1, [(create_example_uuid(0), {'archive': 'test'})])
+    os.utime(paths[0], ns=(0, 0))
+    with pool.open('upload_0', paths[0]) as reader:
+        assert to_json(reader[create_example_uuid(0)]) == {'archive': 'test'}
+    assert pool.metrics()['misses'] == 2
+    assert pool.metrics()['readers'] == 1
+
+    for i in (1, 2):
+        pool.open(f'upload_{i}', paths[i]).close()
+    assert pool.metrics()['readers'] == 2
+    assert pool.metrics()['evictions'] == 1
+
+    pool.invalidate('upload_1')
+    assert pool.metrics()['readers'] == 1
+    pooled = next(iter(pool._readers.values()))
+    assert pool.metrics()['bytes'] == pooled.memory_size
+
+    pool.clear()
+    assert pool.metrics()['readers'] == 0
+    assert pool.metrics()['bytes'] == 0
+
+    # the file buffers of pooled readers count towards the size of the pool
+    pool = ArchiveReaderPool(max_readers=2, max_bytes=config.archive.read_buffer_size)
+    for i in (1, 2):
+        pool.open(f'upload_{i}', paths[i]).close()
+    # memory-mapped files have no buffer
+    assert pool.metrics()['evictions'] == (0 if use_mmap else 1)
+    pool.clear()
+
+
 test_query_example: Dict[Any, Any] = {
     'c1': {
         's1': {'ss1': [{'p1': 1.0, 'p2': 'x'}, {'p1': 1.5, 'p2': 'y'}]},
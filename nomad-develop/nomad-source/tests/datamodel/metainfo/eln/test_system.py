@@ -20,6 +20,7 @@ import os
 from nomad.datamodel.context import ClientContext
 from nomad.datamodel.data import User
 from nomad.datamodel.datamodel import EntryArchive
+from nomad.datamodel.metainfo import basesections
 from nomad.utils.exampledata import ExampleData
 from tests.normalizing.conftest import run_normalize
 
@@ -81,3 +82,24 @@ def test_ensemble(raw_files_function, user1, mongo_function):
     assert test_archive.metadata.entry_type == 'my_ensemble'
     # Check that sample id was generated correctly from the author metadata
     assert test_archive.data.lab_id == 'HUB_ShCo_19930101_My-ensemble'
+
+
+def test_indexed_lab_ids(elastic_function, user1, monkeypatch):
+    monkeypatch.setattr(basesections, '_lab_id_cache', {})
+    upload_id = 'test_upload_id'
+    data = ExampleData(main_author=user1)
+    data.create_upload(upload_id=upload_id, published=False)
+    # more entries than fit on the first page of 10 results per lab id
+    for index in range(12):
+        data.create_entry(
+            upload_id=upload_id,
+            entry_id=f'test_entry_{index:02d}',
+            results={'eln': {'lab_ids': ['lab_a' if index < 11 else 'lab_b']}},
+        )
+    data.save(with_files=False, with_mongo=False)
+
+    result = basesections.indexed_lab_ids(['lab_a'], user1.user_id)
+    assert list(result) == ['lab_a']
+    assert sorted(result['lab_a']) == [
+        (upload_id, f'test_entry_{index:02d}') for index in range(11)
+    ]
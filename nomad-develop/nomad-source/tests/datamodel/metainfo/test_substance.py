@@ -21,6 +21,8 @@ import pytest
 import json
 
 from tests.normalizing.conftest import run_processing
+from nomad.config import config
+from nomad.datamodel import external_api
 from nomad.datamodel.metainfo import basesections
 
 
@@ -68,6 +70,7 @@ def external_api_fixture(monkeypatch):
     monkeypatch.setattr(basesections, 'pub_chem_api_search', pub_chem_api_search)
     monkeypatch.setattr(basesections, 'cas_api_search', cas_api_search)
     monkeypatch.setattr(basesections, 'cas_api_details', cas_api_details)
+    monkeypatch.setattr(basesections, 'pub_chem_api_prefetch', lambda *args: None)
 
 
 @pytest.mark.parametrize(
@@ -97,3 +100,100 @@ def test_substance(mainfile, external_api_fixture):
                 f'Unknown element "{composition.element}" in'
                 ' results.material.elemental_composition'
             )
+
+
+class StubBackend(external_api.ExternalAPIBackend):
+    responses: dict = {}
+    urls: list = []
+
+    def get(self, url, timeout):
+        StubBackend.urls.append(url)
+        if url not in StubBackend.responses:
+            raise external_api.requests.ConnectionError()
+        return external_api.ExternalAPIResponse(*StubBackend.responses[url])
+
+
+@pytest.fixture(scope='function')
+def external_api_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        config.normalize, 'external_api_cache_file', str(tmp_path / 'cache.sqlite')
+    )
+    monkeypatch.setattr(
+        config.normalize,
+        'external_api_backend',
+        f'{StubBackend.__module__}.{StubBackend.__name__}',
+    )
+    monkeypatch.setattr(external_api, '_cache', None)
+    monkeypatch.setattr(external_api, '_backend', None)
+    monkeypatch.setattr(external_api, '_offline_until', {})
+    StubBackend.responses = {}
+    StubBackend.urls = []
+    yield StubBackend
+
+
+def test_external_api_cache(external_api_cache, monkeypatch):
+    url = f'{basesections.PUB_CHEM_PUG_PATH}/cid/1/synonyms/JSON'
+    missing_url = f'{basesections.PUB_CHEM_PUG_PATH}/name/missing/cids/JSON'
+    external_api_cache.responses[url] = (200, '{"cid": 1}')
+    external_api_cache.responses[missing_url] = (404, '')
+
+    # responses and definite misses are cached
+    assert basesections.pub_chem_api_get_synonyms(1).json() == {'cid': 1}
+    assert basesections.pub_chem_api_get_synonyms(1).json() == {'cid': 1}
+    assert basesections.pub_chem_api_search('name', 'missing').status_code == 404
+    assert basesections.pub_chem_api_search('name', 'missing').status_code == 404
+    assert external_api_cache.urls == [url, missing_url]
+
+    # expired responses are used, if the service is not available
+    monkeypatch.setattr(external_api.get_cache(), 'ttl', -1)
+    external_api_cache.responses = {}
+    assert basesections.pub_chem_api_get_synonyms(1).json() == {'cid': 1}
+    # no more requests while the service is not available
+    assert not basesections.pub_chem_api_search('name', 'other').ok
+    assert len(external_api_cache.urls) == 3
+    # other services are still requested
+    cas_url = f'{basesections.CAS_API_PATH}/search?q=other'
+    external_api_cache.responses[cas_url] = (200, '{"count": 0}')
+    assert basesections.cas_api_search('other').ok
+    assert external_api_cache.urls[3:] == [cas_url]
+
+
+def test_external_api_cache_error(external_api_cache):
+    url = f'{basesections.PUB_CHEM_PUG_PATH}/cid/1/synonyms/JSON'
+    external_api_cache.responses[url] = (200, '{"cid": 1}')
+
+    # lookups are still answered, just not cached
+    external_api.get_cache()._connection.close()
+    assert basesections.pub_chem_api_get_synonyms(1).json() == {'cid': 1}
+    assert basesections.pub_chem_api_get_synonyms(1).json() == {'cid': 1}
+    assert external_api_cache.urls == [url, url]
+
+
+def test_external_api_cache_default_file(monkeypatch, tmp_path):
+    # sqlite locking is not reliable on the shared fs, the cache is local to the node
+    monkeypatch.setattr(config.normalize, 'external_api_cache_file', None)
+    monkeypatch.setattr(config.fs, 'local_tmp', str(tmp_path))
+    monkeypatch.setattr(external_api, '_cache', None)
+    external_api.get_cache()
+    assert (tmp_path / 'external_api_cache.sqlite').exists()
+
+
+def test_pub_chem_api_prefetch(external_api_cache):
+    properties = ['Title', 'InChI']
+    names = ','.join(properties)
+    external_api_cache.responses[
+        f'{basesections.PUB_CHEM_PUG_PATH}/cid/1,2/property/{names}/JSON'
+    ] = (
+        200,
+        json.dumps(
+            {'PropertyTable': {'Properties': [{'CID': 1}, {'CID': 2, 'Title': 'b'}]}}
+        ),
+    )
+
+    # one request for the properties and one for the synonyms of all compounds
+    basesections.pub_chem_api_prefetch([2, 1, 1], properties)
+    assert len(external_api_cache.urls) == 2
+
+    response = basesections.pub_chem_api_get_properties(2, properties)
+    assert response.json()['PropertyTable']['Properties'] == [{'CID': 2, 'Title': 'b'}]
+    assert len(external_api_cache.urls) == 2
@@ -24,7 +24,7 @@ import re
 import numpy as np
 
 from nomad import utils, files, processing
-from nomad.metainfo.metainfo import MSection
+from nomad.metainfo.metainfo import MSection, Package, Section
 from nomad.parsing.parser import ArchiveParser
 from nomad.datamodel import Context
 from nomad.datamodel.context import ServerContext, ClientContext, parse_path
@@ -365,6 +365,199 @@ def test_server_custom_schema(upload_contents, raw_files_function):
         assert results == content
 
 
+def test_server_schema_cache(raw_files_function):
+    upload_files = files.StagingUploadFiles('test_upload', create=True)
+    upload = processing.Upload(upload_id='test_upload')
+
+    def write_schema(name, file_name='schema.json', base_section=None):
+        with upload_files.raw_file(file_name, 'wt') as f:
+            json.dump(
+                {
+                    'definitions': {
+                        'section_definitions': [
+                            {
+                                'base_sections': [
+                                    base_section or 'nomad.datamodel.data.EntryData'
+                                ],
+                                'name': name,
+                            }
+                        ]
+                    }
+                },
+                f,
+            )
+
+    def parse_entry(schema='schema.json'):
+        file_name = 'sample.archive.json'
+        with upload_files.raw_file(file_name, 'wt') as f:
+            json.dump(
+                {
+                    'data': {
+                        'm_def': f'../upload/raw/{schema}#/definitions/section_definitions/0'
+                    }
+                },
+                f,
+            )
+        context = ServerContext(upload=upload)
+        archive = EntryArchive(
+            m_context=context,
+            metadata=EntryMetadata(
+                upload_id='test_upload',
+                entry_id=utils.generate_entry_id('test_upload', file_name),
+                mainfile=file_name,
+            ),
+        )
+        ArchiveParser().parse(
+            mainfile=upload_files.raw_file_object(file_name).os_path, archive=archive
+        )
+        archives.append(archive)
+        return archive.data.m_def
+
+    archives: list = []
+    write_schema('Sample')
+    section_def = parse_entry()
+    assert section_def.name == 'Sample'
+    # another entry with its own context shares the initialized schema
+    assert parse_entry() is section_def
+    # the shared schema is not bound to the contexts of the entries, each entry
+    # references it through its own context
+    assert section_def.m_root().m_context not in [
+        archive.m_context for archive in archives
+    ]
+    for archive in archives:
+        assert archive.m_to_dict()['data']['m_def'] == (
+            '../upload/raw/schema.json#/definitions/section_definitions/0'
+        )
+        archive.m_context.close()
+
+    # a changed schema file is loaded again
+    write_schema('ChangedSample')
+    assert parse_entry().name == 'ChangedSample'
+
+    # schemas that reference other files are not shared, the referenced file
+    # might change without changing the referencing file
+    write_schema(
+        'DerivedSample',
+        file_name='derived.json',
+        base_section='../upload/raw/schema.json#/definitions/section_definitions/0',
+    )
+    derived_def = parse_entry('derived.json')
+    assert derived_def.base_sections[0].name == 'ChangedSample'
+    write_schema('OtherSample')
+    derived_def = parse_entry('derived.json')
+    assert derived_def.base_sections[0].name == 'OtherSample'
+
+
+@pytest.mark.parametrize(
+    'reference, shared',
+    [
+        pytest.param('#/section_definitions/0', True, id='self-contained'),
+        pytest.param(
+            '../uploads/other_upload/archive/other_entry#/definitions/section_definitions/0',
+            False,
+            id='external-references',
+        ),
+    ],
+)
+def test_section_definition_schema_cache(reference, shared):
+    pkg_definition = {
+        'name': f'test_package_{shared}',
+        'entry_id_based_name': '*',
+        'section_definitions': [
+            {
+                'name': 'Sample',
+                'quantities': [
+                    {
+                        'name': 'value',
+                        'type': {'type_kind': 'python', 'type_data': 'str'},
+                    },
+                    {
+                        'name': 'sample',
+                        'type': {'type_kind': 'reference', 'type_data': reference},
+                    },
+                ],
+            }
+        ],
+    }
+
+    class DefinitionContext(Context):
+        def retrieve_package_by_section_definition_id(
+            self, definition_reference, definition_id
+        ):
+            return pkg_definition
+
+        def load_archive(self, entry_id, upload_id, installation_url):
+            return EntryArchive(
+                m_context=self,
+                definitions=Package(section_definitions=[Section(name='Other')]),
+            )
+
+    context = DefinitionContext()
+    definition_id = (
+        context.load_package(pkg_definition).section_definitions[0].definition_id
+    )
+    section_cls = context.resolve_section_definition('Sample', definition_id)
+    assert section_cls.m_def.name == 'Sample'
+
+    other_context = DefinitionContext()
+    assert (
+        other_context.resolve_section_definition('Sample', definition_id) is section_cls
+    ) == shared
+    # shared packages are never bound to the contexts that use them
+    if shared:
+        assert section_cls.m_def.m_root().m_context not in [context, other_context]
+
+
+def test_server_context_raw_file_dependencies(raw_files_function):
+    upload_files = files.StagingUploadFiles('test_upload', create=True)
+    upload = processing.Upload(upload_id='test_upload')
+    with upload_files.raw_file('schema.json', 'wt') as f:
+        json.dump(
+            {
+                'definitions': {
+                    'section_definitions': [
+                        {
+                            'base_sections': ['nomad.datamodel.data.EntryData'],
+                            'name': 'Sample',
+                        }
+                    ]
+                }
+            },
+            f,
+        )
+
+    # all entries of an upload are processed with the same context
+    context = ServerContext(upload=upload)
+
+    def parse_entry(file_name):
+        with upload_files.raw_file(file_name, 'wt') as f:
+            json.dump(
+                {
+                    'data': {
+                        'm_def': '../upload/raw/schema.json#/definitions/section_definitions/0'
+                    }
+                },
+                f,
+            )
+        archive = EntryArchive(
+            m_context=context,
+            metadata=EntryMetadata(
+                upload_id='test_upload',
+                entry_id=utils.generate_entry_id('test_upload', file_name),
+                mainfile=file_name,
+            ),
+        )
+        context.raw_file_dependencies = {file_name}
+        ArchiveParser().parse(
+            mainfile=upload_files.raw_file_object(file_name).os_path, archive=archive
+        )
+        return context.raw_file_dependencies
+
+    assert parse_entry('a.archive.json') == {'a.archive.json', 'schema.json'}
+    # the second entry resolves the schema from the archives of the context
+    assert parse_entry('b.archive.json') == {'b.archive.json', 'schema.json'}
+
+
 @pytest.mark.parametrize(
     'upload1_contents, upload2_contents',
     [
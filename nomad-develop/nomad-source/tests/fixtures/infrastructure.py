@@ -9,6 +9,7 @@ import pytest
 
 from nomad import infrastructure
 from nomad.config import config
+from nomad.groups import user_group_ids_cache
 
 elastic_test_entries_index = 'nomad_entries_v1_test'
 elastic_test_materials_index = 'nomad_materials_v1_test'
@@ -124,6 +125,7 @@ def mongo_infra(monkeysession):
 def clear_mongo(mongo_infra):
     # Some test cases need to reset the database connection
     infrastructure.mongo_client.drop_database('test_db')
+    user_group_ids_cache.clear()
     return infrastructure.mongo_client
 
 
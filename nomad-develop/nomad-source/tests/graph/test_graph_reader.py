@@ -2554,6 +2554,38 @@ def test_general_reader_search(json_dict, example_data_with_reference, user1):
     )
 
 
+def test_batched_access_checks(
+    monkeypatch, json_dict, example_data_with_reference, user1
+):
+    from nomad.graph import graph_reader
+
+    search_calls = []
+
+    def counting_search(*args, **kwargs):
+        search_calls.append(kwargs['query'])
+        return graph_reader.perform_search.__wrapped__(*args, **kwargs)
+
+    counting_search.__wrapped__ = graph_reader.perform_search
+    monkeypatch.setattr(graph_reader, 'perform_search', counting_search)
+
+    entry_ids = [f'id_0{i}' for i in range(1, 7)]
+    with MongoReader({}, user=user1) as reader:
+        reader._prefetch_entries(entry_ids + ['id_does_not_exist'])
+        assert len(search_calls) == 1
+
+        for entry_id in entry_ids:
+            assert reader.retrieve_entry(entry_id)['entry_id'] == entry_id
+        assert reader.retrieve_entry('id_does_not_exist') == 'id_does_not_exist'
+        assert len(search_calls) == 1
+        assert 'id_does_not_exist' in str(reader.errors)
+
+        reader._prefetch_uploads(['id_published_with_ref', 'id_does_not_exist'])
+        assert reader.retrieve_upload('id_published_with_ref')['upload_id'] == (
+            'id_published_with_ref'
+        )
+        assert reader.retrieve_upload('id_does_not_exist') == 'id_does_not_exist'
+
+
 @pytest.fixture(scope='function')
 def custom_data(user1, proc_infra):
     yaml_archive = yaml.safe_load(
@@ -16,7 +16,11 @@
 # limitations under the License.
 #
 
+from collections import defaultdict
+import gc
+import json
 from typing import List
+import weakref
 import pytest
 import numpy as np
 from elasticsearch_dsl import Keyword
@@ -24,10 +28,20 @@ from elasticsearch_dsl import Keyword
 from nomad.config import config
 from nomad.utils.exampledata import ExampleData
 from nomad.datamodel.datamodel import SearchableQuantity
-from nomad.metainfo import MSection, Quantity, SubSection, Datetime, Unit, MEnum
+from nomad.metainfo import (
+    Attribute,
+    MSection,
+    Quantity,
+    Section,
+    SubSection,
+    Datetime,
+    Unit,
+    MEnum,
+)
 from nomad.metainfo.elasticsearch_extension import (
     Elasticsearch,
     create_indices,
+    create_mappings,
     index_entries_with_materials,
     entry_type,
     material_type,
@@ -38,6 +52,8 @@ from nomad.metainfo.elasticsearch_extension import (
 
 from tests.fixtures.infrastructure import clear_elastic_infra
 from tests.app.v1.routers.common import perform_quantity_search_test
+from tests.normalizing.conftest import run_normalize
+from tests.parsing.test_parsing import run_singular_parser
 
 
 @pytest.fixture(scope='module')
@@ -566,3 +582,252 @@ def test_index_materials_capped(elastic_function, indices, monkeypatch, cap, ent
     for material_doc in material_docs:
         assert len(material_doc['entries']) <= cap
         assert material_doc['n_entries'] == entries
+
+
+def create_index_doc_with_m_to_dict(doc_type, root: MSection):
+    """
+    The implementation of `DocumentType.create_index_doc` before it used compiled
+    indexing plans, as a reference for the plans.
+    """
+    suggestions: dict = defaultdict(list)
+
+    def transform(quantity, section, value, path):
+        for annotation in quantity.m_get_annotations(Elasticsearch, as_list=True):
+            if annotation.field is not None:
+                continue
+            if annotation.suggestion:
+                if doc_type != entry_type and annotation.doc_type != doc_type:
+                    continue
+                if annotation.value is not None:
+                    if annotation.variants:
+                        suggestion_value = []
+                        for variant in annotation.variants(value):
+                            suggestion_value.extend(annotation.value(variant))
+                        suggestion_value = list(set(suggestion_value))
+                    else:
+                        suggestion_value = annotation.value(value)
+                else:
+                    suggestion_value = value
+                section_path = section.m_path()[len(root.m_path()) :]
+                name = annotation.property_name
+                if path:
+                    suggestion_path = f'{section_path}/{path}/{name}'
+                else:
+                    suggestion_path = f'{section_path}/{name}'
+                suggestions[suggestion_path].extend(suggestion_value)
+            elif annotation.value is not None:
+                return annotation.value(section)
+
+        return value
+
+    result = root.m_to_dict(
+        with_meta=False,
+        include_defaults=True,
+        include_derived=True,
+        resolve_references=True,
+        exclude=lambda property_, _: property_ not in doc_type.indexed_properties,
+        transform=transform,
+    )
+
+    for path, value in suggestions.items():
+        parts = path.split('/')
+        section = result
+        try:
+            for part in parts[:-1]:
+                if part != '':
+                    section = section[int(part) if part.isdigit() else part]
+            section[parts[-1]] = value
+        except KeyError:
+            pass
+
+    metadata = result.pop('metadata', None)
+    if metadata is not None:
+        result.update(**metadata)
+
+    return result
+
+
+def assert_index_docs(archive: MSection, material: MSection = None):
+    """Asserts that the compiled plans create the same documents as `m_to_dict`."""
+    doc_types = [(entry_type, archive), (material_entry_type, archive)]
+    if material is not None:
+        doc_types.append((material_type, material))
+
+    for doc_type, root in doc_types:
+        index_doc = doc_type.create_index_doc(root)
+        expected_doc = create_index_doc_with_m_to_dict(doc_type, root)
+        # compare the serialized documents to also compare the order of keys
+        assert json.dumps(index_doc, default=str) == json.dumps(
+            expected_doc, default=str
+        ), doc_type.name
+
+
+@pytest.fixture
+def test_schema_mappings():
+    create_mappings(Entry.m_def, Material.m_def)
+    yield
+    create_mappings()
+
+
+def test_create_index_doc_test_schema(test_schema_mappings):
+    entry = Entry(entry_id='test_entry_id', mainfile='mainfile.json', files=['a', 'b'])
+    entry.viewers = [User(user_id='1', name='one'), User(user_id='2', name='two')]
+    entry.m_create(Data, points=[[1.0, 2.0], [3.0, 4.0]], series=[1.0, 2.0, 3.0])
+    results = entry.m_create(Results)
+    material = results.m_create(
+        Material, material_id='test_material_id', formula='H2O', springer_labels=['a']
+    )
+    properties = results.m_create(Properties, available_properties=['dos'])
+    properties.band_gap = 1.0
+    # references to sections and quantities
+    properties.data = entry.data
+    properties.n_series = entry.data
+    for channel in range(3):
+        properties.m_create(Dos, channel=channel)
+
+    assert_index_docs(entry, material)
+
+    # sections with instance annotations use the m_to_dict fallback
+    material.m_annotations['test'] = 'value'
+    assert_index_docs(entry, material)
+
+
+class AttributesEntry(MSection):
+    entry_id = Quantity(type=str, a_elasticsearch=Elasticsearch(material_entry_type))
+    label = Quantity(
+        type=str,
+        attributes=[Attribute(name='source', type=str)],
+        a_elasticsearch=Elasticsearch(material_entry_type),
+    )
+
+
+def test_create_index_doc_full_storage():
+    create_mappings(AttributesEntry.m_def, Material.m_def)
+    try:
+        entry = AttributesEntry(entry_id='test_entry_id', label='test')
+        entry.m_set_quantity_attribute('label', 'source', 'test source')
+
+        # sections with full storage quantities use the m_to_dict fallback
+        assert entry_type._indexed_section(AttributesEntry.m_def).generic
+        assert_index_docs(entry)
+    finally:
+        create_mappings()
+
+
+def test_create_index_doc_frees_plans(test_schema_mappings):
+    # the section definitions of custom schemas only live as long as their archives
+    section_def = Section(
+        name='CustomData', quantities=[Quantity(name='value', type=str)]
+    )
+    quantity = section_def.quantities[0]
+    entry_type.indexed_properties.add(quantity)
+    try:
+        indexed_section = entry_type._indexed_section(section_def)
+        assert indexed_section.quantity_serializers[quantity].name == 'value'
+        assert entry_type._indexed_section(section_def) is indexed_section
+    finally:
+        entry_type.indexed_properties.discard(quantity)
+
+    section_def = weakref.ref(section_def)
+    del indexed_section, quantity
+    gc.collect()
+    assert section_def() is None
+
+
+@pytest.mark.parametrize(
+    'parser_name, mainfile',
+    [
+        pytest.param(
+            'parsers/template', 'tests/data/templates/template.json', id='template'
+        ),
+        pytest.param('parsers/vasp', 'tests/data/parsers/vasp/vasp.xml', id='vasp'),
+        pytest.param('parsers/eels', 'tests/data/parsers/eels.json', id='eels'),
+        pytest.param(
+            'parsers/archive', 'tests/data/parsers/archive.json', id='archive'
+        ),
+    ],
+)
+def test_create_index_doc_archives(parser_name, mainfile, user1):
+    archive = run_normalize(run_singular_parser(parser_name, mainfile))
+    archive.metadata.main_author = user1
+    assert_index_docs(archive, archive.results.material if archive.results else None)
+
+
+def test_create_index_doc_example_data(user1, user2):
+    from nomad.datamodel import Dataset
+
+    data = ExampleData(main_author=user1)
+    data.create_upload(upload_id='test_upload')
+    archive = data.create_entry(
+        upload_id='test_upload',
+        entry_id='test_entry',
+        mainfile='test_content/test_entry/mainfile.json',
+        results={
+            'material': {
+                'material_name': 'water',
+                'structural_type': 'molecule / cluster',
+                'chemical_formula_hill': 'H2O',
+                'elements': ['H', 'O'],
+            }
+        },
+    )
+    # references with suggestions
+    archive.metadata.coauthors = [user2]
+    archive.metadata.datasets = [
+        Dataset(dataset_id='test_dataset', dataset_name='test dataset')
+    ]
+
+    assert_index_docs(archive, archive.results.material)
+
+
+def test_bulk_chunks_and_retries(monkeypatch):
+    import orjson
+
+    from nomad.metainfo.elasticsearch_extension import _bulk, _bulk_item
+
+    class BulkIndex:
+        def __init__(self):
+            self.bodies = []
+            self.rejected = {'entry_1'}
+
+        def bulk(self, body, **kwargs):
+            self.bodies.append(body)
+            lines = body.splitlines()
+            items = []
+            for action in lines[::2]:
+                entry_id = orjson.loads(action)['index']['_id']
+                if entry_id == 'entry_0':
+                    status, error = 400, 'mapper_parsing_exception'
+                elif entry_id in self.rejected:
+                    # rejected once, accepted when sent again
+                    self.rejected.remove(entry_id)
+                    status, error = 429, 'es_rejected_execution_exception'
+                else:
+                    status, error = 201, None
+                items.append(
+                    {'index': {'_id': entry_id, 'status': status, 'error': error}}
+                )
+            return {
+                'errors': any(item['index']['error'] for item in items),
+                'items': items,
+            }
+
+    items = [
+        (f'entry_{i}', _bulk_item(dict(index=dict(_id=f'entry_{i}')), dict(value=i)))
+        for i in range(10)
+    ]
+    monkeypatch.setattr(config.elastic, 'bulk_max_bytes', 3 * len(items[0][1]))
+    monkeypatch.setattr(config.elastic, 'bulk_concurrency', 2)
+    monkeypatch.setattr('time.sleep', lambda seconds: None)
+
+    index = BulkIndex()
+    errors = _bulk(index, iter(items))
+
+    assert errors == {'entry_0': 'mapper_parsing_exception'}
+    # 4 chunks by size, plus one retry that only contains the rejected item
+    assert len(index.bodies) == 5
+    assert items[1][1] in index.bodies
+    for body in index.bodies:
+        assert len(body) <= config.elastic.bulk_max_bytes
+        for line in body.splitlines():
+            orjson.loads(line)
@@ -20,6 +20,7 @@ import numpy as np
 from nomad.datamodel import EntryData, EntryArchive
 from nomad.metainfo import Quantity, SubSection
 from nomad.client import normalize_all
+from nomad.normalizing import has_any_section, check_normalizer_order, normalizers
 
 
 def test_normalizer_level():
@@ -57,3 +58,38 @@ def test_normalizer_level():
 
     normalize_all(archive)
     assert (archive.data.numbers == [5, 3, 4, 6, 7, 1, 2]).all()
+
+
+def test_has_any_section():
+    archive = EntryArchive()
+    assert not has_any_section(archive, ['results'])
+    assert not has_any_section(archive, ['results.material', 'unknown'])
+
+    archive.m_setdefault('results.material')
+    assert has_any_section(archive, ['results'])
+    assert has_any_section(archive, ['unknown', 'results.material'])
+    assert not has_any_section(archive, ['results.properties'])
+    assert has_any_section(archive, [''])
+
+
+def test_check_normalizer_order():
+    class Reader:
+        reads = ['run']
+        writes = ['results']
+
+    class Writer:
+        reads = None
+        writes = ['run.system']
+
+    class ArchiveReader:
+        reads = ['']
+        writes = None
+
+    assert check_normalizer_order([Writer, Reader, ArchiveReader]) == []
+    assert check_normalizer_order([ArchiveReader, Writer, Reader]) == []
+    assert check_normalizer_order([Reader, Writer]) == [
+        'Reader reads run, which is written by the later Writer'
+    ]
+
+    # the order of the configured normalizers
+    assert check_normalizer_order(normalizers) == []
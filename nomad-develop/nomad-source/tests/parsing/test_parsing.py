@@ -20,11 +20,19 @@ import json
 import pytest
 import os
 from shutil import copyfile
+from concurrent.futures import ThreadPoolExecutor
+import time
 
 from nomad import utils, files
 from nomad.datamodel import EntryArchive
 from nomad.parsing import BrokenParser, MatchingParserInterface
-from nomad.parsing.parsers import parser_dict, match_parser, run_parser, parsers
+from nomad.parsing.parsers import (
+    ParserIndex,
+    parser_dict,
+    match_parser,
+    run_parser,
+    parsers,
+)
 from nomad.utils import dump_json
 
 parser_examples = [
@@ -297,6 +305,38 @@ def test_match(
     )
 
 
+def test_parser_index(raw_files_function):
+    import magic
+
+    parser_index = ParserIndex(parsers)
+    assert parser_index.is_index_for(parsers)
+    assert not parser_index.is_index_for(parsers[1:])
+
+    upload_files = files.StagingUploadFiles('example_upload_id', create=True)
+    upload_files.add_rawfiles('tests/data/parsers')
+
+    for path_info in upload_files.raw_directory_list(recursive=True, files_only=True):
+        mainfile_path = upload_files.raw_file_object(path_info.path).os_path
+        with open(mainfile_path, 'rb') as f:
+            buffer = f.read(1024)
+        mime_type = magic.from_buffer(buffer, mime=True)
+        try:
+            decoded_buffer = buffer.decode('utf-8')
+        except UnicodeDecodeError:
+            decoded_buffer = None
+
+        candidates = parser_index.candidates_by_mime(
+            parser_index.candidates_by_name(mainfile_path, strict=False), mime_type
+        )
+        for index, parser in enumerate(parsers):
+            if index in candidates:
+                continue
+            # the index must never filter a parser that would have matched
+            assert not parser.is_mainfile(
+                mainfile_path, mime_type, buffer, decoded_buffer
+            ), f'{parser.name} was filtered for {path_info.path}'
+
+
 def parser_in_dir(dir):
     for root, _, files in os.walk(dir):
         for file_name in files:
@@ -331,3 +371,31 @@ if __name__ == '__main__':
     ), 'One argument with an directory path is required.'
 
     parser_in_dir(sys.argv[1])
+
+
+class SlowMainfileParser:
+    instances = 0
+
+    def __init__(self):
+        time.sleep(0.01)
+        SlowMainfileParser.instances += 1
+
+    def get_mainfile_keys(self, filename, decoded_buffer):
+        return ['child']
+
+
+def test_matching_parser_interface_threads():
+    parser = MatchingParserInterface(
+        f'{__name__}.SlowMainfileParser', name='parsers/slow', mainfile_name_re=r'.*'
+    )
+    SlowMainfileParser.instances = 0
+
+    def is_mainfile(index):
+        return parser.is_mainfile(f'{index}.txt', 'text/plain', b'', '')
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(is_mainfile, range(32)))
+
+    assert results == [['child']] * 32
+    assert SlowMainfileParser.instances == 1
+    assert parser.creates_children
@@ -959,3 +959,161 @@ def get_archives(context, mainfile, upload_id, keys=None):
         child_archives = None
 
     return main_archive, child_archives
+
+
+@pytest.mark.parametrize(
+    'content,parsing_options,engine',
+    [
+        pytest.param('a;b\n1;2.5\n3;-4.5\n', {}, 'c', id='semicolon'),
+        pytest.param('a\tb\n1\t2.5\n3\t-4.5\n', {}, 'c', id='tab'),
+        pytest.param(
+            '# header\na , b\n1 ,  2.5 # comment\n3,-4.5\n',
+            {'sep': r'\s*,\s*', 'comment': '#'},
+            'python',
+            id='python-fallback',
+        ),
+    ],
+)
+def test_tabular_csv_engines(
+    raw_files_function, monkeypatch, content, parsing_options, engine
+):
+    """
+    Tests that the tabular parser reads CSV files with the expected pandas engine and
+    that the quantities match the values read with the python engine.
+    """
+    import pandas as pd
+
+    engines = []
+    read_csv = pd.read_csv
+
+    def read_csv_spy(*args, **kwargs):
+        result = read_csv(*args, **kwargs)
+        engines.append(kwargs.get('engine'))
+        return result
+
+    quantities = {
+        f'quantity_{column}': {
+            'type': 'np.float64',
+            'shape': ['*'],
+            'm_annotations': {'tabular': {'name': column}},
+        }
+        for column in ['a', 'b']
+    }
+    base_schema = {
+        'definitions': {
+            'name': 'Eln',
+            'sections': {
+                'Measurement': {'quantities': quantities},
+                'My_schema': {
+                    'base_section': 'nomad.parsing.tabular.TableData',
+                    'quantities': {
+                        'data_file': {
+                            'type': 'str',
+                            'm_annotations': {
+                                'tabular_parser': {
+                                    'parsing_options': parsing_options,
+                                    'mapping_options': [
+                                        {
+                                            'mapping_mode': 'column',
+                                            'file_mode': 'current_entry',
+                                            'sections': ['measurement'],
+                                        }
+                                    ],
+                                }
+                            },
+                        }
+                    },
+                    'sub_sections': {'measurement': {'section': 'Measurement'}},
+                },
+            },
+        },
+        'data': {'m_def': 'My_schema', 'data_file': 'test.my_schema.archive.csv'},
+    }
+    csv_file, schema_file = get_files(yaml.dump(base_schema), content)
+
+    class MyContext(ClientContext):
+        def raw_file(self, path, *args, **kwargs):
+            return open(csv_file, *args, **kwargs)
+
+    main_archive, _ = get_archives(MyContext(local_dir=''), schema_file, None)
+    ArchiveParser().parse(schema_file, main_archive)
+    with monkeypatch.context() as context:
+        context.setattr(pd, 'read_csv', read_csv_spy)
+        run_normalize(main_archive)
+
+    assert engines[-1] == engine
+    expected = pd.read_csv(
+        csv_file,
+        engine='python',
+        sep=parsing_options.get('sep'),
+        comment=parsing_options.get('comment'),
+        skipinitialspace=True,
+    )
+    measurement = main_archive.data.measurement
+    for column in ['a', 'b']:
+        assert list(measurement[f'quantity_{column}']) == list(expected[column])
+
+
+def test_tabular_row_cell_types(raw_files_function):
+    """
+    Tests that in row mode, cells keep the type of their column. Rows of mixed int and
+    float columns would otherwise be upcast to float and lose the exact int values.
+    """
+    large_int = 2**53 + 1  # not exactly representable as float
+    base_schema = {
+        'definitions': {
+            'name': 'Eln',
+            'sections': {
+                'Measurement': {
+                    'quantities': {
+                        'count': {
+                            'type': 'np.int64',
+                            'm_annotations': {'tabular': {'name': 'count'}},
+                        },
+                        'value': {
+                            'type': 'np.float64',
+                            'm_annotations': {'tabular': {'name': 'value'}},
+                        },
+                    }
+                },
+                'My_schema': {
+                    'base_section': 'nomad.parsing.tabular.TableData',
+                    'quantities': {
+                        'data_file': {
+                            'type': 'str',
+                            'm_annotations': {
+                                'tabular_parser': {
+                                    'mapping_options': [
+                                        {
+                                            'mapping_mode': 'row',
+                                            'file_mode': 'current_entry',
+                                            'sections': ['measurements'],
+                                        }
+                                    ],
+                                }
+                            },
+                        }
+                    },
+                    'sub_sections': {
+                        'measurements': {'section': 'Measurement', 'repeats': True}
+                    },
+                },
+            },
+        },
+        'data': {'m_def': 'My_schema', 'data_file': 'test.my_schema.archive.csv'},
+    }
+    csv_file, schema_file = get_files(
+        yaml.dump(base_schema), f'count,value\n{large_int},0.1\n1,2.5\n'
+    )
+
+    class MyContext(ClientContext):
+        def raw_file(self, path, *args, **kwargs):
+            return open(csv_file, *args, **kwargs)
+
+    main_archive, _ = get_archives(MyContext(local_dir=''), schema_file, None)
+    ArchiveParser().parse(schema_file, main_archive)
+    run_normalize(main_archive)
+
+    measurements = main_archive.data.measurements
+    assert [m.count for m in measurements] == [large_int, 1]
+    assert [m.value for m in measurements] == [0.1, 2.5]
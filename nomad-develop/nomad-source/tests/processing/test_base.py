@@ -178,6 +178,8 @@ class ChildProc(Proc):
             new_child = ChildProc.create(
                 child_id=new_child_id, parent_id=self.parent_id
             )
+            if ParentProc.count_children:
+                self.parent().expect_children(1)
             new_child.child_proc(True)
         if not succeed:
             events.append(f'{self.child_id}:child_proc:fail')
@@ -190,6 +192,7 @@ class ChildProc(Proc):
 
 class ParentProc(Proc):
     id_field = 'parent_id'
+    count_children = False
     parent_id = StringField(primary_key=True)
     # State variables
     current_slot = IntField()
@@ -207,10 +210,13 @@ class ParentProc(Proc):
         delay=0.1,
         child_args: List[Any] = [],
         join_args: List[Any] = [],
+        announced_children: int = 0,
     ):
         """
         Arguments:
             fail_spawn: if we should fail after we have spawned the child processes
+            announced_children: the number of additional children that are announced,
+                but never spawned
             child_args: For each value in the list, spawn a child with the provided args
             join_args: list of parameters controlling the behaviour when joining. `fail` mean
                 fail the join. A boolean or list of booleans result in new children spawned.
@@ -219,12 +225,16 @@ class ParentProc(Proc):
         self.join_args = join_args
         self.current_slot = 0
         child_count = 0
+        if announced_children:
+            self.expect_children(announced_children)
         for child_arg in child_args:
             if not isinstance(child_arg, list):
                 child_arg = [child_arg]
             child = ChildProc.create(
                 child_id=str(child_count), parent_id=self.parent_id
             )
+            if self.count_children:
+                self.expect_children(1)
             child.child_proc(*child_arg)
             child_count += 1
         if fail_spawn:
@@ -255,6 +265,8 @@ class ParentProc(Proc):
                             child_id=f'rejoin{self.current_slot}.{i}',
                             parent_id=self.parent_id,
                         )
+                        if self.count_children:
+                            self.expect_children(1)
                         child.child_proc(succeed)
                     events.append(f'{self.parent_id}:join:waiting')
                     return ProcessStatus.WAITING_FOR_RESULT
@@ -382,9 +394,18 @@ class ParentProc(Proc):
         ),
     ],
 )
+@pytest.mark.parametrize('count_children', [False, True])
 def test_parent_child(
-    worker, mongo_function, reset_events, spawn_kwargs, expected_events
+    worker,
+    mongo_function,
+    reset_events,
+    monkeypatch,
+    spawn_kwargs,
+    expected_events,
+    count_children,
 ):
+    monkeypatch.setattr(ParentProc, 'count_children', count_children)
+    monkeypatch.setattr('nomad.config.process.join_recount_threshold', 0)
     child_args = spawn_kwargs.get('child_args', [])
     join_args = spawn_kwargs.get('join_args', [])
     fail_spawn = spawn_kwargs.get('fail_spawn', False)
@@ -420,6 +441,56 @@ def test_parent_child(
     assert_events(expected_events)
 
 
+def test_parent_child_rerun_after_fail(
+    worker, mongo_function, reset_events, monkeypatch
+):
+    monkeypatch.setattr(ParentProc, 'count_children', True)
+    parent = ParentProc.create(parent_id='p')
+    # The parent fails after announcing more children than the join recount threshold
+    parent.spawn(fail_spawn=True, announced_children=20)
+    parent.block_until_complete()
+    assert parent.process_status == ProcessStatus.FAILURE
+    assert parent.pending_children is None
+
+    # The rerun must not count the children of the failed process
+    parent.spawn(child_args=[True, True])
+    parent.block_until_complete()
+    assert parent.process_status == ProcessStatus.SUCCESS
+    assert_events(
+        [
+            'p:spawn:start',
+            'p:spawn:fail',
+            'p:spawn:start',
+            ['p:spawn:waiting', '0:child_proc:succ', '1:child_proc:succ'],
+            'p:join:succ',
+        ]
+    )
+
+    parent.expect_children(20)
+    parent.reset()
+    parent.save()
+    parent.reload()
+    assert parent.pending_children is None
+
+
+def test_parent_child_join_recount(worker, mongo_function, reset_events, monkeypatch):
+    monkeypatch.setattr(ParentProc, 'count_children', True)
+    monkeypatch.setattr('nomad.config.process.join_recount_interval', 1)
+    parent = ParentProc.create(parent_id='p')
+    # The announced children never complete, like children with lost decrements
+    parent.spawn(child_args=[True, True], announced_children=20)
+    parent.block_until_complete()
+    assert parent.process_status == ProcessStatus.SUCCESS
+    assert parent.pending_children is None
+    assert_events(
+        [
+            'p:spawn:start',
+            ['p:spawn:waiting', '0:child_proc:succ', '1:child_proc:succ'],
+            'p:join:succ',
+        ]
+    )
+
+
 def test_queueing(worker, mongo_function, reset_events):
     p = ParentProc.create(parent_id='p')
     expected_events = []
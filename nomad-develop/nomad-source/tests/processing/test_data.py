@@ -24,11 +24,12 @@ import shutil
 import zipfile
 import json
 import yaml
+from io import BytesIO
 
 from nomad import utils, infrastructure
 from nomad.config import config
 from nomad.config.models.config import BundleImportSettings
-from nomad.archive import read_partial_archive_from_mongo, to_json
+from nomad.archive import read_partial_archive_from_mongo, to_json, write_archive
 from nomad.files import UploadFiles, StagingUploadFiles, PublicUploadFiles
 from nomad.parsing.parser import Parser
 from nomad.parsing import parsers
@@ -36,6 +37,7 @@ from nomad.datamodel import ServerContext
 from nomad.datamodel.data import EntryData
 from nomad.metainfo import Package, Quantity, Reference, SubSection
 from nomad.processing import Upload, Entry, ProcessStatus
+from nomad.processing.data import _lazy_section_dict
 from nomad.search import search, refresh as search_refresh
 from nomad.utils.exampledata import ExampleData
 from nomad.datamodel.datamodel import EntryArchive, EntryData, ArchiveSection
@@ -124,6 +126,26 @@ def test_generate_entry_id():
     )
 
 
+def test_lazy_section_dict(user1):
+    data = ExampleData(main_author=user1)
+    data.create_upload(upload_id='test_upload')
+    archive = data.create_entry(
+        upload_id='test_upload', entry_id='test_entry', mainfile='test/mainfile.json'
+    )
+    logs = [dict(event='test event', level='INFO')]
+
+    expected = archive.m_copy()
+    expected.processing_logs = logs
+    expected_f, f = BytesIO(), BytesIO()
+    write_archive(expected_f, 1, [('test_entry', expected.m_to_dict())])
+    write_archive(
+        f, 1, [('test_entry', _lazy_section_dict(archive, dict(processing_logs=logs)))]
+    )
+
+    assert f.getvalue() == expected_f.getvalue()
+    assert archive.processing_logs is None
+
+
 def test_send_mail(mails, monkeypatch):
     infrastructure.send_mail('test name', 'test@email.de', 'test message', 'subject')
 
@@ -844,6 +866,71 @@ def test_process_partial(proc_infra, non_empty_processed: Upload, args):
             )
 
 
+def test_process_only_changed_files(proc_infra, non_empty_processed: Upload):
+    upload = non_empty_processed
+    reprocess_settings = dict(only_changed_files=True)
+
+    def process(file_operations=None):
+        upload.process_upload(file_operations, reprocess_settings=reprocess_settings)
+        upload.block_until_complete()
+        assert_processing(upload)
+        return {e.mainfile: e.complete_time for e in upload.successful_entries}
+
+    # No manifest yet, everything is processed
+    file_operation = dict(
+        op='ADD', path=example_file_mainfile, target_dir='other', temporary=False
+    )
+    timestamps = process([file_operation])
+    assert timestamps.keys() == {
+        'examples_template/template.json',
+        'other/template.json',
+    }
+    for entry in upload.successful_entries:
+        assert entry.raw_file_dependencies == [entry.mainfile]
+
+    # Nothing changed
+    assert process() == timestamps
+
+    # An aux file changed
+    with upload.staging_upload_files.raw_file('examples_template/1.aux', 'w') as f:
+        f.write('modified')
+    new_timestamps = process()
+    assert new_timestamps['other/template.json'] == timestamps['other/template.json']
+    assert (
+        new_timestamps['examples_template/template.json']
+        > timestamps['examples_template/template.json']
+    )
+
+
+def test_process_lab_id_references(tmp, user1, proc_infra):
+    upload_path = os.path.join(tmp, 'lab_ids.zip')
+    with zipfile.ZipFile(upload_path, 'w') as zf:
+        # the process is processed before the sample, which is not indexed yet
+        zf.writestr(
+            'a_process.archive.yaml',
+            'data:\n'
+            '  m_def: nomad.datamodel.metainfo.basesections.Process\n'
+            '  samples:\n'
+            '  - lab_id: sample-1\n',
+        )
+        zf.writestr(
+            'b_sample.archive.yaml',
+            'data:\n'
+            '  m_def: nomad.datamodel.metainfo.basesections.CompositeSystem\n'
+            '  lab_id: sample-1\n',
+        )
+
+    upload = run_processing(('lab_ids', upload_path), user1)
+    assert_processing(upload)
+
+    entries = {entry.mainfile: entry for entry in upload.successful_entries}
+    sample = entries['b_sample.archive.yaml']
+    process = entries['a_process.archive.yaml']
+    with upload.upload_files.read_archive(process.entry_id) as archive:
+        reference = archive[process.entry_id]['data']['samples'][0]['reference']
+    assert reference.endswith(f'/archive/{sample.entry_id}#data')
+
+
 def test_re_pack(published: Upload):
     upload_id = published.upload_id
     upload_files: PublicUploadFiles = published.upload_files  # type: ignore
@@ -878,6 +965,34 @@ def mock_failure(cls, function_name, monkeypatch):
     )
 
 
+@pytest.mark.timeout(config.tests.default_timeout)
+def test_processing_batched(monkeypatch, tmp, user1, proc_infra, with_error):
+    upload_path = os.path.join(tmp, 'example_upload.zip')
+    with zipfile.ZipFile(upload_path, 'w') as zf:
+        for directory in ['one', 'two', 'three']:
+            zf.write('tests/data/parsers/vasp/vasp.xml', f'{directory}/run.vasp.xml')
+
+    parsing = Entry.parsing
+
+    def mock_parsing(self):
+        if self.mainfile.startswith('two/'):
+            raise Exception('fail for test')
+        parsing(self)
+
+    monkeypatch.setattr('nomad.config.process.entry_batch_size', 2)
+    monkeypatch.setattr('nomad.processing.data.Entry.parsing', mock_parsing)
+    upload = run_processing(('example_upload', upload_path), user1)
+
+    assert upload.process_status == ProcessStatus.SUCCESS
+    assert upload.total_entries_count == 3
+    for entry in Entry.objects(upload_id=upload.upload_id):
+        assert entry.process_status == (
+            ProcessStatus.FAILURE
+            if entry.mainfile.startswith('two/')
+            else ProcessStatus.SUCCESS
+        )
+
+
 @pytest.mark.parametrize(
     'function', ['update_files', 'match_all', 'cleanup', 'parsing']
 )
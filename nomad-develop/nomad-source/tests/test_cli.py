@@ -20,6 +20,8 @@ import pytest
 import click.testing
 import json
 import datetime
+import subprocess
+import sys
 import time
 
 from nomad import processing as proc, files
@@ -33,10 +35,57 @@ from nomad.utils.exampledata import ExampleData
 # TODO there is much more to test
 
 
+# cold import budgets in seconds, measured with `python -X importtime`, for the cli,
+# the celery worker (nomad.processing), and `nomad parse` (nomad.client)
+import_time_budgets = {'nomad.cli': 2.5, 'nomad.processing': 15, 'nomad.client': 15}
+# heavy modules that must only be imported on first use, in addition to the
+# modules of all parser implementations
+lazy_modules = {
+    'nomad.cli': ['elasticsearch', 'nomad.aflow_prototypes', 'nomad.parsing'],
+    'nomad.processing': ['nomad.aflow_prototypes', 'nomad.parsing.nexus'],
+    'nomad.client': ['nomad.aflow_prototypes', 'nomad.parsing', 'nomad.normalizing'],
+}
+
+
 def invoke_cli(*args, **kwargs):
     return click.testing.CliRunner().invoke(*args, obj=POPO(), **kwargs)
 
 
+def import_times(module: str) -> dict:
+    """
+    Imports the module in a fresh interpreter and returns the cumulative import time
+    in seconds of all imported modules.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:') :].split('|')
+        times[name.strip()] = int(cumulative) / 1e6
+
+    return times
+
+
+def parser_modules() -> list:
+    """
+    Returns the modules of all parser implementations that are loaded on first use.
+    """
+    from nomad.parsing.parser import MatchingParserInterface
+    from nomad.parsing.parsers import parsers
+
+    return [
+        parser._parser_class_name.rsplit('.', 1)[0]
+        for parser in parsers
+        if isinstance(parser, MatchingParserInterface)
+    ]
+
+
 @pytest.mark.usefixtures('reset_config', 'nomad_logging')
 class TestCli:
     def test_help(self, example_mainfile):
@@ -45,6 +94,13 @@ class TestCli:
         assert result.exit_code == 0
         assert time.time() - start < 1
 
+    @pytest.mark.parametrize('module', list(import_time_budgets))
+    def test_import_time(self, module):
+        times = import_times(module)
+        for lazy_module in lazy_modules[module] + parser_modules():
+            assert lazy_module not in times, f'{lazy_module} is imported eagerly'
+        assert times[module] < import_time_budgets[module]
+
 
 @pytest.mark.usefixtures('reset_config', 'nomad_logging')
 class TestParse:
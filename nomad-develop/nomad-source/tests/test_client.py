@@ -16,13 +16,17 @@
 # limitations under the License.
 #
 
+import asyncio
+import json
 from typing import List, Tuple
 
+import httpx
 from httpx import AsyncClient
 import pytest
 
 from nomad.app.main import app
 from nomad.client.archive import ArchiveQuery
+from nomad.client.cache import ArchiveCache
 from nomad.datamodel import EntryArchive, User
 from nomad.datamodel.metainfo import runschema, SCHEMA_IMPORT_ERROR
 from nomad.metainfo import MSection, SubSection
@@ -87,6 +91,7 @@ def async_api_v1(monkeysession):
     monkeysession.setattr('httpx.AsyncClient.get', getattr(test_client, 'get'))
     monkeysession.setattr('httpx.AsyncClient.put', getattr(test_client, 'put'))
     monkeysession.setattr('httpx.AsyncClient.post', getattr(test_client, 'post'))
+    monkeysession.setattr('httpx.AsyncClient.stream', getattr(test_client, 'stream'))
     monkeysession.setattr('httpx.AsyncClient.delete', getattr(test_client, 'delete'))
 
     def mocked_auth_headers(self) -> dict:
@@ -129,6 +134,229 @@ def test_async_query_required(
     assert_results(async_query.download(), sub_section_defs=sub_sections)
 
 
+def test_async_query_callback(async_api_v1, published_wo_user_metadata):
+    received: List[EntryArchive] = []
+    async_query = ArchiveQuery(required=dict(metadata='*'))
+
+    results = async_query.download(callback=received.append)
+
+    assert_results(results)
+    assert received == results
+
+
+def test_async_query_iter_download(async_api_v1, many_uploads):
+    async_query = ArchiveQuery(required=dict(metadata='*'), batch_size=1)
+
+    results = async_query.download(1)
+    assert_results(results, total=1)
+
+    iterated = list(async_query.iter_download(prefetch=2))
+    assert_results(iterated, total=3)
+    assert len(async_query.entry_list()) == 0
+
+    ids = {archive.metadata.entry_id for archive in results + iterated}
+    assert len(ids) == 4
+
+
+_async_client_methods = {
+    name: getattr(AsyncClient, name)
+    for name in ('get', 'put', 'post', 'stream', 'delete')
+}
+
+
+@pytest.fixture(scope='function')
+def mocked_api(monkeypatch):
+    """
+    This fixture undoes the redirect to the fast api of `async_api_v1`. It provides a
+    function that routes the requests of the archive query to a given request handler.
+    """
+    for name, method in _async_client_methods.items():
+        monkeypatch.setattr(AsyncClient, name, method)
+
+    def route(handler):
+        def client(**kwargs):
+            return AsyncClient(transport=httpx.MockTransport(handler), **kwargs)
+
+        monkeypatch.setattr('nomad.client.archive.AsyncClient', client)
+
+    return route
+
+
+def _entry_line(entry_id: str) -> str:
+    archive = dict(metadata=dict(entry_id=entry_id))
+    return json.dumps(dict(entry_id=entry_id, upload_id='u', archive=archive))
+
+
+@pytest.mark.parametrize(
+    'content_type, lines, received, retried',
+    [
+        pytest.param(
+            'application/json',
+            [json.dumps(dict(data=[json.loads(_entry_line(id)) for id in ['a', 'b']]))],
+            ['a', 'b'],
+            [],
+            id='json',
+        ),
+        pytest.param(
+            'application/x-ndjson',
+            [_entry_line('a'), _entry_line('b'), '{"pagination": {}}'],
+            ['a', 'b'],
+            [],
+            id='ndjson',
+        ),
+        pytest.param(
+            'application/x-ndjson',
+            [_entry_line('a'), '{"detail": "failure"}'],
+            ['a'],
+            ['b'],
+            id='ndjson-error',
+        ),
+        pytest.param(
+            'application/x-ndjson',
+            [_entry_line('a')],
+            ['a'],
+            ['b'],
+            id='ndjson-incomplete',
+        ),
+    ],
+)
+def test_async_query_acquire_response(
+    mocked_api, content_type, lines, received, retried
+):
+    def handler(request):
+        content = '\n'.join(lines) + '\n'
+        return httpx.Response(
+            200, content=content.encode(), headers={'content-type': content_type}
+        )
+
+    async_query = ArchiveQuery(url='http://testserver/api/v1')
+
+    async def acquire():
+        transport = httpx.MockTransport(handler)
+        async with AsyncClient(transport=transport) as session:
+            return await async_query._acquire(
+                [('a', 'u'), ('b', 'u')], session, asyncio.Semaphore(1)
+            )
+
+    results = asyncio.run(acquire())
+    assert [archive.metadata.entry_id for archive in results] == received
+    assert async_query.entry_list() == [(entry_id, 'u') for entry_id in retried]
+
+
+def test_async_query_acquire_error_cached(mocked_api, tmp_path):
+    def handler(request):
+        if request.method == 'GET':
+            return httpx.Response(200, json=dict(data=dict(last_update='time')))
+        return httpx.Response(503)
+
+    cache = ArchiveCache(directory=str(tmp_path))
+    async_query = ArchiveQuery(url='http://testserver/api/v1', cache=cache)
+    cache.put(
+        'a', 'u', async_query._required_hash, 'time', dict(metadata=dict(entry_id='a'))
+    )
+    delivered = []
+
+    async def acquire():
+        transport = httpx.MockTransport(handler)
+        async with AsyncClient(transport=transport) as session:
+            return await async_query._acquire(
+                [('a', 'u'), ('b', 'u')],
+                session,
+                asyncio.Semaphore(1),
+                callback=lambda archive: delivered.append(archive.metadata.entry_id),
+            )
+
+    assert asyncio.run(acquire()) is None
+    # the cached archive was already delivered, only the missing one is retried
+    assert delivered == ['a']
+    assert async_query.entry_list() == [('b', 'u')]
+
+
+def test_async_query_iter_download_stopped(mocked_api):
+    entry_ids = [f'e{index}' for index in range(6)]
+
+    def handler(request):
+        if request.url.path.endswith('/entries/query'):
+            data = [dict(entry_id=id, upload_id='u') for id in entry_ids]
+            return httpx.Response(
+                200, json=dict(pagination=dict(total=len(data)), data=data)
+            )
+        query = json.loads(request.content)['query']['and'][-1]
+        lines = [_entry_line(id) for id in query['entry_id:any']]
+        content = '\n'.join(lines + ['{"pagination": {}}']) + '\n'
+        return httpx.Response(
+            200,
+            content=content.encode(),
+            headers={'content-type': 'application/x-ndjson'},
+        )
+
+    mocked_api(handler)
+
+    async_query = ArchiveQuery(url='http://testserver/api/v1', batch_size=1)
+    consumed = []
+    for archive in async_query.iter_download(prefetch=2):
+        consumed.append(archive.metadata.entry_id)
+        if len(consumed) == 2:
+            break
+
+    assert consumed == entry_ids[:2]
+    assert async_query.entry_list() == [(id, 'u') for id in entry_ids[2:]]
+
+    remaining = [archive.metadata.entry_id for archive in async_query.iter_download()]
+    assert remaining == entry_ids[2:]
+    assert async_query.entry_list() == []
+
+
+def test_async_query_cache(
+    async_api_v1, published_wo_user_metadata, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(
+        'nomad.client.archive.ArchiveQuery._uploads_url',
+        'http://testserver/api/v1/uploads',
+    )
+    cache = ArchiveCache(directory=str(tmp_path))
+
+    results = ArchiveQuery(required=dict(metadata='*'), cache=cache).download()
+    assert_results(results)
+
+    downloads = []
+    original_stream = AsyncClient.stream
+
+    def stream(self, *args, **kwargs):
+        downloads.append(args)
+        return original_stream(self, *args, **kwargs)
+
+    monkeypatch.setattr('httpx.AsyncClient.stream', stream)
+    cached = ArchiveQuery(required=dict(metadata='*'), cache=cache).download()
+    assert_results(cached)
+    assert len(downloads) == 0
+    assert cached[0].metadata.entry_id == results[0].metadata.entry_id
+
+
+def test_archive_cache(tmp_path):
+    cache = ArchiveCache(directory=str(tmp_path), max_size=1000)
+    archive = dict(metadata=dict(entry_id='entry', comment='x' * 100))
+
+    cache.put('entry', 'upload', 'required', 'time', archive)
+    assert cache.get('entry', 'required', 'time') == archive
+    assert cache.get('entry', 'other', 'time') is None
+    assert cache.get('entry', 'required', 'later') is None
+    assert cache.get('entry', 'required', None) is None
+
+    cache.put('entry', 'upload', 'required', 'later', archive)
+    assert cache.get('entry', 'required', 'time') is None
+    assert cache.get('entry', 'required', 'later') == archive
+
+    for index in range(20):
+        cache.put(f'entry{index}', 'upload', 'required', 'time', archive)
+    assert cache.get('entry', 'required', 'later') is None
+    assert cache.get('entry19', 'required', 'time') == archive
+    assert cache._size <= 1000
+
+    cache.clear()
+    assert cache.get('entry19', 'required', 'time') is None
+
+
 def test_async_query_auth(async_api_v1, published, user2, user1):
     async_query = ArchiveQuery(username=user2.username, password='password')
 
@@ -16,16 +16,20 @@
 # limitations under the License.
 #
 
-from typing import Generator, Any, Dict, Tuple, Iterable, List
+from typing import Generator, Any, Dict, Tuple, Iterable, List, Set
 from datetime import datetime
 import os
+import time
 import os.path
 import shutil
 import pytest
 import itertools
 import zipfile
+import tarfile
+import io
 import re
 import pathlib
+import sqlite3
 
 from nomad import datamodel, utils
 from nomad.config import config
@@ -33,6 +37,7 @@ from nomad.archive import to_json
 from nomad.files import (
     DirectoryObject,
     PathObject,
+    delete_expired_chunked_uploads,
     empty_zip_file_size,
     empty_archive_file_size,
 )
@@ -376,6 +381,34 @@ class TestStagingUploadFiles(UploadFilesContract):
         _, entries, upload_files = test_upload
         upload_files.pack(entries, with_embargo=entries[0].with_embargo)
 
+    def test_pack_progress(self, test_upload: StagingUploadWithFiles, monkeypatch):
+        upload_id, entries, upload_files = test_upload
+        # only read one file ahead
+        monkeypatch.setattr('nomad.config.archive.pack_read_ahead_size', 1)
+        # make sure packing takes longer than the progress interval
+        pack_raw_files = upload_files._pack_raw_files
+
+        def slow_pack_raw_files(*args, **kwargs):
+            time.sleep(0.1)
+            return pack_raw_files(*args, **kwargs)
+
+        monkeypatch.setattr(upload_files, '_pack_raw_files', slow_pack_raw_files)
+
+        messages: List[str] = []
+        upload_files.pack(
+            entries,
+            with_embargo=entries[0].with_embargo,
+            progress=messages.append,
+            progress_interval=0.001,
+        )
+        assert len(messages) > 0
+        assert all(message.startswith('Packing archives') for message in messages)
+
+        public_upload_files = PublicUploadFiles(upload_id)
+        for entry in entries:
+            with public_upload_files.read_archive(entry.entry_id) as archive:
+                assert entry.entry_id in archive
+
     @pytest.mark.parametrize('entry_specs', ['r', 'p'])
     def test_pack_potcar(self, entry_specs):
         embargo_length = 12 if 'r' in entry_specs.lower() else 0
@@ -431,6 +464,129 @@ class TestStagingUploadFiles(UploadFilesContract):
             example_file_contents
         )
 
+    def test_add_rawfiles_tar_members(self, test_upload_id, tmp_path):
+        tar_path = str(tmp_path / 'members.tar')
+        with tarfile.open(tar_path, 'w') as tf:
+            for name in ('dir/file.txt', '../outside.txt', '/absolute.txt'):
+                info = tarfile.TarInfo(name)
+                info.size = 4
+                tf.addfile(info, io.BytesIO(b'data'))
+            link = tarfile.TarInfo('dir/link')
+            link.type = tarfile.SYMTYPE
+            link.linkname = '/etc/passwd'
+            tf.addfile(link)
+
+        test_upload = StagingUploadFiles(test_upload_id, create=True)
+        updated_files: Set[str] = set()
+        test_upload.add_rawfiles(
+            tar_path, target_dir='target', updated_files=updated_files
+        )
+        assert updated_files == {
+            'target/dir/file.txt',
+            'target/outside.txt',
+            'target/absolute.txt',
+        }
+        path_infos = test_upload.raw_directory_list(recursive=True, files_only=True)
+        assert sorted(path_info.path for path_info in path_infos) == sorted(
+            updated_files
+        )
+        assert not os.path.exists(str(tmp_path / 'outside.txt'))
+
+    def test_add_rawfiles_corrupt_member(self, test_upload_id, tmp_path):
+        zip_path = str(tmp_path / 'corrupt.zip')
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED) as zf:
+            zf.writestr('first.txt', 'new-data')
+            zf.writestr('second.txt', 'second-data')
+        with open(zip_path, 'rb') as f:
+            data = f.read()
+        with open(zip_path, 'wb') as f:
+            f.write(data.replace(b'second-data', b'corrupt-dat'))
+
+        test_upload = StagingUploadFiles(test_upload_id, create=True)
+        with test_upload.raw_file('first.txt', 'w') as f:
+            f.write('old-data')
+        updated_files: Set[str] = set()
+        with pytest.raises(Exception):
+            test_upload.add_rawfiles(zip_path, updated_files=updated_files)
+
+        # no member of the corrupt archive is extracted
+        assert not updated_files
+        path_infos = test_upload.raw_directory_list(recursive=True)
+        assert [path_info.path for path_info in path_infos] == ['first.txt']
+        with test_upload.raw_file('first.txt') as f:
+            assert f.read() == 'old-data'
+
+    def test_add_rawfiles_write_error(self, test_upload_id, tmp_path, monkeypatch):
+        zip_path = str(tmp_path / 'members.zip')
+        with zipfile.ZipFile(zip_path, 'w') as zf:
+            zf.writestr('first.txt', 'new-data')
+            zf.writestr('second.txt', 'second-data')
+
+        test_upload = StagingUploadFiles(test_upload_id, create=True)
+        with test_upload.raw_file('first.txt', 'w') as f:
+            f.write('old-data')
+
+        copyfileobj = shutil.copyfileobj
+        copied = []
+
+        def copyfileobj_failing(*args, **kwargs):
+            if copied:
+                raise OSError('No space left on device')
+            copied.append(args)
+            return copyfileobj(*args, **kwargs)
+
+        monkeypatch.setattr('nomad.files.shutil.copyfileobj', copyfileobj_failing)
+        with pytest.raises(OSError):
+            test_upload.add_rawfiles(zip_path)
+
+        # the raw files are untouched and the extracted members are removed
+        path_infos = test_upload.raw_directory_list(recursive=True)
+        assert [path_info.path for path_info in path_infos] == ['first.txt']
+        with test_upload.raw_file('first.txt') as f:
+            assert f.read() == 'old-data'
+        assert sorted(os.listdir(test_upload.os_path)) == ['archive', 'raw']
+
+    def test_add_rawfiles_hardlinked(self, test_upload_id, tmp_path):
+        source_path = str(tmp_path / 'source.txt')
+        with open(source_path, 'w') as f:
+            f.write('source')
+        tmp_dir = tmp_path / 'tmp'
+        tmp_dir.mkdir()
+        os.link(source_path, str(tmp_dir / 'source.txt'))
+
+        test_upload = StagingUploadFiles(test_upload_id, create=True)
+        test_upload.add_rawfiles(
+            str(tmp_dir / 'source.txt'), cleanup_source_file_and_dir=True
+        )
+        assert not tmp_dir.exists()
+        with test_upload.raw_file('source.txt', 'w') as f:
+            f.write('modified')
+        with open(source_path) as f:
+            assert f.read() == 'source'
+
+    def test_raw_file_manifest(self, test_upload_id):
+        test_upload = StagingUploadFiles(test_upload_id, create=True)
+        test_upload.add_rawfiles(example_file)
+        assert test_upload.read_raw_file_manifest() is None
+
+        manifest = test_upload.raw_file_manifest()
+        assert sorted(manifest) == sorted(example_file_contents)
+        test_upload.write_raw_file_manifest(manifest, pending=True)
+        test_upload.commit_raw_file_manifest()
+        assert test_upload.read_raw_file_manifest(pending=True) is None
+        assert test_upload.read_raw_file_manifest() == manifest
+
+        with test_upload.raw_file('examples_template/1.aux', 'w') as f:
+            f.write('modified')
+        test_upload.delete_rawfiles('examples_template/2.aux')
+        new_manifest = test_upload.raw_file_manifest(manifest)
+        assert 'examples_template/2.aux' not in new_manifest
+        for path, record in new_manifest.items():
+            if path == 'examples_template/1.aux':
+                assert record[2] != manifest[path][2]
+            else:
+                assert record == manifest[path]
+
     @pytest.mark.parametrize('prefix_size', [0, 2])
     def test_prefix_size(self, monkeypatch, prefix_size):
         monkeypatch.setattr('nomad.config.fs.prefix_size', prefix_size)
@@ -570,12 +726,60 @@ class TestPublicUploadFiles(UploadFilesContract):
         upload_id, entries, upload_files = test_upload
         for entry in entries:
             entry.with_embargo = False
+        access, raw_index = upload_files.access, upload_files._open_raw_index()
         upload_files.re_pack(with_embargo=False)
+        if access != 'public' and raw_index is not None:
+            # the index of the old raw file is closed and reopened for the new one
+            with pytest.raises(sqlite3.ProgrammingError):
+                raw_index.get('')
+            assert upload_files._open_raw_index() is not None
         assert_upload_files(upload_id, entries, PublicUploadFiles, with_embargo=False)
         assert upload_files.access == 'public'
         with pytest.raises(KeyError):
             StagingUploadFiles(upload_files.upload_id)
 
+    def test_raw_index(self, test_upload):
+        _, _, upload_files = test_upload
+        index_file_object = PublicUploadFiles._create_raw_index_file_object(
+            upload_files, upload_files.access
+        )
+        assert upload_files._open_raw_index() is not None
+
+        # the index is not used for a changed zip file of the same size
+        zip_path = upload_files.raw_zip_file_object().os_path
+        zip_stat = os.stat(zip_path)
+        os.utime(zip_path, ns=(zip_stat.st_atime_ns, zip_stat.st_mtime_ns + 1000))
+        assert PublicUploadFiles(upload_files.upload_id)._open_raw_index() is None
+        os.utime(zip_path, ns=(zip_stat.st_atime_ns, zip_stat.st_mtime_ns))
+        assert PublicUploadFiles(upload_files.upload_id)._open_raw_index() is not None
+
+        def raw_content(upload_files):
+            paths = ['', 'examples_template', 'examples_template/', 'does_not_exist']
+            content = [
+                (
+                    path_info,
+                    upload_files.raw_path_exists(path_info.path),
+                    upload_files.raw_path_is_file(path_info.path),
+                )
+                for path_info in upload_files.raw_directory_list(recursive=True)
+            ]
+            content.extend(upload_files.raw_path_exists(path) for path in paths)
+            for path_info in upload_files.raw_directory_list(
+                recursive=True, files_only=True
+            ):
+                with upload_files.raw_file(path_info.path, 'rb') as f:
+                    f.seek(1)
+                    content.append(
+                        (upload_files.raw_file_size(path_info.path), f.read())
+                    )
+            return content
+
+        indexed_content = raw_content(upload_files)
+        index_file_object.delete()
+        public_upload_files = PublicUploadFiles(upload_files.upload_id)
+        assert public_upload_files._open_raw_index() is None
+        assert raw_content(public_upload_files) == indexed_content
+
     @pytest.mark.parametrize(
         'suffixes,suffix',
         [
@@ -796,3 +1000,29 @@ def test_test_upload_files(raw_files_infra):
     finally:
         if upload_files.exists():
             upload_files.delete()
+
+
+def test_delete_expired_chunked_uploads(monkeypatch, tmp_path):
+    monkeypatch.setattr(config.fs, 'tmp', str(tmp_path))
+    chunked_uploads_dir = tmp_path / 'chunked_uploads'
+    for session_id in ('expired', 'active', 'finalized'):
+        (chunked_uploads_dir / session_id).mkdir(parents=True)
+        (chunked_uploads_dir / session_id / 'data.zip').write_bytes(b'data')
+        if session_id != 'finalized':
+            (chunked_uploads_dir / f'{session_id}.json').write_text('{}')
+
+    expired_time = time.time() - config.services.chunked_upload_expiry - 1
+    for path in chunked_uploads_dir.glob('expired*'):
+        os.utime(path, (expired_time, expired_time))
+    os.utime(chunked_uploads_dir / 'expired' / 'data.zip', (expired_time, expired_time))
+    # the active upload only received data recently
+    os.utime(chunked_uploads_dir / 'active.json', (expired_time, expired_time))
+
+    assert delete_expired_chunked_uploads(dry=True) == ['expired']
+    assert (chunked_uploads_dir / 'expired.json').exists()
+    assert delete_expired_chunked_uploads() == ['expired']
+    assert sorted(path.name for path in chunked_uploads_dir.iterdir()) == [
+        'active',
+        'active.json',
+        'finalized',
+    ]